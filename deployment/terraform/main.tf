@@ -57,6 +57,19 @@ resource "aws_lambda_function" "telegram_bot" {
       PRIVACY_POLICY_URL_KZ                     = var.privacy_policy_url_kz
       GROUP_INVITE_LINK                         = var.group_invite_link
       DEFAULT_GROUP_CHAT_ID                     = var.default_group_chat_id
+      REMINDER_AFTER_HOURS                      = var.reminder_after_hours
+      DECLINE_AFTER_HOURS                       = var.decline_after_hours
+      METADATA_SHARDS                           = var.metadata_shards
+      COMMUNITY_NAME                            = var.community_name
+      TENANTS_CONFIG                            = var.tenants_config
+      LOG_LEVEL                                 = var.log_level
+      LOG_FORMAT                                = var.log_format
+      LOG_DEBUG_SAMPLE_RATE                     = var.log_debug_sample_rate
+      TRACING_EXPORTER                          = var.tracing_exporter
+      PROFILE_SAMPLE_RATE                       = var.profile_sample_rate
+      RECORD_SAMPLE_RATE                        = var.record_sample_rate
+      RECORD_SALT                               = var.record_salt
+      WEBAPP_FORM                               = var.webapp_form
     }
   }
 
@@ -94,10 +107,38 @@ resource "aws_api_gateway_integration" "telegram_bot_post_integration" {
   uri         = aws_lambda_function.telegram_bot.invoke_arn
 }
 
+# Define the /form resource serving the Web App form page.
+resource "aws_api_gateway_resource" "telegram_bot_form_resource" {
+  rest_api_id = aws_api_gateway_rest_api.telegram_bot_api.id # API Gateway ID.
+  parent_id   = aws_api_gateway_rest_api.telegram_bot_api.root_resource_id # Parent resource (root).
+  path_part   = "form" # Path segment for the resource.
+}
+
+# Create a GET method for the /form resource.
+resource "aws_api_gateway_method" "telegram_bot_form_get_method" {
+  rest_api_id   = aws_api_gateway_rest_api.telegram_bot_api.id # API Gateway ID.
+  resource_id   = aws_api_gateway_resource.telegram_bot_form_resource.id # Resource ID.
+  http_method   = "GET" # HTTP method for the endpoint.
+  authorization = "NONE" # No authorization required (the page holds no applicant data).
+}
+
+# Link the GET method to the Lambda function (Lambda proxy integrations are always invoked with POST).
+resource "aws_api_gateway_integration" "telegram_bot_form_get_integration" {
+  rest_api_id = aws_api_gateway_rest_api.telegram_bot_api.id
+  resource_id = aws_api_gateway_resource.telegram_bot_form_resource.id
+  http_method = aws_api_gateway_method.telegram_bot_form_get_method.http_method
+  type        = "AWS_PROXY" # Use AWS Proxy to directly invoke the Lambda function.
+  integration_http_method = "POST"
+  uri         = aws_lambda_function.telegram_bot.invoke_arn
+}
+
 # Deploy the API Gateway.
 resource "aws_api_gateway_deployment" "telegram_bot_deployment" {
   rest_api_id = aws_api_gateway_rest_api.telegram_bot_api.id
-  depends_on  = [aws_api_gateway_integration.telegram_bot_post_integration] # Ensure integration is complete first.
+  depends_on  = [
+    aws_api_gateway_integration.telegram_bot_post_integration,
+    aws_api_gateway_integration.telegram_bot_form_get_integration,
+  ] # Ensure the integrations are complete first.
 }
 
 # Define the API Gateway stage (e.g., test, prod).
@@ -116,6 +157,72 @@ resource "aws_lambda_permission" "allow_api_gateway" {
   source_arn    = "${aws_api_gateway_rest_api.telegram_bot_api.execution_arn}/*/*" # ARN of the API Gateway.
 }
 
+# Periodically invoke the Lambda function to send reminders and decline stale join requests.
+resource "aws_cloudwatch_event_rule" "reminders_schedule" {
+  name                = "${var.project_name}_${var.environment}_aws-cloudwatch-event-rule_reminders" # Unique rule name.
+  schedule_expression = var.reminders_schedule_expression # How often the reminder scheduler runs.
+}
+
+# Pass a task marker so the Lambda function knows this is not a Telegram webhook.
+resource "aws_cloudwatch_event_target" "reminders_target" {
+  rule  = aws_cloudwatch_event_rule.reminders_schedule.name
+  arn   = aws_lambda_function.telegram_bot.arn
+  input = jsonencode({ task = "process_reminders" })
+}
+
+# Grant EventBridge permission to invoke the Lambda function.
+resource "aws_lambda_permission" "allow_eventbridge_reminders" {
+  statement_id  = "AllowExecutionFromEventBridgeReminders" # Unique statement ID.
+  action        = "lambda:InvokeFunction" # Allow the invoke function action.
+  function_name = aws_lambda_function.telegram_bot.arn # Lambda function ARN.
+  principal     = "events.amazonaws.com" # Principal service that is allowed to invoke.
+  source_arn    = aws_cloudwatch_event_rule.reminders_schedule.arn # ARN of the schedule rule.
+}
+
+# Periodically invoke the Lambda function to run the outbox jobs left over by webhook invocations.
+resource "aws_cloudwatch_event_rule" "outbox_schedule" {
+  name                = "${var.project_name}_${var.environment}_aws-cloudwatch-event-rule_outbox" # Unique rule name.
+  schedule_expression = var.outbox_schedule_expression # How often the outbox is drained.
+}
+
+# Pass a task marker so the Lambda function knows this is not a Telegram webhook.
+resource "aws_cloudwatch_event_target" "outbox_target" {
+  rule  = aws_cloudwatch_event_rule.outbox_schedule.name
+  arn   = aws_lambda_function.telegram_bot.arn
+  input = jsonencode({ task = "process_outbox" })
+}
+
+# Grant EventBridge permission to invoke the Lambda function.
+resource "aws_lambda_permission" "allow_eventbridge_outbox" {
+  statement_id  = "AllowExecutionFromEventBridgeOutbox" # Unique statement ID.
+  action        = "lambda:InvokeFunction" # Allow the invoke function action.
+  function_name = aws_lambda_function.telegram_bot.arn # Lambda function ARN.
+  principal     = "events.amazonaws.com" # Principal service that is allowed to invoke.
+  source_arn    = aws_cloudwatch_event_rule.outbox_schedule.arn # ARN of the schedule rule.
+}
+
+# Periodically invoke the Lambda function to keep a container warm: refresh its token, caches and connections.
+resource "aws_cloudwatch_event_rule" "warm_up_schedule" {
+  name                = "${var.project_name}_${var.environment}_aws-cloudwatch-event-rule_warm-up" # Unique rule name.
+  schedule_expression = var.warm_up_schedule_expression # How often a container is warmed up.
+}
+
+# Pass a task marker so the Lambda function knows this is not a Telegram webhook.
+resource "aws_cloudwatch_event_target" "warm_up_target" {
+  rule  = aws_cloudwatch_event_rule.warm_up_schedule.name
+  arn   = aws_lambda_function.telegram_bot.arn
+  input = jsonencode({ task = "warm_up" })
+}
+
+# Grant EventBridge permission to invoke the Lambda function.
+resource "aws_lambda_permission" "allow_eventbridge_warm_up" {
+  statement_id  = "AllowExecutionFromEventBridgeWarmUp" # Unique statement ID.
+  action        = "lambda:InvokeFunction" # Allow the invoke function action.
+  function_name = aws_lambda_function.telegram_bot.arn # Lambda function ARN.
+  principal     = "events.amazonaws.com" # Principal service that is allowed to invoke.
+  source_arn    = aws_cloudwatch_event_rule.warm_up_schedule.arn # ARN of the schedule rule.
+}
+
 # Output the API Gateway URL.
 output "api_gateway_url" {
   value       = aws_api_gateway_stage.telegram_bot_stage.invoke_url # Full URL of the deployed API Gateway.
@@ -106,4 +106,100 @@ variable "group_invite_link" {
 # Default Telegram group chat ID used if user starts interaction directly with the bot.
 variable "default_group_chat_id" {
   description = "Default group chat ID to use when no join request is received and user starts directly with the bot."
-}
\ No newline at end of file
+}
+
+# Idle time after which unfinished applicants receive a reminder.
+variable "reminder_after_hours" {
+  description = "Idle time (in hours) after which an applicant who has not finished the form receives a reminder."
+  default     = 24
+}
+
+# Idle time after which the join request of unfinished applicants is declined.
+variable "decline_after_hours" {
+  description = "Idle time (in hours) after which the join request of an unfinished applicant is declined."
+  default     = 72
+}
+
+# Number of Metadata worksheets the user state is sharded across.
+variable "metadata_shards" {
+  description = "Number of Metadata worksheets (Metadata_0..Metadata_{K-1}) the user state is spread across; 1 keeps the single Metadata tab."
+  default     = 1
+}
+
+# Name of the default community.
+variable "community_name" {
+  description = "Community name of the default group, shown in the welcome and completion messages."
+  default     = "Qazaq IT Community"
+}
+
+# Additional groups served by the same deployment.
+variable "tenants_config" {
+  description = "JSON object keyed by group chat ID with per-group name, sheet_id, invite_link, admin_chat_id and questionnaire."
+  default     = ""
+}
+
+# Minimum level of the emitted log records.
+variable "log_level" {
+  description = "Minimum log level (DEBUG, INFO, WARNING, ERROR)."
+  default     = "INFO"
+}
+
+# Log line format.
+variable "log_format" {
+  description = "Log line format: json (one JSON object per line) or text."
+  default     = "json"
+}
+
+# Share of updates whose DEBUG records are kept.
+variable "log_debug_sample_rate" {
+  description = "Share of updates (0 to 1) whose DEBUG records are kept when LOG_LEVEL is DEBUG."
+  default     = 0.1
+}
+
+# Destination of the tracing spans.
+variable "tracing_exporter" {
+  description = "Tracing exporter: stdout (one JSON line per span), memory or none."
+  default     = "none"
+}
+
+# Share of profiled invocations.
+variable "profile_sample_rate" {
+  description = "Share of invocations (0 to 1) profiled with cProfile and tracemalloc; 0 disables profiling."
+  default     = 0
+}
+
+# Share of users whose scrubbed updates are recorded for replays.
+variable "record_sample_rate" {
+  description = "Share of users (0 to 1) whose scrubbed webhook updates are recorded for replays; 0 disables recording."
+  default     = 0
+}
+
+# Key of the pseudonymous IDs in recordings.
+variable "record_salt" {
+  description = "Secret key used to derive stable pseudonymous user and chat IDs in recordings."
+  default     = ""
+}
+
+# Web App form with the whole questionnaire.
+variable "webapp_form" {
+  description = "Whether the bot offers the questionnaire as a Telegram Web App form (\"true\" or \"false\")."
+  default     = "false"
+}
+
+# Schedule of the reminder scheduler invocation.
+variable "reminders_schedule_expression" {
+  description = "EventBridge schedule expression for sending reminders and declining stale join requests."
+  default     = "rate(15 minutes)"
+}
+
+# Schedule of the outbox drain invocation.
+variable "outbox_schedule_expression" {
+  description = "EventBridge schedule expression for running pending and failed outbox jobs."
+  default     = "rate(1 minute)"
+}
+
+# Schedule of the warm-up invocation.
+variable "warm_up_schedule_expression" {
+  description = "EventBridge schedule expression for refreshing the token, caches and connections of a warm container."
+  default     = "rate(5 minutes)"
+}
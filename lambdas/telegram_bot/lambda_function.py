@@ -1,35 +1,128 @@
 import json
 import asyncio
 from telegram import Update
-from shared.telegram_bot.logger import logger
-from shared.telegram_bot.bootstrap import ensure_application_ready
+from shared.telegram_bot.logger import flush_logs, log_context, logger
+from shared.telegram_bot.bootstrap import Bootstrap, ensure_application_ready
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.deadline import Deadline, deadline_scope, is_low_on_time
+from shared.telegram_bot.outbox import get_outbox
+from shared.telegram_bot.prewarm import prewarm_container, warm_up
+from shared.telegram_bot.reminders import get_reminder_scheduler
+from shared.telegram_bot.profiling import profile_invocation
+from shared.telegram_bot.recording import get_update_recorder
+from shared.telegram_bot.stats import get_funnel_stats
+from shared.telegram_bot.tracing import get_tracer
+from shared.telegram_bot.webapp import discover_form_url, serve_form
 import shared.telegram_bot.globals as globs
 
+# Open the Google Sheets and Telegram connections during the init phase, so the first update finds them ready.
+prewarm_container()
 
-async def async_lambda_handler(event):
+
+async def async_lambda_handler(event, deadline=None):
     """
     Handles asynchronous processing of incoming Telegram updates via AWS Lambda.
+    A sampled share of invocations (PROFILE_SAMPLE_RATE) runs under cProfile and tracemalloc.
+
+    Args:
+        event (dict): The AWS Lambda event (see `process_event`).
+        deadline (Deadline, optional): The time budget of the invocation; unbounded if omitted.
+
+    Returns:
+        dict: A dictionary containing the HTTP response with a status code and message.
+    """
+    # Every Sheets and Telegram call made while processing the event is bounded by the invocation budget.
+    with deadline_scope(deadline or Deadline()), profile_invocation(event.get("task") or "update"):
+        return await process_event(event)
+
+
+async def process_event(event):
+    """
+    Processes one Telegram update or scheduled task.
 
     Args:
         event (dict): The AWS Lambda event containing the update payload from Telegram.
             - event["body"]: A JSON string representing the Telegram update.
+            - event["task"]: Set instead of "body" by scheduled invocations ("process_reminders", "process_outbox",
+              "warm_up").
+            - event["httpMethod"]: "GET" for the Web App form page served on the "/form" route.
 
     Returns:
         dict: A dictionary containing the HTTP response with a status code and message.
     """
+    # The Web App form page is static per language and group: served without touching Telegram or Google Sheets.
+    if event.get("httpMethod") == "GET":
+        return serve_form(event)
+
     # Ensure that the application is fully initialized and ready to handle updates.
     await ensure_application_ready()
     # Initialize the application context if necessary.
     await globs.application.initialize()
 
     try:
+        # Scheduled keep-warm invocation (or a bare EventBridge schedule): refresh the token, the caches and the
+        # connections, without any update to process.
+        if event.get("task") == "warm_up" or ("task" not in event and event.get("source") == "aws.events"):
+            with get_tracer().span("task.warm_up"):
+                stats = await warm_up()
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"message": "Container warmed up.", **stats})
+            }
+
+        # Scheduled invocation: send reminders and decline stale join requests.
+        if event.get("task") == "process_reminders":
+            with get_tracer().span("task.process_reminders"):
+                stats = await get_reminder_scheduler().run(globs.application.bot, Bootstrap.get_google_sheets())
+                # Housekeeping is skipped when the reminders used up the budget; the next run catches up.
+                if not is_low_on_time():
+                    # Scheduled invocations also persist the funnel counters collected by this container.
+                    get_funnel_stats().flush(Bootstrap.get_google_sheets(), force=True)
+                    # Keep the shared Metadata change log small.
+                    google_sheets = Bootstrap.get_google_sheets()
+                    if google_sheets.metadata_cache:
+                        google_sheets.metadata_cache.compact(
+                            google_sheets, google_sheets.get_changes_sheet(), Config.CHANGES_LOG_MAX_ROWS
+                        )
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"message": "Reminders processed.", **stats})
+            }
+
+        # Scheduled invocation: perform the outbox jobs that are due (retries and jobs left by timed-out updates).
+        if event.get("task") == "process_outbox":
+            with get_tracer().span("task.process_outbox"):
+                stats = await get_outbox().drain(Bootstrap.get_google_sheets())
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"message": "Outbox processed.", **stats})
+            }
+
+        # Learn the public URL of the API from the webhook request, for the Web App form button.
+        discover_form_url(event)
+
+        # Record the scrubbed update if its user is sampled for production-shaped replays.
+        get_update_recorder().record(event["body"])
+
         # Parse the incoming event body as JSON to extract update data from Telegram.
         update_data = json.loads(event["body"])
         # Convert the parsed update data to a Telegram Update object.
         update = Update.de_json(update_data, globs.application.bot)
 
-        # Pass the update to the application's update processing logic.
-        await globs.application.process_update(update)
+        # Pass the update to the application's update processing logic. Every record logged while
+        # processing it carries the update and user IDs, so one update can be followed across log lines.
+        user = update.effective_user
+        # The update is the root span of the trace; its critical-path summary is logged when it ends.
+        with log_context(update_id=update.update_id, user_id=user.id if user else None), \
+                get_tracer().span("update", update_id=update.update_id):
+            await globs.application.process_update(update)
+
+            # Persist the funnel counters if the flush interval has elapsed (they stay in memory when time is short).
+            if not is_low_on_time():
+                get_funnel_stats().flush(Bootstrap.get_google_sheets())
+
+            # The applicant has been answered: perform the outbox jobs enqueued by this update while time is left.
+            await get_outbox().run_claimed(Bootstrap.get_google_sheets())
 
         # Return a successful HTTP response indicating that the update was processed.
         return {
@@ -39,7 +132,7 @@ async def async_lambda_handler(event):
 
     except json.JSONDecodeError as e:
         # Handle cases where the event body is not valid JSON.
-        logger.error(f"JSON decoding error: {e}. Event: {event}")
+        logger.error("JSON decoding error: %s (body of %d characters).", e, len(event.get("body") or ""))
         return {
             "statusCode": 200,
             "body": json.dumps({"message": "Invalid JSON payload."})
@@ -47,7 +140,7 @@ async def async_lambda_handler(event):
 
     except Exception as e:
         # Catch any unexpected errors that occur during processing and log them.
-        logger.error(f"Unexpected error: {e}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         return {
             "statusCode": 200,
             "body": json.dumps({"message": "Internal server error occurred."})
@@ -61,7 +154,7 @@ def lambda_handler(event, context):
 
     Args:
         event (dict): The AWS Lambda event containing the update payload from Telegram.
-        context (object): The AWS Lambda context object (unused in this implementation).
+        context (object): The AWS Lambda context object, whose remaining time bounds the processing.
 
     Returns:
         dict: The HTTP response returned by the asynchronous handler.
@@ -69,4 +162,8 @@ def lambda_handler(event, context):
     # Entry point for the AWS Lambda function.
     # It triggers the asynchronous handler to process incoming Telegram updates.
     loop = asyncio.get_event_loop()
-    return loop.run_until_complete(async_lambda_handler(event))
\ No newline at end of file
+    try:
+        return loop.run_until_complete(async_lambda_handler(event, Deadline.from_context(context)))
+    finally:
+        # The container may be frozen as soon as the handler returns: write out the queued log records first.
+        flush_logs()
\ No newline at end of file
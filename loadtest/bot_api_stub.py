@@ -0,0 +1,248 @@
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Bot user returned by getMe.
+STUB_BOT = {
+    "id": 1000000001,
+    "is_bot": True,
+    "first_name": "Load Test Bot",
+    "username": "load_test_bot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": False,
+    "supports_inline_queries": False,
+}
+
+# Methods subject to the injected 429 errors: Telegram applies flood control to messaging calls.
+RATE_LIMITED_METHODS = frozenset({
+    "sendMessage", "editMessageText", "answerCallbackQuery", "approveChatJoinRequest", "declineChatJoinRequest",
+})
+
+
+class BotApiStub:
+    """
+    Local HTTP server imitating the Telegram Bot API methods used by the bot, with configurable latency
+    and injected 429 (RetryAfter) and 403 (Forbidden) errors. Point TELEGRAM_API_BASE_URL at `base_url`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, retry_after_rate=0.0,
+                 retry_after=1, forbidden_rate=0.0, seed=None):
+        """
+        Creates the server; call `start` to serve requests in a background thread.
+
+        Args:
+            host (str): The interface to listen on.
+            port (int): The port to listen on (0 picks a free port).
+            latency_ms (float): Fixed delay added to every response.
+            jitter_ms (float): Upper bound of a uniformly distributed extra delay.
+            retry_after_rate (float): Share of messaging requests answered with 429 Too Many Requests.
+            retry_after (int): The retry_after value (seconds) of the injected 429 responses.
+            forbidden_rate (float): Share of messages to users answered with 403 (bot blocked by the user).
+            seed (int, optional): Seed of the fault injection, for reproducible runs.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+        self.forbidden_rate = forbidden_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.message_ids = itertools.count(1)
+        self.calls = Counter()  # Method -> number of requests.
+        self.errors = Counter()  # (method, HTTP status) -> number of injected errors.
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        """
+        Returns:
+            str: The value for TELEGRAM_API_BASE_URL, e.g. "http://127.0.0.1:8081/bot".
+        """
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        """
+        Serves requests in a daemon thread.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, name="bot-api-stub", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops serving and closes the listening socket.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        """
+        Returns:
+            type: The request handler class bound to this stub.
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                status, payload = stub.respond(method, stub.parse_params(self.headers.get("Content-Type", ""), body))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up on the request (e.g. its timeout expired).
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass  # Keep the load-test output readable.
+
+        return Handler
+
+    @staticmethod
+    def parse_params(content_type, body):
+        """
+        Decodes the request parameters (PTB sends URL-encoded forms, other clients may send JSON).
+
+        Args:
+            content_type (str): The Content-Type header.
+            body (bytes): The request body.
+
+        Returns:
+            dict: The parameters; JSON-encoded values stay strings.
+        """
+        if not body:
+            return {}
+        if content_type.startswith("application/json"):
+            return json.loads(body)
+        return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+    def respond(self, method, params):
+        """
+        Builds the response of a Bot API call after the configured delay, injecting errors at the configured rates.
+
+        Args:
+            method (str): The Bot API method (e.g. "sendMessage").
+            params (dict): The request parameters.
+
+        Returns:
+            tuple: (HTTP status, response body).
+        """
+        with self.lock:
+            self.calls[method] += 1
+            roll = self.random.random()
+            delay = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000
+            message_id = next(self.message_ids)
+        if delay:
+            time.sleep(delay)
+
+        if method in RATE_LIMITED_METHODS and roll < self.retry_after_rate:
+            return self._error(method, 429, f"Too Many Requests: retry after {self.retry_after}",
+                               {"retry_after": self.retry_after})
+        chat_id = str(params.get("chat_id", ""))
+        if method in ("sendMessage", "editMessageText") and not chat_id.startswith("-") \
+                and roll < self.retry_after_rate + self.forbidden_rate:
+            return self._error(method, 403, "Forbidden: bot was blocked by the user")
+
+        return 200, {"ok": True, "result": self.result(method, params, message_id)}
+
+    def _error(self, method, status, description, parameters=None):
+        """
+        Returns:
+            tuple: (HTTP status, error body) in the Bot API format.
+        """
+        with self.lock:
+            self.errors[(method, status)] += 1
+        payload = {"ok": False, "error_code": status, "description": description}
+        if parameters:
+            payload["parameters"] = parameters
+        return status, payload
+
+    @staticmethod
+    def result(method, params, message_id):
+        """
+        Builds a minimal valid result object for a Bot API method.
+
+        Args:
+            method (str): The Bot API method.
+            params (dict): The request parameters.
+            message_id (int): The ID of a sent message.
+
+        Returns:
+            object: The "result" field of the response.
+        """
+        if method == "getMe":
+            return STUB_BOT
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id") or 0)
+            return {
+                "message_id": int(params.get("message_id") or message_id),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+                "from": STUB_BOT,
+                "text": params.get("text", ""),
+            }
+        if method == "getChat":
+            chat_id = int(params.get("chat_id") or 0)
+            return {
+                "id": chat_id,
+                "type": "private",
+                "first_name": f"User {chat_id}",
+                "username": f"user{chat_id}",
+                "bio": "Load test applicant",
+                "accent_color_id": 0,
+                "max_reaction_count": 11,
+            }
+        # answerCallbackQuery, approveChatJoinRequest, declineChatJoinRequest and the rest.
+        return True
+
+    def report(self):
+        """
+        Returns:
+            dict: Request counts per method and injected error counts per method and status.
+        """
+        with self.lock:
+            return {
+                "calls": dict(self.calls),
+                "errors": {f"{method} {status}": count for (method, status), count in self.errors.items()},
+            }
+
+
+def main():
+    """
+    Command-line entry point:
+    python -m loadtest.bot_api_stub --port 8081 [--latency-ms 50] [--retry-after-rate 0.01] [--forbidden-rate 0.01]
+    """
+    parser = argparse.ArgumentParser(description="Serve a local stub of the Telegram Bot API.")
+    parser.add_argument("--host", default="127.0.0.1", help="The interface to listen on.")
+    parser.add_argument("--port", type=int, default=8081, help="The port to listen on.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed delay of every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Maximum extra random delay.")
+    parser.add_argument("--retry-after-rate", type=float, default=0, help="Share of 429 responses.")
+    parser.add_argument("--forbidden-rate", type=float, default=0, help="Share of 403 responses to user messages.")
+    args = parser.parse_args()
+
+    stub = BotApiStub(args.host, args.port, args.latency_ms, args.jitter_ms, args.retry_after_rate,
+                      forbidden_rate=args.forbidden_rate)
+    print(f"Serving the Bot API stub at {stub.base_url} (set TELEGRAM_API_BASE_URL to this value).")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(stub.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
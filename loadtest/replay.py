@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from loadtest.run import LoadTestStack, add_stack_arguments, write_report
+
+# Prefix of the log records carrying a recorded update (see shared/telegram_bot/recording.py).
+RECORD_MARKER = "recorded_update"
+
+
+def parse_line(line):
+    """
+    Extracts a recorded update from one line of a recording. Accepts the JSON Lines written by the file sink,
+    and log lines exported from CloudWatch (JSON log records or plain text containing the record marker).
+
+    Args:
+        line (str): The line.
+
+    Returns:
+        dict | None: The {"ts", "update"} entry, or None if the line holds no recorded update.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        entry = json.loads(line)
+        if "update" in entry and "ts" in entry:
+            return entry
+        line = str(entry.get("message", ""))
+    if RECORD_MARKER not in line:
+        return None
+    return json.loads(line.split(RECORD_MARKER, 1)[1].strip())
+
+
+def load_recording(paths):
+    """
+    Reads recorded updates from one or more files, ordered by arrival time.
+
+    Args:
+        paths (list): The recording files.
+
+    Returns:
+        list: The {"ts", "update"} entries.
+    """
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as recording:
+            entries.extend(entry for entry in map(parse_line, recording) if entry)
+    # Several containers may record the same update when Telegram retried a webhook; keep the first copy.
+    seen, unique = set(), []
+    for entry in sorted(entries, key=lambda entry: entry["ts"]):
+        if entry["update"].get("update_id") not in seen:
+            seen.add(entry["update"].get("update_id"))
+            unique.append(entry)
+    return unique
+
+
+def classify(update):
+    """
+    Returns:
+        str: The kind of update, used to group the latencies (e.g. "join_request", "callback:lang", "message").
+    """
+    if "chat_join_request" in update:
+        return "join_request"
+    if "callback_query" in update:
+        return "callback:" + str(update["callback_query"].get("data", "")).split("_")[0]
+    if "message" in update:
+        return "command" if str(update["message"].get("text", "")).startswith("/") else "message"
+    return next((key for key in update if key != "update_id"), "other")
+
+
+def sender_of(update):
+    """
+    Returns:
+        int | None: The ID of the user who sent the update (updates of one user are replayed in order).
+    """
+    for value in update.values():
+        if isinstance(value, dict) and isinstance(value.get("from"), dict):
+            return value["from"].get("id")
+    return None
+
+
+def retarget_groups(update, group_chat_id):
+    """
+    Points join requests at the group configured for the replay; recorded group IDs are pseudonyms
+    that no tenant is configured for.
+
+    Args:
+        update (dict): The recorded update, modified in place.
+        group_chat_id (int): The group chat ID of the replay.
+    """
+    join_request = update.get("chat_join_request")
+    if join_request and isinstance(join_request.get("chat"), dict):
+        join_request["chat"]["id"] = group_chat_id
+
+
+async def replay(args):
+    """
+    Replays a recording through the webhook handler and returns the report.
+
+    Args:
+        args (Namespace): The parsed command-line arguments.
+
+    Returns:
+        dict: Throughput, latency percentiles and error counts of the replay.
+    """
+    entries = load_recording(args.recording)
+    if not entries:
+        raise SystemExit("The recording holds no updates.")
+    stack = LoadTestStack(args)
+    await stack.start()
+    group_chat_id = int(os.environ["DEFAULT_GROUP_CHAT_ID"])
+    latencies, outcomes = {}, Counter()
+    last_task_of_user = {}
+    first_ts = entries[0]["ts"]
+
+    async def deliver(entry, previous):
+        # Telegram delivers the updates of one user in order: wait for the user's previous update first.
+        if previous:
+            await previous
+        await stack.send(classify(entry["update"]), entry["update"], latencies, outcomes)
+
+    started_at = time.perf_counter()
+    tasks = []
+    for entry in entries:
+        if args.speed > 0:
+            # Keep the recorded gaps, compressed by the speed factor.
+            delay = started_at + (entry["ts"] - first_ts) / args.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        retarget_groups(entry["update"], group_chat_id)
+        sender = sender_of(entry["update"])
+        task = asyncio.create_task(deliver(entry, last_task_of_user.get(sender)))
+        if sender is not None:
+            last_task_of_user[sender] = task
+        tasks.append(task)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "recording": args.recording,
+        "speed": args.speed,
+        "recorded_span_s": round(entries[-1]["ts"] - first_ts, 2),
+        **stack.report(latencies, outcomes, elapsed),
+    }
+
+
+def compare(report, baseline):
+    """
+    Renders the differences between a replay and a baseline replay of the same recording.
+
+    Args:
+        report (dict): The report of the candidate build.
+        baseline (dict): The report of the current build.
+
+    Returns:
+        str: One line per metric: baseline, candidate and relative change.
+    """
+    rows = [("throughput_updates_per_s", baseline["throughput_updates_per_s"], report["throughput_updates_per_s"]),
+            ("error_rate", baseline["error_rate"], report["error_rate"])]
+    for step, percentiles in report["latency_ms"].items():
+        for name, value in percentiles.items():
+            rows.append((f"{step} {name} ms", baseline["latency_ms"].get(step, {}).get(name, 0), value))
+    lines = []
+    for metric, before, after in rows:
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        lines.append(f"{metric:<32} {before:>10} {after:>10} {change:>9}")
+    return "\n".join([f"{'metric':<32} {'baseline':>10} {'candidate':>10} {'change':>9}", *lines])
+
+
+def main():
+    """
+    Command-line entry point:
+    python -m loadtest.replay recording.jsonl [--speed 10] [--report candidate.json] [--compare baseline.json]
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay recorded (scrubbed) production updates through the webhook handler against local doubles."
+    )
+    parser.add_argument("recording", nargs="+", help="Recording files (JSON Lines or exported log lines).")
+    parser.add_argument("--speed", type=float, default=1,
+                        help="Replay speed: 1 keeps the recorded timing, 10 is ten times faster, 0 sends at once.")
+    parser.add_argument("--compare", help="Report of a baseline replay to compare the results with.")
+    add_stack_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(replay(args))
+    write_report(report, args.report)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            print(compare(report, json.load(baseline_file)))
+
+
+if __name__ == "__main__":
+    main()
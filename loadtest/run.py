@@ -0,0 +1,370 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+# Placeholder settings of the stack under test; Config validates them at import time, so they are set first.
+LOADTEST_ENV = {
+    "TELEGRAM_BOT_TOKEN": "123456:LOADTEST",
+    "GROUP_INVITE_LINK": "https://t.me/+loadtest",
+    "ADMIN_CHAT_ID": "-1000000000002",
+    "DEFAULT_GROUP_CHAT_ID": "-1000000000001",
+    "GOOGLE_SHEET_ID": "loadtest",
+    "PRIVACY_POLICY_URL_EN": "https://example.com/privacy",
+    "PRIVACY_POLICY_URL_RU": "https://example.com/privacy",
+    "PRIVACY_POLICY_URL_KZ": "https://example.com/privacy",
+    # The webhook events of the load test carry no API Gateway request context to derive the form URL from.
+    "WEBAPP_URL": "https://example.com/form",
+    # Synthetic applicants answer without human pauses (and replays compress them): lift the per-user inbound limit.
+    "INBOUND_USER_RATE": "1000",
+    "INBOUND_USER_BURST": "1000",
+    "LOG_LEVEL": "WARNING",
+}
+
+# Directory of the Lambda entry point (deployed as the package root, so it is imported as `lambda_function`).
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambdas", "telegram_bot")
+
+
+class LogCounter(logging.Handler):
+    """
+    Counts the WARNING and ERROR records of the bot logger; handler exceptions are reported there,
+    not in the webhook response.
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.counts = Counter()
+
+    def emit(self, record):
+        self.counts[record.levelname] += 1
+
+
+def percentile(values, share):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (list): The sorted samples.
+        share (float): The percentile as a share (e.g. 0.99).
+
+    Returns:
+        float: The sample at the percentile, or 0 without samples.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(share * len(values))) - 1))]
+
+
+class ApplicantFunnel:
+    """
+    Builds the webhook updates of one synthetic applicant going through the whole funnel:
+    join request, language selection (unless preselected), privacy acceptance and one valid answer per question
+    (or all the answers in one Web App form submission).
+    """
+    update_ids = itertools.count(1)
+    # Telegram language code of the applicant's client per bot language.
+    LANGUAGE_CODES = {"ru": "ru", "kz": "kk", "en": "en"}
+
+    def __init__(self, user_id, group_chat_id, lang, schema, preselected=False, webapp=False):
+        """
+        Args:
+            user_id (int): The Telegram user ID of the applicant.
+            group_chat_id (int): The requested group.
+            lang (str): The language the applicant selects.
+            schema (QuestionnaireSchema): The questionnaire, used to produce valid answers.
+            preselected (bool): Whether the bot preselects the language from the join request, skipping the menu.
+            webapp (bool): Whether the applicant submits the Web App form instead of answering in the chat.
+        """
+        self.user_id = user_id
+        self.group_chat_id = group_chat_id
+        self.lang = lang
+        self.schema = schema
+        self.preselected = preselected
+        self.webapp = webapp
+        self.user = {
+            "id": user_id, "is_bot": False, "first_name": f"Applicant {user_id}",
+            "language_code": self.LANGUAGE_CODES[lang],
+        }
+        self.private_chat = {"id": user_id, "type": "private", "first_name": self.user["first_name"]}
+
+    def _update(self, **fields):
+        return {"update_id": next(self.update_ids), **fields}
+
+    def _callback(self, data):
+        return self._update(callback_query={
+            "id": f"{self.user_id}{data}",
+            "from": self.user,
+            "chat_instance": str(self.user_id),
+            "data": data,
+            "message": {"message_id": 1, "date": int(time.time()), "chat": self.private_chat, "text": "..."},
+        })
+
+    def _message(self, text=None, **fields):
+        return self._update(message={
+            "message_id": next(self.update_ids),
+            "date": int(time.time()),
+            "chat": self.private_chat,
+            "from": self.user,
+            **({"text": text} if text is not None else {}),
+            **fields,
+        })
+
+    def answer(self, question):
+        """
+        Args:
+            question (Question): The question to answer.
+
+        Returns:
+            str: An answer that passes the question's validation.
+        """
+        if question.type == "age":
+            return str(18 + self.user_id % 40)
+        if question.type == "email":
+            return f"applicant{self.user_id}@example.com"
+        if question.type == "phone":
+            return f"+7700{self.user_id % 10_000_000:07d}"
+        return f"Answer {question.index + 1} of applicant {self.user_id}"
+
+    def steps(self):
+        """
+        Yields:
+            tuple: (step name, update) in funnel order.
+        """
+        yield "join_request", self._update(chat_join_request={
+            "chat": {"id": self.group_chat_id, "type": "supergroup", "title": "Load Test Group"},
+            "from": self.user,
+            "user_chat_id": self.user_id,
+            "date": int(time.time()),
+        })
+        if not self.preselected:
+            yield "language", self._callback(f"lang_{self.lang}")
+        yield "privacy", self._callback("privacy_accept")
+        if self.webapp:
+            answers = {question.field_id: self.answer(question) for question in self.schema.questions}
+            yield "webapp_form", self._message(web_app_data={
+                "data": json.dumps({"answers": answers}), "button_text": "Open the form",
+            })
+            return
+        for question in self.schema.questions:
+            yield "answer", self._message(self.answer(question))
+
+
+class LoadTestStack:
+    """
+    The bot stack under test: the real webhook handler wired to the Bot API stub and the in-memory Sheets double.
+    """
+
+    def __init__(self, args):
+        """
+        Args:
+            args (Namespace): Parsed arguments added by `add_stack_arguments`.
+        """
+        self.args = args
+        self.stub = None
+        self.sheets = None
+        self.handler = None
+        self.log_counter = LogCounter()
+        self.flush_logs = None
+
+    async def start(self):
+        """
+        Starts the doubles, imports the bot against them and warms the container outside of the measurement.
+        """
+        from loadtest.bot_api_stub import BotApiStub
+
+        args = self.args
+        self.stub = BotApiStub(latency_ms=args.telegram_latency_ms, jitter_ms=args.telegram_jitter_ms,
+                               retry_after_rate=args.retry_after_rate, forbidden_rate=args.forbidden_rate,
+                               seed=args.seed)
+        self.stub.start()
+        os.environ["TELEGRAM_API_BASE_URL"] = self.stub.base_url
+        for key, value in LOADTEST_ENV.items():
+            os.environ.setdefault(key, value)
+
+        # The storage double must be in place before the bot modules open their Sheets connection.
+        from loadtest import sheets_double
+        self.sheets = sheets_double.install(args.sheets_latency_ms)
+        sys.path.insert(0, LAMBDA_DIR)
+        import lambda_function
+        from shared.telegram_bot.logger import flush_logs, logger
+        from shared.telegram_bot.prewarm import prewarm
+
+        logger.addHandler(self.log_counter)
+        self.flush_logs = flush_logs
+        self.handler = lambda_function.async_lambda_handler
+        # The entry point skips its init-phase pre-warming inside a running loop; warm the same way here,
+        # unless a cold container is simulated.
+        if not args.cold:
+            await prewarm()
+
+    async def send(self, step, update, latencies, outcomes):
+        """
+        Sends one update through the webhook handler and accounts for its latency and response.
+
+        Args:
+            step (str): The kind of update, used to group the latencies.
+            update (dict): The webhook update.
+            latencies (dict): Step name -> list of latencies in ms, updated in place.
+            outcomes (Counter): Response messages, updated in place.
+        """
+        started_at = time.perf_counter()
+        try:
+            response = await self.handler({"body": json.dumps(update)})
+            outcome = json.loads(response["body"]).get("message", "")
+        except Exception as e:
+            # The invocation itself failed (Lambda would report an error and retry the webhook).
+            outcome = f"{type(e).__name__} raised"
+        latencies.setdefault(step, []).append((time.perf_counter() - started_at) * 1000)
+        outcomes[outcome] += 1
+
+    def report(self, latencies, outcomes, elapsed):
+        """
+        Stops the stack and builds the report.
+
+        Args:
+            latencies (dict): Step name -> list of latencies in ms.
+            outcomes (Counter): Response messages.
+            elapsed (float): Duration of the measured run in seconds.
+
+        Returns:
+            dict: Throughput, latency percentiles and error counts.
+        """
+        self.flush_logs()
+        self.stub.stop()
+        all_latencies = sorted(value for values in latencies.values() for value in values)
+        updates = len(all_latencies)
+        # The document is missing if the bot never managed to open its connection.
+        document = self.sheets.documents.get(os.environ["GOOGLE_SHEET_ID"])
+        main_rows = len(document.sheet1.cells) - 1 if document else 0
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "updates": updates,
+            "throughput_updates_per_s": round(updates / elapsed, 1) if elapsed else 0,
+            "completed_applications": main_rows,
+            "latency_ms": {
+                step: {
+                    "p50": round(percentile(values, 0.5), 1),
+                    "p90": round(percentile(values, 0.9), 1),
+                    "p99": round(percentile(values, 0.99), 1),
+                    "max": round(values[-1], 1) if values else 0,
+                }
+                for step, values in [("all", all_latencies)] + sorted((k, sorted(v)) for k, v in latencies.items())
+            },
+            "responses": dict(outcomes),
+            "error_rate": round(1 - outcomes["Update processed successfully."] / updates, 4) if updates else 0,
+            "log_records": dict(self.log_counter.counts),
+            "telegram": self.stub.report(),
+            "sheets_requests": dict(self.sheets.requests),
+        }
+
+
+def add_stack_arguments(parser):
+    """
+    Adds the options of the doubles (latencies, injected errors) and of the report to a parser.
+
+    Args:
+        parser (ArgumentParser): The parser to extend.
+    """
+    parser.add_argument("--telegram-latency-ms", type=float, default=30, help="Bot API stub response delay.")
+    parser.add_argument("--telegram-jitter-ms", type=float, default=20, help="Maximum extra Bot API delay.")
+    parser.add_argument("--retry-after-rate", type=float, default=0, help="Share of 429 Bot API responses.")
+    parser.add_argument("--forbidden-rate", type=float, default=0, help="Share of 403 responses to user messages.")
+    parser.add_argument("--sheets-latency-ms", type=float, default=100, help="Simulated Sheets request duration.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the think times and fault injection.")
+    parser.add_argument("--report", help="Optional path of a JSON file receiving the report.")
+    parser.add_argument("--cold", action="store_true",
+                        help="Skip the warm-up, so the first updates open the Sheets connection (like PREWARM=false).")
+
+
+def write_report(report, path=None):
+    """
+    Prints the report and optionally saves it as JSON.
+
+    Args:
+        report (dict): The report.
+        path (str, optional): The output file.
+    """
+    print(json.dumps(report, indent=2))
+    if path:
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+async def run_funnel(stack, funnel, think_ms, latencies, outcomes):
+    """
+    Sends the updates of one applicant one after another through the webhook handler.
+
+    Args:
+        stack (LoadTestStack): The started stack.
+        funnel (ApplicantFunnel): The applicant.
+        think_ms (float): Mean pause between two steps of the applicant.
+        latencies (dict): Step name -> list of latencies in ms, updated in place.
+        outcomes (Counter): Response messages, updated in place.
+    """
+    for step, update in funnel.steps():
+        if think_ms:
+            await asyncio.sleep(random.expovariate(1000 / think_ms))
+        await stack.send(step, update, latencies, outcomes)
+
+
+async def run(args):
+    """
+    Runs the load test and returns its report.
+
+    Args:
+        args (Namespace): The parsed command-line arguments.
+
+    Returns:
+        dict: Throughput, latency percentiles and error counts.
+    """
+    stack = LoadTestStack(args)
+    await stack.start()
+    from shared.telegram_bot.config import Config
+    from shared.telegram_bot.questionnaire import SCHEMA
+
+    random.seed(args.seed)
+    group_chat_id = int(os.environ["DEFAULT_GROUP_CHAT_ID"])
+    langs = ["ru", "kz", "en"]
+    funnels = [
+        ApplicantFunnel(args.first_user_id + i, group_chat_id, langs[i % len(langs)], SCHEMA,
+                        Config.PRESELECT_LANGUAGE, Config.WEBAPP_FORM)
+        for i in range(args.users)
+    ]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, outcomes = {}, Counter()
+
+    async def limited(funnel):
+        async with semaphore:
+            await run_funnel(stack, funnel, args.think_ms, latencies, outcomes)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(limited(funnel) for funnel in funnels))
+    elapsed = time.perf_counter() - started_at
+    return {"users": args.users, "concurrency": args.concurrency, **stack.report(latencies, outcomes, elapsed)}
+
+
+def main():
+    """
+    Command-line entry point:
+    python -m loadtest.run --users 200 --concurrency 50 [--telegram-latency-ms 40] [--sheets-latency-ms 150]
+    """
+    parser = argparse.ArgumentParser(
+        description="Drive synthetic applicant funnels through the webhook handler against local doubles."
+    )
+    parser.add_argument("--users", type=int, default=100, help="Number of synthetic applicants.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Applicants in flight at the same time.")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between two steps of an applicant.")
+    parser.add_argument("--first-user-id", type=int, default=500000000, help="Telegram ID of the first applicant.")
+    add_stack_arguments(parser)
+    args = parser.parse_args()
+    write_report(asyncio.run(run(args)), args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from gspread import exceptions
+
+# A1 notation of a cell or range ("F1", "A2:D500", "C2:C5001").
+A1_PATTERN = re.compile(r"^([A-Z]+)(\d+)?(?::([A-Z]+)(\d+)?)?$")
+
+
+def column_number(letters):
+    """
+    Args:
+        letters (str): Column letters (e.g. "AB").
+
+    Returns:
+        int: The 1-based column number.
+    """
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def numericise(value):
+    """
+    Converts numeric strings the way gspread's get_all_records does by default.
+
+    Args:
+        value (str): The cell value.
+
+    Returns:
+        int | float | str: The converted value.
+    """
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+class InMemoryWorksheet:
+    """
+    Worksheet double implementing the subset of the gspread Worksheet API used by the bot.
+    Every API call optionally sleeps for a fixed latency, blocking the caller like a real HTTP request.
+    """
+
+    def __init__(self, spreadsheet, title, rows=1000, cols=26):
+        """
+        Args:
+            spreadsheet (InMemorySpreadsheet): The document holding the worksheet.
+            title (str): The worksheet title.
+            rows (int): The initial grid row count.
+            cols (int): The initial grid column count.
+        """
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self.cells = []  # Rows of string values, without trailing empty rows.
+
+    def _call(self, method):
+        """
+        Accounts for one API request and waits for the simulated latency.
+
+        Args:
+            method (str): The gspread method name.
+        """
+        self.spreadsheet.client.record(method)
+
+    def _bounds(self, a1):
+        """
+        Resolves an A1 range to 0-based (first row, last row, first column, last column), inclusive.
+
+        Args:
+            a1 (str): The A1 range, optionally prefixed with the worksheet title.
+
+        Returns:
+            tuple: The range bounds.
+        """
+        match = A1_PATTERN.match(a1.split("!")[-1].replace("$", ""))
+        if not match:
+            raise ValueError(f"Unsupported A1 range: {a1}")
+        first_column, first_row, last_column, last_row = match.groups()
+        last_column = last_column or first_column
+        last_row = last_row or (first_row if not match.group(3) else None)
+        return (
+            int(first_row or 1) - 1,
+            int(last_row) - 1 if last_row else max(self.row_count, len(self.cells)) - 1,
+            column_number(first_column) - 1,
+            column_number(last_column) - 1,
+        )
+
+    def _read(self, a1):
+        """
+        Reads a range, omitting trailing empty cells and rows like the Sheets API.
+
+        Args:
+            a1 (str): The A1 range.
+
+        Returns:
+            list: The 2D list of cell values.
+        """
+        first_row, last_row, first_column, last_column = self._bounds(a1)
+        values = []
+        for row in self.cells[first_row:last_row + 1]:
+            cells = row[first_column:last_column + 1]
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def _write(self, a1, values):
+        """
+        Writes a 2D list of values starting at the top-left cell of a range.
+
+        Args:
+            a1 (str): The A1 range.
+            values (list): The 2D list of cell values.
+        """
+        first_row, _, first_column, _ = self._bounds(a1)
+        for row_offset, row_values in enumerate(values):
+            row_index = first_row + row_offset
+            while len(self.cells) <= row_index:
+                self.cells.append([])
+            row = self.cells[row_index]
+            for column_offset, value in enumerate(row_values):
+                column_index = first_column + column_offset
+                row.extend([""] * (column_index + 1 - len(row)))
+                row[column_index] = "" if value is None else str(value)
+        self.row_count = max(self.row_count, len(self.cells))
+
+    def append_row(self, values, **kwargs):
+        self._call("append_row")
+        with self.spreadsheet.client.lock:
+            while self.cells and not any(self.cells[-1]):
+                self.cells.pop()
+            self.cells.append(["" if value is None else str(value) for value in values])
+            row_number = len(self.cells)
+            self.row_count = max(self.row_count, row_number)
+        return {"updates": {"updatedRange": f"{self.title}!A{row_number}:Z{row_number}"}}
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows")
+        with self.spreadsheet.client.lock:
+            while self.cells and not any(self.cells[-1]):
+                self.cells.pop()
+            first_row = len(self.cells) + 1
+            self.cells.extend(["" if value is None else str(value) for value in row] for row in values)
+            self.row_count = max(self.row_count, len(self.cells))
+        return {"updates": {"updatedRange": f"{self.title}!A{first_row}:Z{len(self.cells)}"}}
+
+    def get_all_values(self, **kwargs):
+        self._call("get_all_values")
+        with self.spreadsheet.client.lock:
+            return [list(row) for row in self.cells]
+
+    def get_all_records(self, **kwargs):
+        self._call("get_all_records")
+        with self.spreadsheet.client.lock:
+            if not self.cells:
+                return []
+            header = self.cells[0]
+            return [
+                {name: numericise(value) for name, value in zip(header, row + [""] * (len(header) - len(row)))}
+                for row in self.cells[1:]
+            ]
+
+    def row_values(self, row, **kwargs):
+        self._call("row_values")
+        with self.spreadsheet.client.lock:
+            return list(self.cells[row - 1]) if row <= len(self.cells) else []
+
+    def get(self, range_name=None, **kwargs):
+        self._call("get")
+        with self.spreadsheet.client.lock:
+            return self._read(range_name)
+
+    def batch_get(self, ranges, **kwargs):
+        self._call("batch_get")
+        with self.spreadsheet.client.lock:
+            return [self._read(a1) for a1 in ranges]
+
+    def update(self, values=None, range_name=None, **kwargs):
+        # Accept both the gspread 6 order (values, range_name) and the legacy one (range_name, values).
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self._call("update")
+        with self.spreadsheet.client.lock:
+            self._write(range_name or "A1", values)
+
+    def batch_update(self, data, **kwargs):
+        self._call("batch_update")
+        with self.spreadsheet.client.lock:
+            for update in data:
+                self._write(update["range"], update["values"])
+
+    def batch_clear(self, ranges):
+        self._call("batch_clear")
+        with self.spreadsheet.client.lock:
+            for a1 in ranges:
+                first_row, last_row, first_column, last_column = self._bounds(a1)
+                for row in self.cells[first_row:last_row + 1]:
+                    for column_index in range(first_column, min(last_column + 1, len(row))):
+                        row[column_index] = ""
+
+    def resize(self, rows=None, cols=None):
+        self._call("resize")
+        with self.spreadsheet.client.lock:
+            if rows is not None:
+                self.row_count = rows
+                del self.cells[rows:]
+            if cols is not None:
+                self.col_count = cols
+
+
+class InMemorySpreadsheet:
+    """
+    Document double holding in-memory worksheets.
+    """
+
+    def __init__(self, client, key, header=None):
+        """
+        Args:
+            client (InMemoryClient): The client that opened the document.
+            key (str): The document ID.
+            header (list, optional): Header row of the first worksheet (the main sheet).
+        """
+        self.client = client
+        self.id = key
+        self.sheets = [InMemoryWorksheet(self, "Sheet1")]
+        if header:
+            self.sheets[0].cells.append(list(header))
+
+    @property
+    def sheet1(self):
+        return self.sheets[0]
+
+    def worksheets(self):
+        self.client.record("worksheets")
+        return list(self.sheets)
+
+    def worksheet(self, title):
+        self.client.record("worksheet")
+        for sheet in self.sheets:
+            if sheet.title == title:
+                return sheet
+        raise exceptions.WorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows, cols, **kwargs):
+        self.client.record("add_worksheet")
+        sheet = InMemoryWorksheet(self, title, rows, cols)
+        self.sheets.append(sheet)
+        return sheet
+
+
+class InMemoryCredentials:
+    """
+    Credentials double: refreshing the token counts as one request of the client and yields a token valid for an hour.
+    """
+
+    def __init__(self, client):
+        """
+        Args:
+            client (InMemoryClient): The client counting the token requests.
+        """
+        self.client = client
+        self.token = None
+        self.expiry = None
+
+    def refresh(self, request):
+        self.client.record("refresh_token")
+        self.token = "in-memory"
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+
+class InMemoryClient:
+    """
+    Client double opening in-memory documents by ID, with a per-request latency and request counters.
+    """
+
+    def __init__(self, latency_ms=0.0, main_header=None):
+        """
+        Args:
+            latency_ms (float): Simulated duration of every Sheets API request.
+            main_header (list, optional): Header row of the main sheet of newly opened documents.
+        """
+        self.latency_ms = latency_ms
+        self.main_header = main_header
+        self.lock = threading.RLock()
+        self.documents = {}
+        self.requests = Counter()  # gspread method -> number of simulated API requests.
+        self.timeout = None  # Last request timeout set by the bot (the simulated latency does not time out).
+
+    def record(self, method):
+        """
+        Counts one API request and blocks for the simulated latency.
+
+        Args:
+            method (str): The gspread method name.
+        """
+        with self.lock:
+            self.requests[method] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def set_timeout(self, timeout=None):
+        self.timeout = timeout
+
+    def open_by_key(self, key):
+        self.record("open_by_key")
+        with self.lock:
+            if key not in self.documents:
+                self.documents[key] = InMemorySpreadsheet(self, key, self.main_header)
+            return self.documents[key]
+
+
+def install(latency_ms=0.0):
+    """
+    Routes the bot's Google Sheets access to in-memory documents: the credentials and client classes used by
+    `get_google_sheets_connection` are replaced by the doubles, so the connection is still opened by the bot's own
+    lazy code path (on pre-warming, or on the first request of a cold container), just without authenticating.
+    Must be called before the connection is opened (i.e. before importing the entry point, which pre-warms it).
+
+    Args:
+        latency_ms (float): Simulated duration of every Sheets API request.
+
+    Returns:
+        InMemoryClient: The client double, for inspecting documents and request counts.
+    """
+    import shared.telegram_bot.google_sheets as google_sheets
+
+    client = InMemoryClient(latency_ms, list(google_sheets.MAIN_COLUMNS))
+    google_sheets.Credentials = SimpleNamespace(
+        from_service_account_info=lambda info, **kwargs: InMemoryCredentials(client)
+    )
+    google_sheets.Client = lambda auth=None, **kwargs: client
+    google_sheets.CREDENTIALS = None
+    google_sheets.SHEET_CLIENT = None
+    google_sheets.MAIN_SHEET = None
+    google_sheets.METADATA_SHEETS = None
+    return client
@@ -0,0 +1,160 @@
+import argparse
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+from shared.telegram_bot.google_sheets import GoogleSheets
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.validation import Validation
+
+# Audited main sheet columns with their normalizer and validator.
+AUDITED_COLUMNS = {
+    "Email": (Validation.normalize_email, Validation.validate_email),
+    "Phone": (Validation.normalize_phone, Validation.validate_phone),
+    "Age": (Validation.normalize_age, Validation.validate_age),
+}
+
+# Column streamed alongside the audited ones so that the end of the data is detected reliably.
+ID_COLUMN = "User ID"
+
+# Issue types written to the report.
+ISSUE_MISSING = "missing"  # The cell is empty.
+ISSUE_INVALID = "invalid"  # The value is invalid even after normalization.
+ISSUE_FIXABLE = "fixable"  # The normalized value is valid but differs from the stored one.
+
+
+def audit_chunk(first_row, columns):
+    """
+    Validates and normalizes one chunk of the audited columns.
+    Runs in a worker process, so it only depends on picklable arguments and module-level helpers.
+
+    Args:
+        first_row (int): The sheet row number of the first value in the chunk.
+        columns (dict): Lists of cell values keyed by column name (including the ID column).
+
+    Returns:
+        list: (row, column, value, normalized, issue) tuples for every problematic cell.
+    """
+    issues = []
+    user_ids = columns[ID_COLUMN]
+    for column_name, (normalize, validate) in AUDITED_COLUMNS.items():
+        for offset, value in enumerate(columns[column_name]):
+            if not user_ids[offset]:
+                continue  # Skip rows without a user (blank separator rows).
+            value = str(value)
+            if not value.strip():
+                issues.append((first_row + offset, column_name, value, "", ISSUE_MISSING))
+                continue
+            normalized = normalize(value)
+            if not validate(normalized):
+                issues.append((first_row + offset, column_name, value, normalized, ISSUE_INVALID))
+            elif normalized != value:
+                issues.append((first_row + offset, column_name, value, normalized, ISSUE_FIXABLE))
+    return issues
+
+
+class SheetAuditor:
+    """
+    Re-validates every applicant row of the main sheet against the current validation rules.
+    The audited columns are streamed in row chunks and validated in a process pool while the next
+    chunk is being downloaded; fixable values can be written back with batched updates.
+    """
+    # Maximum number of cell ranges sent in one batch update request.
+    FIX_BATCH_SIZE = 500
+
+    def __init__(self, google_sheets, chunk_size=5000, workers=None):
+        """
+        Initializes the auditor.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            chunk_size (int): The number of rows fetched and validated per chunk.
+            workers (int, optional): The number of worker processes (defaults to the CPU count).
+        """
+        self.google_sheets = google_sheets
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def audit(self):
+        """
+        Streams the main sheet and validates it in parallel.
+
+        Returns:
+            tuple: (issues sorted by row, number of audited rows).
+        """
+        column_names = [ID_COLUMN, *AUDITED_COLUMNS]
+        futures = []
+        rows = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for first_row, columns in self.google_sheets.iter_column_chunks(
+                self.google_sheets.main_sheet, column_names, self.chunk_size
+            ):
+                rows += len(columns[ID_COLUMN])
+                futures.append(executor.submit(audit_chunk, first_row, columns))
+            issues = [issue for future in futures for issue in future.result()]
+        return sorted(issues), rows
+
+    @staticmethod
+    def write_report(issues, path):
+        """
+        Writes the problematic cells to a CSV report.
+
+        Args:
+            issues (list): (row, column, value, normalized, issue) tuples.
+            path (str): The path of the CSV report.
+        """
+        with open(path, "w", newline="", encoding="utf-8") as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(["Row", "Column", "Value", "Normalized", "Issue"])
+            writer.writerows(issues)
+
+    def fix(self, issues):
+        """
+        Writes the normalized values of fixable cells back to the main sheet in batched requests.
+
+        Args:
+            issues (list): (row, column, value, normalized, issue) tuples.
+
+        Returns:
+            int: The number of updated cells.
+        """
+        main_sheet = self.google_sheets.main_sheet
+        header = self.google_sheets.get_header(main_sheet)
+        letters = {name: self.google_sheets.column_letter(header.index(name) + 1) for name in AUDITED_COLUMNS}
+        updates = [
+            {"range": f"{letters[column]}{row}", "values": [[normalized]]}
+            for row, column, _, normalized, issue in issues
+            if issue == ISSUE_FIXABLE
+        ]
+        for start in range(0, len(updates), SheetAuditor.FIX_BATCH_SIZE):
+            batch = updates[start:start + SheetAuditor.FIX_BATCH_SIZE]
+            self.google_sheets.batch_update_cells(main_sheet, batch)
+        return len(updates)
+
+
+def main():
+    """
+    Command-line entry point: python -m shared.telegram_bot.audit [--report PATH] [--fix]
+    """
+    parser = argparse.ArgumentParser(description="Audit email, phone and age values of the main sheet.")
+    parser.add_argument("--report", default="audit_report.csv", help="Path of the CSV report of problematic cells.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Number of rows fetched per request.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--fix", action="store_true", help="Write normalized values of fixable cells back.")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    auditor = SheetAuditor(GoogleSheets(), args.chunk_size, args.workers)
+    issues, rows = auditor.audit()
+    auditor.write_report(issues, args.report)
+
+    counts = {}
+    for *_, issue in issues:
+        counts[issue] = counts.get(issue, 0) + 1
+    logger.info("Audited %d rows in %.1fs: %s. Report: %s", rows, time.monotonic() - started, counts, args.report)
+
+    if args.fix:
+        logger.info("Fixed %d cells.", auditor.fix(issues))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.forms import ApplicationForm
+from shared.telegram_bot.google_sheets import GoogleSheets, get_auxiliary_worksheet
+from shared.telegram_bot.localization import Localization
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.outbound import Priority, get_outbound_scheduler
+from shared.telegram_bot.outbox import (
+    JOB_APPROVE_JOIN_REQUEST,
+    OUTBOX_HEADER,
+    OUTBOX_SHEET_TITLE,
+    STATUS_DONE,
+    OutboxJob,
+)
+from shared.telegram_bot.tenants import get_tenant_registry
+
+# Applicant categories detected by the cross-reference of the Metadata and main sheets.
+COMPLETED_UNAPPROVED = "completed_unapproved"  # Finished form, saved to the main sheet, approval may be missing.
+COMPLETED_UNSAVED = "completed_unsaved"  # Finished form in Metadata, but no row in the main sheet.
+APPROVED_UNRECORDED = "approved_unrecorded"  # Row in the main sheet, but Metadata does not record the completion.
+
+# Report statuses that mean the user does not need to be processed again.
+FINAL_STATUSES = {"done", "already_handled"}
+
+# Fragments of Telegram errors meaning that the join request was already approved or no longer exists.
+ALREADY_HANDLED_ERRORS = ("user_already_participant", "hide_requester_missing")
+
+# Format of the "Updated At" (Metadata) and "DateTime" (main sheet) timestamps.
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class BacklogProcessor:
+    """
+    Finds applicants whose processing stopped halfway (timeout, Forbidden, killed Lambda) and finishes it.
+    The Metadata and main sheets are each read once and cross-referenced in memory.
+    Approvals and notifications run concurrently under the outbound rate limits,
+    and progress is written to a JSON report so an interrupted run can be resumed.
+    """
+
+    def __init__(self, google_sheets, bot, report_path, concurrency=10, lookback_days=None):
+        """
+        Initializes the processor.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            bot (Bot): The Telegram bot instance.
+            report_path (str): Path of the JSON progress report.
+            concurrency (int): Maximum number of users processed at the same time.
+            lookback_days (float, optional): Only applicants active within this many days are approved;
+                defaults to BACKLOG_LOOKBACK_DAYS.
+        """
+        self.google_sheets = google_sheets
+        self.lookback_days = Config.BACKLOG_LOOKBACK_DAYS if lookback_days is None else lookback_days
+        self.bot = bot
+        self.report_path = report_path
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.scheduler = get_outbound_scheduler()
+        self.localization = Localization()
+        self.tenants = get_tenant_registry()
+        self.report = self._load_report()
+
+    def _load_report(self):
+        """
+        Loads the progress report of a previous run, or creates an empty one.
+
+        Returns:
+            dict: The progress report.
+        """
+        if os.path.exists(self.report_path):
+            with open(self.report_path, encoding="utf-8") as report_file:
+                return json.load(report_file)
+        return {"started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "users": {}}
+
+    def _write_report(self):
+        """
+        Atomically writes the progress report to disk.
+        """
+        self.report["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tmp_path = f"{self.report_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report, report_file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.report_path)
+
+    def _is_complete(self, record):
+        """
+        Checks whether a Metadata record describes a finished questionnaire of its group.
+
+        Args:
+            record (dict): The Metadata record.
+
+        Returns:
+            bool: True if every question has been answered.
+        """
+        lang = record.get("Language")
+        raw_index = str(record.get("Current Question Index", "")).strip()
+        if not lang or not raw_index.lstrip("-").isdigit():
+            return False
+        return int(raw_index) >= len(self.tenants.resolve(record.get("Chat ID")).schema)
+
+    def _approved_user_ids(self):
+        """
+        Reads the applicants whose approval the outbox recorded as done.
+
+        Returns:
+            set: The user IDs.
+        """
+        worksheet = get_auxiliary_worksheet(OUTBOX_SHEET_TITLE, OUTBOX_HEADER)
+        rows = self.google_sheets.get_all_values(worksheet)
+        jobs = (OutboxJob.from_row(i + 2, row) for i, row in enumerate(rows[1:]))
+        return {
+            job.user_id for job in jobs
+            if job and job.kind == JOB_APPROVE_JOIN_REQUEST and job.status == STATUS_DONE
+        }
+
+    def _is_recent(self, *timestamps):
+        """
+        Checks whether the latest of the given timestamps lies within the lookback window.
+        Older applicants have long been handled by hand or by Telegram, so their approval is not retried.
+
+        Args:
+            *timestamps (str): "Updated At" / "DateTime" values; empty or malformed values are ignored.
+
+        Returns:
+            bool: True if one of the timestamps is recent enough.
+        """
+        threshold = datetime.now() - timedelta(days=self.lookback_days)
+        for timestamp in timestamps:
+            try:
+                if datetime.strptime(str(timestamp), TIMESTAMP_FORMAT) >= threshold:
+                    return True
+            except ValueError:
+                continue
+        return False
+
+    def find_candidates(self):
+        """
+        Cross-references the Metadata and main sheets in a single pass over each.
+        Only applicants whose approval is actually unknown are returned: those active within the lookback window
+        and without an approval recorded as done in the outbox. Users missing from the main sheet are repaired
+        whatever their age.
+
+        Returns:
+            list: A list of (category, user_id, metadata_record, main_row) tuples.
+        """
+        # Every group document is read once, even if several groups share it.
+        documents = {tenant.sheet_id: tenant for tenant in self.tenants.tenants.values()}
+        main_rows = {
+            str(row.get("User ID")): row
+            for tenant in documents.values()
+            for row in self.google_sheets.get_all_main_records(tenant)
+        }
+        approved = self._approved_user_ids()
+        metadata = {}
+        candidates = []
+
+        def approval_unknown(user_id, record, row):
+            return user_id not in approved and self._is_recent(
+                (record or {}).get("Updated At"), (row or {}).get("DateTime")
+            )
+
+        for record in self.google_sheets.get_all_metadata_records():
+            user_id = str(record.get("User ID"))
+            metadata[user_id] = record
+            if not self._is_complete(record):
+                continue
+            if user_id not in main_rows:
+                candidates.append((COMPLETED_UNSAVED, user_id, record, None))
+            elif approval_unknown(user_id, record, main_rows[user_id]):
+                candidates.append((COMPLETED_UNAPPROVED, user_id, record, main_rows[user_id]))
+
+        for user_id, row in main_rows.items():
+            record = metadata.get(user_id)
+            if (record is None or not self._is_complete(record)) and approval_unknown(user_id, record, row):
+                candidates.append((APPROVED_UNRECORDED, user_id, record, row))
+
+        return candidates
+
+    async def _approve(self, user_id, chat_id):
+        """
+        Approves the pending join request of the user.
+
+        Args:
+            user_id (str): The Telegram user ID.
+            chat_id (str): The group chat ID.
+
+        Returns:
+            bool: True if the request was approved now, False if it had already been handled.
+        """
+        try:
+            await self.scheduler.call(
+                Priority.QUESTION,
+                None,
+                self.bot.approve_chat_join_request,
+                chat_id=int(chat_id),
+                user_id=int(user_id)
+            )
+            return True
+        except BadRequest as e:
+            if any(fragment in str(e).lower() for fragment in ALREADY_HANDLED_ERRORS):
+                return False
+            raise
+
+    async def _notify_user(self, user_id, lang, tenant):
+        """
+        Sends the localized completion message with the group invite link.
+
+        Args:
+            user_id (str): The Telegram user ID.
+            lang (str): The user's language.
+            tenant (Tenant): The group the user applied to.
+        """
+        completion = self.localization.get_rendered(lang, "application_complete", tenant)
+        await self.scheduler.send_message(self.bot, int(user_id), **completion.as_kwargs())
+
+    def _repair_sheets(self, category, user_id, record, tenant):
+        """
+        Writes the data missing from one of the sheets.
+
+        Args:
+            category (str): The category of the user.
+            user_id (str): The Telegram user ID.
+            record (dict | None): The user's Metadata record, if any.
+            tenant (Tenant): The group the user applied to.
+        """
+        if category == COMPLETED_UNSAVED:
+            # Rebuild the final answers from the responses stored in Metadata.
+            form = ApplicationForm(record["Language"], self.localization, tenant.schema)
+            form.responses = json.loads(record["Responses"]) if record.get("Responses") else []
+            self.google_sheets.save_to_sheet(user_id, form.get_all_responses(), tenant)
+        elif category == APPROVED_UNRECORDED and record:
+            # Record the completion in Metadata so the user is not picked up again.
+            lang = record["Language"] or "en"
+            responses = json.loads(record["Responses"]) if record.get("Responses") else []
+            self.google_sheets.save_user_state(
+                user_id, lang, len(tenant.schema), responses, record.get("Chat ID")
+            )
+
+    async def _process_user(self, category, user_id, record, dry_run):
+        """
+        Repairs, approves and notifies a single user, recording the outcome in the report.
+
+        Args:
+            category (str): The category of the user.
+            user_id (str): The Telegram user ID.
+            record (dict | None): The user's Metadata record, if any.
+            dry_run (bool): If True, only records the category without touching Telegram or the sheets.
+        """
+        entry = {"category": category}
+        if dry_run:
+            entry["status"] = "pending"
+            self.report["users"][user_id] = entry
+            return
+
+        async with self.semaphore:
+            try:
+                chat_id = str((record or {}).get("Chat ID") or Config.DEFAULT_GROUP_CHAT_ID)
+                tenant = self.tenants.resolve(chat_id)
+                self._repair_sheets(category, user_id, record, tenant)
+                approved = await self._approve(user_id, chat_id)
+                if approved:
+                    lang = (record or {}).get("Language") or "en"
+                    try:
+                        await self._notify_user(user_id, lang, tenant)
+                    except Forbidden:
+                        entry["note"] = "approved, but the user has blocked the bot"
+                    entry["status"] = "done"
+                else:
+                    entry["status"] = "already_handled"
+            except Exception as e:
+                logger.error("Backlog processing failed for user %s: %s", user_id, e, exc_info=True)
+                entry["status"] = "failed"
+                entry["error"] = str(e)
+
+        self.report["users"][user_id] = entry
+        self._write_report()
+
+    async def run(self, dry_run=False):
+        """
+        Finds the backlog and processes every user not finished by a previous run.
+
+        Args:
+            dry_run (bool): If True, only writes the report of detected users.
+
+        Returns:
+            dict: The counts of users per final status.
+        """
+        candidates = self.find_candidates()
+        pending = [
+            (category, user_id, record)
+            for category, user_id, record, _ in candidates
+            if self.report["users"].get(user_id, {}).get("status") not in FINAL_STATUSES
+        ]
+        logger.info("Backlog: %d candidates found, %d left to process.", len(candidates), len(pending))
+
+        await asyncio.gather(*(
+            self._process_user(category, user_id, record, dry_run) for category, user_id, record in pending
+        ))
+        self._write_report()
+
+        summary = {}
+        for entry in self.report["users"].values():
+            summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+
+        if not dry_run and pending:
+            digest = "📋 <b>Backlog processed</b>\n\n" + "\n".join(
+                f"<b>{status}:</b> {count}" for status, count in sorted(summary.items())
+            )
+            await self.scheduler.send_message(
+                self.bot, Config.ADMIN_CHAT_ID, priority=Priority.ADMIN, text=digest, parse_mode="HTML"
+            )
+        return summary
+
+
+async def main():
+    """
+    Command-line entry point: python -m shared.telegram_bot.backlog [--dry-run] [--report PATH]
+    """
+    parser = argparse.ArgumentParser(description="Approve and notify applicants stuck after completing the form.")
+    parser.add_argument("--report", default="backlog_report.json", help="Path of the resumable JSON progress report.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum number of users processed at once.")
+    parser.add_argument("--dry-run", action="store_true", help="Only detect the backlog and write the report.")
+    parser.add_argument("--lookback-days", type=float, default=None,
+                        help="Only approve applicants active within this many days (default: BACKLOG_LOOKBACK_DAYS).")
+    args = parser.parse_args()
+
+    bot = Bot(token=Config.TELEGRAM_BOT_TOKEN, base_url=Config.TELEGRAM_API_BASE_URL)
+    async with bot:
+        processor = BacklogProcessor(GoogleSheets(), bot, args.report, args.concurrency, args.lookback_days)
+        summary = await processor.run(dry_run=args.dry_run)
+    logger.info("Backlog summary: %s", summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,6 +8,7 @@ from shared.telegram_bot.utils import Utils
 from telegram.ext import ContextTypes
 from telegram.error import Forbidden, BadRequest, TimedOut, NetworkError
 from shared.telegram_bot.logger import logger
+from shared.telegram_bot.deadline import DeadlineExceeded, DeadlineRequest
 
 
 class Bootstrap:
@@ -45,17 +46,18 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
     """
     error = context.error
     if isinstance(error, Forbidden):
-        logger.warning(f"❌ Forbidden: Cannot message user. Details: {error}")
+        logger.warning("❌ Forbidden: Cannot message user. Details: %s", error)
     elif isinstance(error, BadRequest):
-        logger.warning(f"⚠️ BadRequest: Likely caused by bad parameters. Details: {error}")
+        logger.warning("⚠️ BadRequest: Likely caused by bad parameters. Details: %s", error)
     elif isinstance(error, TimedOut):
-        logger.warning(f"⏱️ TimedOut: The bot took too long to respond. Details: {error}")
+        logger.warning("⏱️ TimedOut: The bot took too long to respond. Details: %s", error)
+    elif isinstance(error, DeadlineExceeded):
+        logger.warning("⏳ DeadlineExceeded: The invocation ran out of time. Details: %s", error)
     elif isinstance(error, NetworkError):
-        logger.warning(f"🌐 NetworkError: Connection issue. Details: {error}")
+        logger.warning("🌐 NetworkError: Connection issue. Details: %s", error)
     else:
-        logger.error("🔥 Unhandled exception occurred", exc_info=True)
-        if update:
-            logger.debug(f"Update that caused the error: {update}")
+        # The correlation fields (update_id, user_id, handler) identify the update; it is not serialized.
+        logger.error("🔥 Unhandled exception occurred", exc_info=error)
 
 
 async def ensure_application_ready():
@@ -73,10 +75,17 @@ async def ensure_application_ready():
     """
     if globs.application is None or globs.telegram_bot is None:
         # Create the Telegram Bot instance using the token from configuration.
-        globs.telegram_bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
+        # Bot API requests go through the traced request backend, so each one appears as a span,
+        # and their timeouts are shortened to what is left of the invocation budget.
+        globs.telegram_bot = Bot(
+            token=Config.TELEGRAM_BOT_TOKEN, base_url=Config.TELEGRAM_API_BASE_URL, request=DeadlineRequest()
+        )
 
         # Build the Application instance that will manage updates and handlers.
-        globs.application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
+        # A custom request backend replaces the builder's default one, so keep its pool size of 256 connections.
+        globs.application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).base_url(
+            Config.TELEGRAM_API_BASE_URL
+        ).request(DeadlineRequest(connection_pool_size=256)).build()
 
         # Initialize and register all handlers (commands, messages, callbacks, etc.).
         handlers = BotHandlers(
@@ -97,5 +106,5 @@ async def ensure_application_ready():
             await globs.application.bot.get_me() # type: ignore[attr-defined]
 
         except Exception as e:
-            logger.error(f"Failed to verify Telegram bot availability: {e}", exc_info=True)
+            logger.error("Failed to verify Telegram bot availability: %s", e, exc_info=True)
             raise
@@ -17,6 +17,9 @@ class Config:
     if not TELEGRAM_BOT_TOKEN:
         raise EnvironmentError("TELEGRAM_BOT_TOKEN environment variable is not set.")
 
+    # Base URL of the Telegram Bot API, followed by the token in request URLs (e.g. a local stub for load tests).
+    TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot")
+
     # Retrieve the admin chat ID for sending critical notifications.
     ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")
     if not ADMIN_CHAT_ID:
@@ -27,6 +30,13 @@ class Config:
     if not DEFAULT_GROUP_CHAT_ID:
         raise EnvironmentError("DEFAULT_GROUP_CHAT_ID environment variable is not set.")
 
+    # Name of the community of the default group, used in the welcome and completion messages.
+    COMMUNITY_NAME = os.getenv("COMMUNITY_NAME", "Qazaq IT Community")
+
+    # Additional groups served by the same deployment: a JSON object keyed by group chat ID, or a path to a JSON file.
+    # Each group may override "name", "sheet_id", "invite_link", "admin_chat_id" and "questions" (see README).
+    TENANTS_CONFIG = os.getenv("TENANTS_CONFIG", "")
+
     # Retrieve the Google Sheets document ID to store user responses and metadata.
     GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
     if not GOOGLE_SHEET_ID:
@@ -53,6 +63,101 @@ class Config:
         "en": os.getenv("PRIVACY_POLICY_URL_EN"),
     }
 
+    # Preselect the language of a join request from the user's Telegram language and skip the language menu
+    # ("false" always shows the menu).
+    PRESELECT_LANGUAGE = os.getenv("PRESELECT_LANGUAGE", "true").lower() == "true"
+
+    # Offer the whole questionnaire as a Telegram Web App form after the privacy step ("true" enables it).
+    WEBAPP_FORM = os.getenv("WEBAPP_FORM", "false").lower() == "true"
+    # URL of the form; empty derives it from the API Gateway URL the webhook is called on (the "/form" route).
+    WEBAPP_URL = os.getenv("WEBAPP_URL", "")
+
+    # Outbound Telegram rate limits (see https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this).
+    # Bot-wide requests per second.
+    OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+    # Messages per second to a single private chat.
+    OUTBOUND_PRIVATE_CHAT_RATE = float(os.getenv("OUTBOUND_PRIVATE_CHAT_RATE", "1"))
+    # Messages per second to a single group chat (20 messages per minute).
+    OUTBOUND_GROUP_CHAT_RATE = float(os.getenv("OUTBOUND_GROUP_CHAT_RATE", str(20 / 60)))
+    # Short burst allowed per chat before the per-chat rate applies.
+    OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "3"))
+    # How many times a call is retried after Telegram answers with RetryAfter.
+    OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+
+    # Inbound flood protection, applied per container before the user's state is looked up.
+    # Private messages per second accepted from a single user.
+    INBOUND_USER_RATE = float(os.getenv("INBOUND_USER_RATE", "1"))
+    # Messages a single user may send at once before the per-user rate applies.
+    INBOUND_USER_BURST = float(os.getenv("INBOUND_USER_BURST", "5"))
+    # Seconds during which a user found without any state is not looked up again (0 disables the negative cache).
+    UNKNOWN_USER_TTL_SECONDS = float(os.getenv("UNKNOWN_USER_TTL_SECONDS", "60"))
+    # Minimum number of seconds between two "too many messages" notices to a user exceeding the per-user rate.
+    INBOUND_NOTICE_SECONDS = float(os.getenv("INBOUND_NOTICE_SECONDS", "60"))
+
+    # Idle time (in hours) after which an applicant who has not finished the form receives a reminder.
+    REMINDER_AFTER_HOURS = float(os.getenv("REMINDER_AFTER_HOURS", "24"))
+    # Idle time (in hours) after which the join request of an unfinished applicant is declined.
+    DECLINE_AFTER_HOURS = float(os.getenv("DECLINE_AFTER_HOURS", "72"))
+
+    # Age (in days) of the last activity after which the backlog processor no longer retries an approval.
+    BACKLOG_LOOKBACK_DAYS = float(os.getenv("BACKLOG_LOOKBACK_DAYS", "14"))
+
+    # Minimum number of seconds between two flushes of the funnel statistics to the "Stats" worksheet.
+    STATS_FLUSH_SECONDS = float(os.getenv("STATS_FLUSH_SECONDS", "60"))
+
+    # Age (in days) after which rows of the "Stats" worksheet are reused for new counters (at least the /stats window).
+    STATS_RETENTION_DAYS = max(7, int(os.getenv("STATS_RETENTION_DAYS", "31")))
+
+    # Number of worksheets the Metadata state is spread across by user ID hash (1 keeps the single "Metadata" tab).
+    METADATA_SHARDS = max(1, int(os.getenv("METADATA_SHARDS", "1")))
+
+    # Cache Metadata rows per container, kept coherent through the shared "Changes" log ("false" disables it).
+    METADATA_CACHE = os.getenv("METADATA_CACHE", "true").lower() == "true"
+    # Number of entries after which the scheduled task empties the "Changes" log.
+    CHANGES_LOG_MAX_ROWS = int(os.getenv("CHANGES_LOG_MAX_ROWS", "20000"))
+
+    # Where finished traces go: "stdout" (one JSON line per span), "memory" (kept in the process) or "none".
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+
+    # Share of invocations profiled with cProfile and tracemalloc (0 disables profiling, 1 profiles every invocation).
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    # Number of functions and allocation sites listed in each profile summary.
+    PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "15"))
+    # Directory receiving the raw .prof file of each profiled invocation (empty: logs only; Lambda allows /tmp).
+    PROFILE_DUMP_DIR = os.getenv("PROFILE_DUMP_DIR", "")
+
+    # Share of users whose scrubbed webhook updates are recorded for replays (0 disables recording).
+    RECORD_SAMPLE_RATE = float(os.getenv("RECORD_SAMPLE_RATE", "0"))
+    # Secret key of the pseudonymous user and chat IDs in recordings; must be the same in every container.
+    RECORD_SALT = os.getenv("RECORD_SALT", "")
+    # Where recorded updates go: "log" (one log record each) or the path of a JSON Lines file.
+    RECORD_SINK = os.getenv("RECORD_SINK", "log")
+
+    # Seconds of the Lambda time budget kept in reserve for returning the response and writing out the logs.
+    DEADLINE_SAFETY_MARGIN_SECONDS = float(os.getenv("DEADLINE_SAFETY_MARGIN_SECONDS", "3"))
+    # Remaining budget (in seconds) below which non-critical work (secondary reads, stats) is skipped.
+    DEADLINE_DEFER_SECONDS = float(os.getenv("DEADLINE_DEFER_SECONDS", "8"))
+    # Timeout of a single Google Sheets request, shortened to the remaining budget.
+    SHEETS_CALL_TIMEOUT_SECONDS = float(os.getenv("SHEETS_CALL_TIMEOUT_SECONDS", "10"))
+    # Timeout of a single Telegram Bot API request, shortened to the remaining budget.
+    TELEGRAM_CALL_TIMEOUT_SECONDS = float(os.getenv("TELEGRAM_CALL_TIMEOUT_SECONDS", "5"))
+
+    # Seconds during which the invocation that enqueued outbox jobs runs them before the periodic drain may.
+    OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+    # Delay before the first retry of a failed outbox job; it doubles with every further attempt.
+    OUTBOX_RETRY_SECONDS = float(os.getenv("OUTBOX_RETRY_SECONDS", "60"))
+    # Number of attempts after which an outbox job is marked as failed (and reported in the logs).
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    # Number of finished jobs after which the drain empties the "Outbox" worksheet (when nothing is pending).
+    OUTBOX_MAX_ROWS = int(os.getenv("OUTBOX_MAX_ROWS", "1000"))
+
+    # Open the Google Sheets and Telegram connections concurrently while the container starts ("false" disables it).
+    PREWARM = os.getenv("PREWARM", "true").lower() == "true"
+    # Also load the Metadata cache and the duplicate index while the container starts.
+    PREWARM_INDEXES = os.getenv("PREWARM_INDEXES", "false").lower() == "true"
+    # Time budget of the pre-warming; Lambda cuts the init phase off after 10 seconds.
+    PREWARM_TIMEOUT_SECONDS = float(os.getenv("PREWARM_TIMEOUT_SECONDS", "8"))
+
     @staticmethod
     def get_privacy_policy_url(lang):
         """
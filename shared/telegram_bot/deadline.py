@@ -0,0 +1,152 @@
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from telegram.error import TimedOut
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.tracing import TracedRequest
+
+# Deadline of the invocation being processed (None outside of an invocation: scripts and tools are unbounded).
+CURRENT_DEADLINE = ContextVar("deadline", default=None)
+
+# Shortest timeout given to a single Sheets or Telegram call; below it the call is not worth starting.
+MIN_CALL_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised instead of starting (or retrying) a call that cannot finish before the invocation times out.
+    """
+
+
+class Deadline:
+    """
+    Time budget of one invocation, derived from the remaining time reported by the Lambda context.
+    A safety margin is kept for returning the response and writing out the logs, so the work stops
+    before Lambda kills the invocation (and Telegram redelivers the update).
+    """
+
+    def __init__(self, remaining_ms=None, safety_margin=None):
+        """
+        Args:
+            remaining_ms (int, optional): Milliseconds left before the invocation times out (None: unbounded).
+            safety_margin (float, optional): Seconds kept in reserve; defaults to DEADLINE_SAFETY_MARGIN_SECONDS.
+        """
+        margin = Config.DEADLINE_SAFETY_MARGIN_SECONDS if safety_margin is None else safety_margin
+        self.expires_at = None if remaining_ms is None else time.monotonic() + remaining_ms / 1000 - margin
+
+    @classmethod
+    def from_context(cls, context):
+        """
+        Builds the deadline of an invocation from its Lambda context.
+
+        Args:
+            context (object): The AWS Lambda context object (None when invoked outside of Lambda).
+
+        Returns:
+            Deadline: The deadline (unbounded if the context does not report its remaining time).
+        """
+        get_remaining_time = getattr(context, "get_remaining_time_in_millis", None)
+        return cls(get_remaining_time() if get_remaining_time else None)
+
+    def remaining(self):
+        """
+        Returns:
+            float: Seconds left of the budget (infinite for an unbounded deadline, negative once expired).
+        """
+        if self.expires_at is None:
+            return math.inf
+        return self.expires_at - time.monotonic()
+
+    def has_time_for(self, seconds):
+        """
+        Args:
+            seconds (float): The expected duration of some work.
+
+        Returns:
+            bool: True if at least that much of the budget is left.
+        """
+        return self.remaining() >= seconds
+
+    def call_timeout(self, default, operation="call"):
+        """
+        Derives the timeout of a single call from the remaining budget.
+
+        Args:
+            default (float): The usual timeout of the call, in seconds.
+            operation (str): The name of the call, for the error message.
+
+        Returns:
+            float: The default timeout, shortened to the remaining budget.
+
+        Raises:
+            DeadlineExceeded: If too little time is left to start the call.
+        """
+        remaining = self.remaining()
+        if remaining < MIN_CALL_TIMEOUT:
+            raise DeadlineExceeded(f"{operation} skipped: {max(remaining, 0):.2f}s left of the invocation budget.")
+        return min(default, remaining)
+
+
+class DeadlineRequest(TracedRequest):
+    """
+    Traced PTB request backend whose timeouts are shortened to the remaining invocation budget.
+    Outside of an invocation the timeouts configured on the backend apply unchanged.
+    """
+
+    async def do_request(self, url, method, request_data=None, read_timeout=TracedRequest.DEFAULT_NONE,
+                         write_timeout=TracedRequest.DEFAULT_NONE, connect_timeout=TracedRequest.DEFAULT_NONE,
+                         pool_timeout=TracedRequest.DEFAULT_NONE):
+        deadline = get_deadline()
+        if deadline.expires_at is not None:
+            operation = f"telegram.{url.rsplit('/', 1)[-1]}"
+            try:
+                # Unset (or unlimited) timeouts take TELEGRAM_CALL_TIMEOUT_SECONDS before being shortened.
+                read_timeout, write_timeout, connect_timeout, pool_timeout = (
+                    deadline.call_timeout(
+                        timeout if isinstance(timeout, (int, float)) else Config.TELEGRAM_CALL_TIMEOUT_SECONDS,
+                        operation
+                    )
+                    for timeout in (read_timeout, write_timeout, connect_timeout, pool_timeout)
+                )
+            except DeadlineExceeded as e:
+                # PTB wraps foreign exceptions into NetworkError; report the skipped request as a timeout.
+                raise TimedOut(str(e)) from e
+        return await super().do_request(url, method, request_data, read_timeout, write_timeout, connect_timeout,
+                                        pool_timeout)
+
+
+# Deadline returned outside of an invocation.
+UNBOUNDED = Deadline()
+
+
+def get_deadline():
+    """
+    Returns:
+        Deadline: The deadline of the current invocation, or an unbounded one outside of an invocation.
+    """
+    return CURRENT_DEADLINE.get() or UNBOUNDED
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """
+    Makes a deadline the current one for the duration of the block (including tasks started inside it).
+
+    Args:
+        deadline (Deadline): The deadline of the invocation.
+    """
+    token = CURRENT_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        CURRENT_DEADLINE.reset(token)
+
+
+def is_low_on_time():
+    """
+    Returns:
+        bool: True if less than DEADLINE_DEFER_SECONDS is left, i.e. non-critical work should be skipped or postponed.
+    """
+    return not get_deadline().has_time_for(Config.DEADLINE_DEFER_SECONDS)
+
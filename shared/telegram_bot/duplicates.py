@@ -0,0 +1,160 @@
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.validation import Validation
+
+# Global variable holding the shared duplicate indexes per main sheet document (reused during AWS Lambda hot starts).
+DUPLICATE_INDEXES = {}
+
+
+class DuplicateIndex:
+    """
+    Hash index of normalized emails and phone numbers of the main sheet, mapping each value to the user IDs using it.
+    It is loaded once per container from the two columns, updated on every append and caught up with the rows
+    appended by other containers by the scheduled warm-up, so checking a new applicant for likely duplicates
+    costs one dictionary lookup per field.
+    Groups whose main sheet lacks one of the Email and Phone columns are checked on the other one only;
+    without either (or without "User ID"), the index stays empty and is never read.
+    """
+    # Main sheet columns read to build the index.
+    COLUMNS = ("User ID", "Email", "Phone")
+
+    def __init__(self):
+        """
+        Initializes an empty, not yet loaded index.
+        """
+        self.emails = {}  # Normalized email -> set of user IDs.
+        self.phones = {}  # Normalized phone -> set of user IDs.
+        self.next_row = 2  # First main sheet row not read yet.
+        self.columns = ()  # Columns of COLUMNS present in the main sheet (empty if nothing can be indexed).
+        self.loaded = False
+
+    @staticmethod
+    def _keys(email, phone):
+        """
+        Normalizes the indexed values.
+
+        Args:
+            email (str): The email address.
+            phone (str): The phone number.
+
+        Returns:
+            tuple: (normalized email or "", normalized phone or "").
+        """
+        email = Validation.normalize_email(email) if email else ""
+        phone = Validation.normalize_phone(phone) if phone else ""
+        return email, phone
+
+    def add(self, user_id, email, phone):
+        """
+        Indexes the email and phone of a user.
+
+        Args:
+            user_id (str): The Telegram user ID.
+            email (str): The email address.
+            phone (str): The phone number.
+        """
+        email, phone = self._keys(email, phone)
+        if email:
+            self.emails.setdefault(email, set()).add(str(user_id))
+        if phone:
+            self.phones.setdefault(phone, set()).add(str(user_id))
+
+    def load(self, google_sheets, worksheet=None):
+        """
+        Builds the index by streaming only the User ID, Email and Phone columns of the main sheet.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            worksheet (Worksheet, optional): The main sheet to index; defaults to the default group's main sheet.
+        """
+        worksheet = worksheet or google_sheets.main_sheet
+        self.emails.clear()
+        self.phones.clear()
+        self.next_row = 2
+        header = google_sheets.get_header(worksheet)
+        self.columns = tuple(name for name in self.COLUMNS if name in header)
+        if self.columns[:1] != ("User ID",) or len(self.columns) < 2:
+            logger.debug("No User ID with Email or Phone column in %s; duplicate detection is off.", worksheet.title)
+            self.columns = ()
+        self._read_new_rows(google_sheets, worksheet)
+        self.loaded = True
+
+    def sync(self, google_sheets, worksheet=None):
+        """
+        Brings the index up to date: only the rows appended since the last read (e.g. by other containers)
+        are fetched. An index that is not loaded yet is loaded, and so is one of a main sheet that had nothing
+        to index (its header is read again, in case the columns have been added since). Rows edited in place
+        are not re-read.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            worksheet (Worksheet, optional): The indexed main sheet; defaults to the default group's main sheet.
+
+        Returns:
+            int: The number of rows read.
+        """
+        if not self.loaded or not self.columns:
+            self.load(google_sheets, worksheet)
+            return self.next_row - 2
+        return self._read_new_rows(google_sheets, worksheet or google_sheets.main_sheet)
+
+    def _read_new_rows(self, google_sheets, worksheet):
+        """
+        Indexes the rows of the main sheet from `next_row` on and advances it past the last non-empty row.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            worksheet (Worksheet): The indexed main sheet.
+
+        Returns:
+            int: The number of rows read.
+        """
+        if not self.columns:
+            return 0
+        first_row = self.next_row
+        for start, columns in google_sheets.iter_column_chunks(worksheet, self.columns, start_row=self.next_row):
+            user_ids = columns["User ID"]
+            emails = columns.get("Email") or [""] * len(user_ids)
+            phones = columns.get("Phone") or [""] * len(user_ids)
+            for user_id, email, phone in zip(user_ids, emails, phones):
+                if user_id:
+                    self.add(user_id, email, phone)
+            self.next_row = start + len(user_ids)
+        return self.next_row - first_row
+
+    def find(self, user_id, email, phone):
+        """
+        Finds other users with the same normalized email or phone.
+
+        Args:
+            user_id (str): The Telegram user ID of the applicant (excluded from the result).
+            email (str): The applicant's email address.
+            phone (str): The applicant's phone number.
+
+        Returns:
+            dict: Sorted lists of matching user IDs keyed by "Email" and "Phone" (only non-empty matches).
+        """
+        email, phone = self._keys(email, phone)
+        matches = {
+            "Email": self.emails.get(email, set()) if email else set(),
+            "Phone": self.phones.get(phone, set()) if phone else set(),
+        }
+        return {
+            field: sorted(user_ids - {str(user_id)})
+            for field, user_ids in matches.items()
+            if user_ids - {str(user_id)}
+        }
+
+
+def get_duplicate_index(sheet_id=None):
+    """
+    Retrieves the shared duplicate index of a main sheet document, creating it on first use.
+
+    Args:
+        sheet_id (str, optional): The Google Sheets document ID (None for the default group).
+
+    Returns:
+        DuplicateIndex: The shared index.
+    """
+    if sheet_id not in DUPLICATE_INDEXES:
+        DUPLICATE_INDEXES[sheet_id] = DuplicateIndex()
+    return DUPLICATE_INDEXES[sheet_id]
@@ -0,0 +1,270 @@
+import argparse
+import csv
+import json
+import os
+from shared.telegram_bot.google_sheets import GoogleSheets
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.tenants import get_tenant_registry
+
+# Column holding the row timestamp used for incremental exports, per exported sheet.
+TIMESTAMP_COLUMNS = {
+    "main": "DateTime",
+    "metadata": "Updated At",
+}
+
+
+class CsvExportWriter:
+    """
+    Writes exported rows to a CSV file as they arrive.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = None
+
+    def write(self, rows):
+        """
+        Appends a batch of rows, writing the header before the first one.
+
+        Args:
+            rows (list): Row dictionaries sharing the same keys.
+        """
+        if rows and self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(rows[0]))
+            self.writer.writeheader()
+        if self.writer:
+            self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlExportWriter:
+    """
+    Writes exported rows to a JSON Lines file as they arrive.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        """
+        Appends a batch of rows, one JSON object per line.
+
+        Args:
+            rows (list): Row dictionaries.
+        """
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExportWriter:
+    """
+    Writes exported rows to a Parquet file, one row group per batch. Requires the optional `pyarrow` package.
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires the 'pyarrow' package: pip install pyarrow") from e
+        self.pyarrow = pyarrow
+        self.path = path
+        self.writer = None
+
+    def write(self, rows):
+        """
+        Appends a batch of rows as a new row group. All values are stored as strings, as in the sheet.
+
+        Args:
+            rows (list): Row dictionaries sharing the same keys.
+        """
+        if not rows:
+            return
+        columns = {name: [str(row[name]) for row in rows] for name in rows[0]}
+        table = self.pyarrow.table(columns)
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+# Export writers keyed by output format.
+WRITERS = {
+    "csv": CsvExportWriter,
+    "jsonl": JsonlExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+class SheetExporter:
+    """
+    Exports the main or Metadata sheet incrementally with flat memory use.
+    Rows are paged through in fixed-size A1 ranges and written batch by batch.
+    A checkpoint file remembers the newest exported timestamp (with the users exported at exactly that time) and,
+    for the append-only main sheet, the next unread row, so a nightly export only fetches the rows added since the
+    previous run, without skipping rows written in the same second as the last exported one.
+    """
+
+    def __init__(self, google_sheets, chunk_size=1000):
+        """
+        Initializes the exporter.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            chunk_size (int): The number of rows fetched per request.
+        """
+        self.google_sheets = google_sheets
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def load_checkpoint(path):
+        """
+        Loads the checkpoint file.
+
+        Args:
+            path (str | None): The checkpoint path.
+
+        Returns:
+            dict: The checkpoint per sheet name.
+        """
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as checkpoint_file:
+                return json.load(checkpoint_file)
+        return {}
+
+    @staticmethod
+    def save_checkpoint(path, checkpoint):
+        """
+        Atomically writes the checkpoint file.
+
+        Args:
+            path (str): The checkpoint path.
+            checkpoint (dict): The checkpoint per sheet name.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def checkpoint_key(sheet_name, tenant=None):
+        """
+        Returns:
+            str: The checkpoint entry of a sheet: the sheet name, suffixed with the group chat ID for a group.
+        """
+        return f"{sheet_name}:{tenant.chat_id}" if tenant else sheet_name
+
+    def export(self, sheet_name, writer, since="", start_row=2, tenant=None, boundary_ids=()):
+        """
+        Streams the rows of a sheet not older than `since` into the writer.
+
+        Args:
+            sheet_name (str): "main" or "metadata".
+            writer: One of the export writers.
+            since (str): Only rows with a timestamp greater than or equal to this value are exported
+                ("" exports everything).
+            start_row (int): The first sheet row to read.
+            tenant (Tenant, optional): The group: its main sheet, or only its users' Metadata rows.
+                Defaults to the default group's main sheet and every Metadata row.
+            boundary_ids (iterable): User IDs already exported with a timestamp equal to `since`.
+
+        Returns:
+            dict: The new checkpoint of the sheet (newest timestamp, the user IDs exported at that timestamp,
+                next row and exported row count).
+        """
+        # Metadata may be sharded across several worksheets; all of them are exported into one output.
+        if sheet_name == "main":
+            worksheets = [self.google_sheets.get_main_sheet(tenant)]
+        else:
+            worksheets = self.google_sheets.metadata_sheets
+        timestamp_column = TIMESTAMP_COLUMNS[sheet_name]
+        newest = since
+        newest_ids = set(boundary_ids)
+        next_row = start_row
+        exported = 0
+        batch = []
+
+        rows = (
+            row
+            for worksheet in worksheets
+            for row in self.google_sheets.iter_rows(worksheet, self.chunk_size, start_row)
+        )
+        for row_number, row in rows:
+            next_row = row_number + 1
+            if sheet_name == "metadata" and tenant and str(row.get("Chat ID", "")) != tenant.chat_id:
+                continue
+            timestamp = str(row.get(timestamp_column, ""))
+            user_id = str(row.get("User ID", ""))
+            # Rows written in the same second as the checkpoint are exported unless they already were.
+            if since and (timestamp < since or (timestamp == since and user_id in boundary_ids)):
+                continue
+            if timestamp > newest:
+                newest, newest_ids = timestamp, set()
+            if timestamp == newest:
+                newest_ids.add(user_id)
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                writer.write(batch)
+                exported += len(batch)
+                batch = []
+
+        writer.write(batch)
+        exported += len(batch)
+        return {"since": newest, "since_ids": sorted(newest_ids), "next_row": next_row, "exported": exported}
+
+
+def main():
+    """
+    Command-line entry point:
+    python -m shared.telegram_bot.export --sheet main --format csv --output out.csv [--checkpoint export.json]
+    """
+    parser = argparse.ArgumentParser(description="Export the applications to CSV, JSONL or Parquet.")
+    parser.add_argument("--sheet", choices=sorted(TIMESTAMP_COLUMNS), default="main", help="The sheet to export.")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv", help="The output format.")
+    parser.add_argument("--output", required=True, help="Path of the output file.")
+    parser.add_argument("--checkpoint", help="Checkpoint file for incremental exports (read and updated).")
+    parser.add_argument("--since", default=None, help='Only export rows from "YYYY-MM-DD HH:MM:SS" on.')
+    parser.add_argument("--tenant", default=None,
+                        help="Group chat ID: export its main sheet, or only its users' Metadata rows.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Number of rows fetched per request.")
+    args = parser.parse_args()
+
+    tenant = None
+    if args.tenant is not None:
+        tenant = get_tenant_registry().tenants.get(str(args.tenant))
+        if tenant is None:
+            parser.error(f"No group configured for chat {args.tenant}.")
+
+    checkpoint = SheetExporter.load_checkpoint(args.checkpoint)
+    key = SheetExporter.checkpoint_key(args.sheet, tenant)
+    previous = checkpoint.get(key, {})
+    since = args.since if args.since is not None else previous.get("since", "")
+    boundary_ids = previous.get("since_ids", []) if args.since is None else []
+    # The main sheet is append-only, so resuming from the next unread row skips already exported pages.
+    # Metadata rows are updated in place and have to be scanned from the top.
+    start_row = previous.get("next_row", 2) if args.sheet == "main" and args.since is None else 2
+
+    writer = WRITERS[args.format](args.output)
+    try:
+        result = SheetExporter(GoogleSheets(), args.chunk_size).export(
+            args.sheet, writer, since, start_row, tenant, boundary_ids
+        )
+    finally:
+        writer.close()
+
+    if args.checkpoint:
+        checkpoint[key] = {"since": result["since"], "since_ids": result["since_ids"], "next_row": result["next_row"]}
+        SheetExporter.save_checkpoint(args.checkpoint, checkpoint)
+    logger.info("Exported %d rows of the %s sheet to %s.", result["exported"], args.sheet, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,77 @@
+from shared.telegram_bot.questionnaire import SCHEMA
+
+
 class ApplicationForm:
     """
     Manages the questionnaire flow for users interacting with the Telegram bot.
     Stores and tracks user responses while ensuring that questions are asked sequentially.
-    Implements validation mechanisms and mapping between questions and internal response fields.
+    Question texts, types, validators and field IDs come from the shared compiled schema,
+    so each form only holds the user's language, progress, a fixed-size answer array
+    and a reference to the schema of the group the user applies to.
 
     Attributes:
         lang (str): The language selected by the user.
-        responses (list): A list of tuples containing question-response pairs.
         current_question_index (int): Tracks the index of the current question being asked.
-        questions (list): The set of questions to be asked, loaded based on the selected language.
-        response_mapping (dict): Maps questions to internal response field names.
+        answers (list): One slot per question holding the user's answer, or None if not answered yet.
+        schema (QuestionnaireSchema): The compiled questionnaire (shared by every form of the same group).
     """
-    _cached_questions = {}  # Cache to store localized questions for performance optimization.
+    __slots__ = ("lang", "current_question_index", "answers", "schema")
 
-    def __init__(self, lang, localization):
+    def __init__(self, lang, localization=None, schema=None):
         """
-        Initializes the application form for the given language and loads the questions.
+        Initializes an empty application form for the given language.
 
         Args:
             lang (str): The language code (e.g., 'en', 'ru', 'kz').
-            localization (Localization): The localization object for retrieving questions.
+            localization (Localization, optional): Kept for backward compatibility; questions come from the schema.
+            schema (QuestionnaireSchema, optional): The group's questionnaire; defaults to the shared schema.
         """
         self.lang = lang
-        self.responses = []
+        self.schema = schema or SCHEMA
         self.current_question_index = 0
+        self.answers = [None] * len(self.schema)
 
-        # Check if the questions for the specified language are already cached.
-        if lang not in ApplicationForm._cached_questions:
-            # If not cached, fetch and cache the questions.
-            ApplicationForm._cached_questions[lang] = localization.get_questions(lang)
-
-        # Load the questions from the cache.
-        self.questions = ApplicationForm._cached_questions[lang]
-
-        # Map the questions to internal response fields.
-        self.response_mapping = {
-            "Как мы можем к вам обращаться? Введите, пожалуйста, ваше полное имя.": "Full Name",
-            "Сколько вам лет?": "Age",
-            "Укажите ваш адрес электронной почты (например: name@example.com).": "Email",
-            "Какой у вас номер телефона? Пожалуйста, укажите его в формате +XXXXXXXX....": "Phone",
-            "Расскажите, зачем вы хотите присоединиться к нашей группе?": "Purpose",
-            "Какой у вас род деятельности?": "Occupation",
-            "Какое у вас место работы?": "Workplace",
-            "В каком городе вы проживаете?": "City",
-            "Какой у вас инстаграм?": "Instagram",
-            "Откуда вы узнали про нас?": "Referral Source",
-            "Сізге қалай жүгінуге болады? Толық атыңызды енгізіңіз, өтінеміз.": "Full Name",
-            "Жасыңыз қаншада?": "Age",
-            "Электрондық пошта мекенжайыңызды көрсетіңіз (мысалы: name@example.com).": "Email",
-            "Телефон нөміріңіз қандай? Оны +XXXXXXXX... форматында енгізіңіз, өтінеміз.": "Phone",
-            "Біздің топқа не үшін қосылғыңыз келеді?": "Purpose",
-            "Сіздің қызметіңіз қандай?": "Occupation",
-            "Сіз қай жерде жұмыс істейсіз?": "Workplace",
-            "Сіз қай қалада тұрасыз?": "City",
-            "Сіздің инстаграмыңыз қандай?": "Instagram",
-            "Біз туралы қайдан білдіңіз?": "Referral Source",
-            "How should we address you? Please enter your full name.": "Full Name",
-            "How old are you?": "Age",
-            "Please provide your email address (e.g., name@example.com).": "Email",
-            "What is your phone number? Please enter it in the format +XXXXXXXX....": "Phone",
-            "Please tell us why you want to join our group.": "Purpose",
-            "What is your occupation?": "Occupation",
-            "Where do you work?": "Workplace",
-            "In which city do you live?": "City",
-            "What's your Instagram?": "Instagram",
-            "How did you hear about us?": "Referral Source"
-        }
+    @property
+    def responses(self):
+        """
+        The answered questions as (question text, answer) pairs, the format persisted in the Metadata sheet.
+
+        Returns:
+            list: A list of tuples containing question-response pairs.
+        """
+        return [
+            (question.text(self.lang), answer)
+            for question, answer in zip(self.schema.questions, self.answers)
+            if answer is not None
+        ]
+
+    @responses.setter
+    def responses(self, responses):
+        """
+        Loads persisted responses (pairs or a legacy dictionary) into the answer array.
+        Questions are matched by their text in any language; unknown questions are ignored.
+
+        Args:
+            responses (list | dict): The persisted question-response pairs.
+        """
+        self.answers = [None] * len(self.schema)
+        if isinstance(responses, dict):
+            responses = responses.items()
+        for question_text, answer in responses or []:
+            index = self.schema.text_index.get(question_text)
+            if index is not None:
+                self.answers[index] = answer
+
+    def get_current_question(self):
+        """
+        Retrieves the compiled current question.
+
+        Returns:
+            Question or None: The current question, or None if all questions have been answered.
+        """
+        if 0 <= self.current_question_index < len(self.schema):
+            return self.schema.questions[self.current_question_index]
+        return None
 
     def get_next_question(self):
         """
@@ -74,9 +80,8 @@ class ApplicationForm:
         Returns:
             str or None: The next question to be asked, or None if all questions have been answered.
         """
-        if self.current_question_index < len(self.questions):
-            return self.questions[self.current_question_index]["question"]
-        return None
+        question = self.get_current_question()
+        return question.text(self.lang) if question else None
 
     def get_current_question_type(self):
         """
@@ -85,9 +90,8 @@ class ApplicationForm:
         Returns:
             str or None: The type of the current question, or None if no questions remain.
         """
-        if self.current_question_index < len(self.questions):
-            return self.questions[self.current_question_index]["type"]
-        return None
+        question = self.get_current_question()
+        return question.type if question else None
 
     def save_response(self, response):
         """
@@ -105,20 +109,11 @@ class ApplicationForm:
             raise ValueError("The response cannot be empty.")
 
         # Defensive check: ensure we don't exceed question list length.
-        if self.current_question_index >= len(self.questions):
+        if self.current_question_index >= len(self.schema):
             raise IndexError("No more questions available. The form is already complete.")
 
-        # Get the text of the current question.
-        current_question_text = self.questions[self.current_question_index]["question"]
-
-        # Ensure the responses list is valid.
-        if not isinstance(self.responses, list):
-            self.responses = []
-
-        # Append the question-response pair to the responses list.
-        self.responses.append((current_question_text, response))
-
-        # Move to the next question.
+        # Store the answer in the slot of the current question and move to the next question.
+        self.answers[self.current_question_index] = response
         self.current_question_index += 1
 
     def is_complete(self):
@@ -128,17 +123,17 @@ class ApplicationForm:
         Returns:
             bool: True if the form is complete, False otherwise.
         """
-        return self.current_question_index >= len(self.questions)
+        return self.current_question_index >= len(self.schema)
 
     def get_all_responses(self):
         """
-        Compiles all collected responses and maps them to the corresponding internal response fields.
+        Compiles all collected responses keyed by their internal response field names.
 
         Returns:
             dict: A dictionary where keys are internal response field names and values are the user's responses.
         """
         return {
-            self.response_mapping[question]: answer
-            for question, answer in self.responses
-            if question in self.response_mapping
+            question.field_id: answer
+            for question, answer in zip(self.schema.questions, self.answers)
+            if answer is not None
         }
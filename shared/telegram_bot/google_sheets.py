@@ -1,16 +1,129 @@
+import functools
 import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from google.auth.transport.requests import Request
 from gspread import Client, exceptions
+from gspread.utils import rowcol_to_a1
 from google.oauth2.service_account import Credentials
 from shared.telegram_bot.logger import logger
 from shared.telegram_bot.config import Config
-from shared.telegram_bot.localization import Localization
-from datetime import datetime
+from shared.telegram_bot.deadline import DeadlineExceeded, get_deadline
+from shared.telegram_bot.duplicates import DUPLICATE_INDEXES, get_duplicate_index
+from shared.telegram_bot.metadata_cache import (
+    CHANGES_HEADER,
+    CHANGES_SHEET_TITLE,
+    METADATA_HEADER,
+    MetadataCache,
+    get_metadata_cache,
+)
+from shared.telegram_bot.tenants import get_tenant_registry
+from shared.telegram_bot.tracing import get_tracer, traced
 
 # Global variables for managing Google Sheets connections and worksheets.
 CREDENTIALS = None  # Stores the Google service account credentials.
 SHEET_CLIENT = None  # Stores the Google Sheets client instance.
 MAIN_SHEET = None  # Reference to the main Google Sheets worksheet.
-METADATA_SHEET = None  # Reference to the metadata worksheet.
+METADATA_SHEETS = None  # References to the metadata worksheets (one per shard).
+SPREADSHEET = None  # Reference to the Google Sheets document itself.
+AUXILIARY_SHEETS = {}  # Auxiliary worksheets (statistics, etc.) keyed by title.
+TENANT_MAIN_SHEETS = {}  # Main worksheets of other groups' documents keyed by document ID.
+
+# Budget (in seconds) needed to reconnect and retry a failed request; with less left the error is raised at once.
+RETRY_MIN_SECONDS = 2.0
+
+# The scheduled warm-up refreshes an OAuth token expiring within this many seconds, before an update has to.
+TOKEN_REFRESH_AHEAD_SECONDS = 600
+
+# Number of compare-and-set attempts of a Metadata row update before giving up.
+METADATA_WRITE_ATTEMPTS = 3
+
+# Column order of the main sheet for the default questionnaire.
+MAIN_COLUMNS = (
+    "User ID",
+    "Full Name",
+    "Age",
+    "Email",
+    "Phone",
+    "Purpose",
+    "Occupation",
+    "Workplace",
+    "City",
+    "Username",
+    "Bio",
+    "DateTime",
+    "Instagram",
+    "Referral Source",
+)
+
+
+def get_metadata_sheet_titles(shards):
+    """
+    Returns the titles of the metadata worksheets for the given number of shards.
+
+    Args:
+        shards (int): The number of shards.
+
+    Returns:
+        list: ["Metadata"] for a single shard, otherwise ["Metadata_0", ..., "Metadata_{K-1}"].
+    """
+    if shards <= 1:
+        return ["Metadata"]
+    return [f"Metadata_{i}" for i in range(shards)]
+
+
+def get_shard_index(user_id, shards):
+    """
+    Maps a user to a metadata shard. CRC32 is stable across processes (unlike the built-in `hash`),
+    so every container and the rebalancing tool agree on the shard of a user.
+
+    Args:
+        user_id (str): The Telegram user ID.
+        shards (int): The number of shards.
+
+    Returns:
+        int: The shard index in [0, shards).
+    """
+    return zlib.crc32(str(user_id).encode()) % shards if shards > 1 else 0
+
+
+def get_or_create_worksheet(spreadsheet, title, header):
+    """
+    Opens a worksheet of the document, creating it with the given header if it does not exist.
+
+    Args:
+        spreadsheet (Spreadsheet): The Google Sheets document.
+        title (str): The worksheet title.
+        header (list): The column names written to the first row of a newly created worksheet.
+
+    Returns:
+        Worksheet: The worksheet.
+    """
+    try:
+        return spreadsheet.worksheet(title)
+    except exceptions.WorksheetNotFound:
+        worksheet = spreadsheet.add_worksheet(title, rows=100, cols=len(header))
+        worksheet.append_row(header)
+        return worksheet
+
+
+def migrate_header(worksheet, header):
+    """
+    Brings the header row of a worksheet written by an older version up to date: columns added since then
+    (e.g. "Updated At", "Version") are appended to a header that is a prefix of the current one.
+
+    Args:
+        worksheet (Worksheet): The worksheet.
+        header (list): The current column names.
+    """
+    current = worksheet.row_values(1)
+    if current == header:
+        return
+    if current == header[:len(current)]:
+        worksheet.update(f"A1:{rowcol_to_a1(1, len(header))}", [header])
+        logger.info("Added the %s columns to the header of %s.", header[len(current):], worksheet.title)
+    else:
+        logger.warning("Unexpected header in %s: %s", worksheet.title, current)
 
 
 def get_google_sheets_connection(force_refresh=False):
@@ -21,9 +134,9 @@ def get_google_sheets_connection(force_refresh=False):
         force_refresh (bool): If True, forces the reinitialization of credentials and connections.
 
     Returns:
-        tuple: A tuple containing references to the main and metadata sheets.
+        tuple: A tuple containing the main sheet and the list of metadata sheets (one per shard).
     """
-    global CREDENTIALS, SHEET_CLIENT, MAIN_SHEET, METADATA_SHEET
+    global CREDENTIALS, SHEET_CLIENT, MAIN_SHEET, METADATA_SHEETS, SPREADSHEET
 
     # Reinitialize credentials and client if force_refresh is requested or no existing connection is found.
     if force_refresh or not CREDENTIALS or not SHEET_CLIENT:
@@ -33,17 +146,98 @@ def get_google_sheets_connection(force_refresh=False):
         )
         # Create a Google Sheets client using the credentials.
         SHEET_CLIENT = Client(auth=CREDENTIALS)
+        # gspread waits forever by default; bound the requests that open the document as well.
+        set_request_timeout("connect")
 
     # Open and access the main and metadata sheets if needed.
-    if force_refresh or not MAIN_SHEET or not METADATA_SHEET:
+    if force_refresh or not MAIN_SHEET or not METADATA_SHEETS:
         # Open the Google Sheets document using its unique ID.
-        google_sheet = SHEET_CLIENT.open_by_key(Config.GOOGLE_SHEET_ID)
+        SPREADSHEET = SHEET_CLIENT.open_by_key(Config.GOOGLE_SHEET_ID)
         # Access the first sheet (typically used for main data storage).
-        MAIN_SHEET = google_sheet.sheet1
-        # Access the metadata worksheet where user states are saved.
-        METADATA_SHEET = google_sheet.worksheet("Metadata")
+        MAIN_SHEET = SPREADSHEET.sheet1
+        # Access the metadata worksheets where user states are saved (shards are created on first use).
+        METADATA_SHEETS = [
+            get_or_create_worksheet(SPREADSHEET, title, METADATA_HEADER)
+            for title in get_metadata_sheet_titles(Config.METADATA_SHARDS)
+        ]
+        # Older Metadata tabs lack the columns added since (rows are read and written by position).
+        for worksheet in METADATA_SHEETS:
+            migrate_header(worksheet, METADATA_HEADER)
+        # Auxiliary worksheet and other groups' handles belong to the previous client.
+        AUXILIARY_SHEETS.clear()
+        TENANT_MAIN_SHEETS.clear()
+
+    return MAIN_SHEET, METADATA_SHEETS
+
+
+def set_request_timeout(operation):
+    """
+    Sets the timeout of the next Google Sheets requests from the remaining invocation budget.
+    Requests are blocking and run one at a time, so the shared client's timeout applies to the current call only.
+
+    Args:
+        operation (str): The name of the call, for the error message.
 
-    return MAIN_SHEET, METADATA_SHEET
+    Raises:
+        DeadlineExceeded: If too little time is left to start the call.
+    """
+    SHEET_CLIENT.set_timeout(get_deadline().call_timeout(Config.SHEETS_CALL_TIMEOUT_SECONDS, f"sheets.{operation}"))
+
+
+def refresh_credentials(ahead_seconds=TOKEN_REFRESH_AHEAD_SECONDS):
+    """
+    Refreshes the OAuth token of the shared client if it is missing or expires within `ahead_seconds`.
+    The client would refresh it on its own, but during the request of whichever update came first.
+
+    Args:
+        ahead_seconds (float): How long before its expiry the token is refreshed.
+
+    Returns:
+        bool: True if the token was refreshed.
+    """
+    get_google_sheets_connection()
+    expiry = CREDENTIALS.expiry  # Naive UTC datetime, as kept by google-auth.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if CREDENTIALS.token and expiry and expiry - now > timedelta(seconds=ahead_seconds):
+        return False
+    timeout = get_deadline().call_timeout(Config.SHEETS_CALL_TIMEOUT_SECONDS, "sheets.refresh_token")
+    with get_tracer().span("sheets.refresh_token"):
+        CREDENTIALS.refresh(functools.partial(Request(), timeout=timeout))
+    return True
+
+
+def get_auxiliary_worksheet(title, header):
+    """
+    Retrieves an auxiliary worksheet of the document, creating it with the given header if it does not exist.
+
+    Args:
+        title (str): The worksheet title.
+        header (list): The column names written to the first row of a newly created worksheet.
+
+    Returns:
+        Worksheet: The worksheet.
+    """
+    if title not in AUXILIARY_SHEETS:
+        get_google_sheets_connection()
+        AUXILIARY_SHEETS[title] = get_or_create_worksheet(SPREADSHEET, title, header)
+    return AUXILIARY_SHEETS[title]
+
+
+def get_tenant_main_sheet(sheet_id):
+    """
+    Retrieves the main worksheet of another group's document through the shared client,
+    so every group served by the container reuses the same credentials and connection pool.
+
+    Args:
+        sheet_id (str): The Google Sheets document ID.
+
+    Returns:
+        Worksheet: The first worksheet of the document.
+    """
+    if sheet_id not in TENANT_MAIN_SHEETS:
+        get_google_sheets_connection()
+        TENANT_MAIN_SHEETS[sheet_id] = SHEET_CLIENT.open_by_key(sheet_id).sheet1
+    return TENANT_MAIN_SHEETS[sheet_id]
 
 
 class GoogleSheets:
@@ -54,14 +248,32 @@ class GoogleSheets:
 
     def __init__(self):
         """
-        Initializes the GoogleSheets instance and establishes connections to the necessary worksheets.
+        Initializes the GoogleSheets instance. The shared connection is opened on first use (or by the
+        pre-warming of the container), so creating an instance never blocks and a failed connection is retried.
+        """
+        # Coherent per-container cache of the Metadata rows (None reads the sheet on every call).
+        self.metadata_cache = get_metadata_cache() if Config.METADATA_CACHE else None
+
+    @property
+    def main_sheet(self):
+        """
+        Returns:
+            Worksheet: The main worksheet of the default group, connecting first if needed.
+        """
+        return get_google_sheets_connection()[0]
+
+    @property
+    def metadata_sheets(self):
+        """
+        Returns:
+            list: The metadata worksheets (one per shard), connecting first if needed.
         """
-        # Establish connection to main and metadata sheets during initialization.
-        self.main_sheet, self.metadata_sheet = get_google_sheets_connection()
+        return get_google_sheets_connection()[1]
 
     def _retry_on_failure(self, func, *args, **kwargs):
         """
         Executes the given function and retries with refreshed connections if an API error occurs.
+        Each request is bounded by the remaining invocation budget, and the retry is only made if time is left for it.
 
         Args:
             func (callable): The function to execute.
@@ -72,62 +284,176 @@ class GoogleSheets:
             Any: The result of the function call.
 
         Raises:
+            DeadlineExceeded: If too little of the invocation budget is left to start a request.
             Exception: If an unexpected error occurs after retries.
         """
+        # Each attempt is a span of its own, so a retry after an API error shows up in the trace.
+        name = getattr(func, "__name__", "call").strip("<>")
         try:
-            return func(*args, **kwargs)
+            # The connection is opened lazily: the shared client does not exist until the first request
+            # of a container that was not pre-warmed (or whose warm-up failed).
+            get_google_sheets_connection()
+            set_request_timeout(name)
+            with get_tracer().span(f"sheets.api.{name}", attempt=1):
+                return func(*args, **kwargs)
         except exceptions.APIError as e:
+            # A reconnect and second attempt that cannot finish in time would only get the invocation killed.
+            if not get_deadline().has_time_for(RETRY_MIN_SECONDS):
+                logger.error("Google Sheets API error: %s, no time left to retry.", e)
+                raise
             # Log the API error and attempt to refresh the connection.
-            logger.error(f"Google Sheets API error: {e}, retrying with refreshed connection...", exc_info=True)
-            self.main_sheet, self.metadata_sheet = get_google_sheets_connection(force_refresh=True)
-            return func(*args, **kwargs)
+            logger.error("Google Sheets API error: %s, retrying with refreshed connection...", e, exc_info=True)
+            with get_tracer().span("sheets.reconnect"):
+                get_google_sheets_connection(force_refresh=True)
+            set_request_timeout(name)
+            with get_tracer().span(f"sheets.api.{name}", attempt=2):
+                return func(*args, **kwargs)
+        except DeadlineExceeded:
+            # Not an error of the sheet: the caller decides how to degrade.
+            raise
         except Exception as e:
             # Log any unexpected error and re-raise it.
-            logger.error(f"Unexpected error while accessing Google Sheets: {e}", exc_info=True)
+            logger.error("Unexpected error while accessing Google Sheets: %s", e, exc_info=True)
             raise
 
-    def save_to_sheet(self, user_id, responses):
+    def get_metadata_sheet(self, user_id):
+        """
+        Retrieves the metadata worksheet (shard) holding the state of a user.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+
+        Returns:
+            Worksheet: The metadata worksheet of the user's shard.
+        """
+        return self.metadata_sheets[get_shard_index(user_id, len(self.metadata_sheets))]
+
+    @staticmethod
+    def _sheet_key(tenant):
+        """
+        Identifies the main sheet document of a group.
+
+        Args:
+            tenant (Tenant | None): The group.
+
+        Returns:
+            str | None: The document ID, or None for the default document.
+        """
+        if tenant is None or tenant.sheet_id == Config.GOOGLE_SHEET_ID:
+            return None
+        return tenant.sheet_id
+
+    def get_main_sheet(self, tenant=None):
+        """
+        Retrieves the main worksheet receiving the applications of a group.
+
+        Args:
+            tenant (Tenant, optional): The group; defaults to the single-group settings.
+
+        Returns:
+            Worksheet: The main worksheet.
+        """
+        sheet_key = self._sheet_key(tenant)
+        return self.main_sheet if sheet_key is None else get_tenant_main_sheet(sheet_key)
+
+    def get_changes_sheet(self):
+        """
+        Retrieves the shared change log announcing Metadata writes to the other containers.
+
+        Returns:
+            Worksheet: The "Changes" worksheet.
+        """
+        return get_auxiliary_worksheet(CHANGES_SHEET_TITLE, CHANGES_HEADER)
+
+    @traced("sheets.find_metadata_row")
+    def _find_metadata_row(self, user_id):
+        """
+        Finds the Metadata row of a user, through the coherent cache if it is enabled.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+
+        Returns:
+            tuple: (row number, record), or (None, None) if the user has no Metadata row.
+        """
+        if self.metadata_cache:
+            return self.metadata_cache.get(self, self.get_changes_sheet(), user_id)
+        records = self.get_metadata_sheet(user_id).get_all_records()
+        for i, record in enumerate(records):
+            if str(record.get('User ID', '')) == str(user_id):
+                return i + 2, record
+        return None, None
+
+    @traced("sheets.save_to_sheet")
+    def save_to_sheet(self, user_id, responses, tenant=None):
         """
         Saves the user's responses to the main Google Sheets worksheet.
 
         Args:
             user_id (str): The unique identifier of the user.
             responses (dict): The user's responses mapped by field names.
+            tenant (Tenant, optional): The group the user applied to; defaults to the single-group settings.
         """
 
         def append_row():
             # Check for duplicates.
-            existing_row = self.get_user_row(user_id)
+            existing_row = self.get_user_row(user_id, tenant)
             if existing_row:
                 return
-            # Define the order of columns where responses will be stored.
-            column_order = [
-                "User ID",
-                "Full Name",
-                "Age",
-                "Email",
-                "Phone",
-                "Purpose",
-                "Occupation",
-                "Workplace",
-                "City",
-                "Username",
-                "Bio",
-                "DateTime",
-                "Instagram",
-                "Referral Source"
-            ]
+            # Define the order of columns where responses will be stored (custom questionnaires define their own).
+            column_order = (tenant.columns if tenant else None) or MAIN_COLUMNS
             # Set current datetime for "DateTime" column.
             responses["DateTime"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             # Create a new row with the user's ID and their responses, ensuring fields match the column order.
             row = [str(user_id)] + [responses.get(column, "") for column in column_order[1:]]
-            # Append the row to the main sheet.
-            self.main_sheet.append_row(row)
+            # Append the row to the group's main sheet.
+            self.get_main_sheet(tenant).append_row(row)
+            # Keep the duplicate index in sync (an index that is not loaded yet will read the row itself).
+            duplicate_index = get_duplicate_index(self._sheet_key(tenant))
+            if duplicate_index.loaded:
+                duplicate_index.add(user_id, responses.get("Email", ""), responses.get("Phone", ""))
 
         # Retry the append operation in case of transient failures.
         self._retry_on_failure(append_row)
 
-    def save_user_state(self, user_id, lang, current_question_index, responses, chat_id=None, last_question=None):
+    @traced("sheets.find_duplicates")
+    def find_duplicates(self, user_id, responses, tenant=None):
+        """
+        Finds other applicants with the same normalized email or phone number.
+        The index is loaded from the group's main sheet once per container; each lookup is O(1).
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            responses (dict): The user's responses mapped by field names.
+            tenant (Tenant, optional): The group the user applied to; defaults to the single-group settings.
+
+        Returns:
+            dict: Lists of matching user IDs keyed by "Email" and "Phone" (only non-empty matches).
+        """
+        duplicate_index = get_duplicate_index(self._sheet_key(tenant))
+        if not duplicate_index.loaded:
+            duplicate_index.load(self, self.get_main_sheet(tenant))
+        return duplicate_index.find(user_id, responses.get("Email", ""), responses.get("Phone", ""))
+
+    @traced("sheets.sync_duplicate_indexes")
+    def sync_duplicate_indexes(self):
+        """
+        Catches the duplicate indexes up with the rows appended to the main sheets since they were read.
+        The default group's index is loaded if needed; other groups' indexes once they are in use.
+
+        Returns:
+            int: The number of main sheet rows read.
+        """
+        get_duplicate_index()
+        rows = 0
+        for sheet_id, duplicate_index in list(DUPLICATE_INDEXES.items()):
+            worksheet = self.main_sheet if sheet_id is None else get_tenant_main_sheet(sheet_id)
+            rows += duplicate_index.sync(self, worksheet)
+        return rows
+
+    @traced("sheets.save_user_state")
+    def save_user_state(self, user_id, lang, current_question_index, responses, chat_id=None, last_question=None,
+                        updated_at=None, reminded_at=""):
         """
         Saves the user's current state, including responses and progress, to the metadata worksheet.
 
@@ -138,6 +464,10 @@ class GoogleSheets:
             responses (dict): The user's responses.
             chat_id (str, optional): The group chat ID where the user wants to join.
             last_question (str, optional): The last question asked (if applicable).
+            updated_at (str, optional): The last-activity timestamp; defaults to now. An empty string stops
+                the reminder scheduler from tracking the user.
+            reminded_at (str, optional): When the idle user was reminded; empty (the default) for any activity,
+                which starts the reminder delay over.
         """
 
         def save_state():
@@ -151,23 +481,178 @@ class GoogleSheets:
             # Serialize the user's responses into a JSON string for storage.
             responses_json = json.dumps(responses)
 
-            # Prepare the row with user state information.
-            new_row = [str(user_id), local_chat_id, lang, str(current_question_index), responses_json, last_question or ""]
-            records = self.metadata_sheet.get_all_records()
-
-            # Check if the user already exists in the metadata sheet.
-            for i, record in enumerate(records):
-                if str(record.get('User ID', '')) == str(user_id):
-                    # Update the existing row with the new state.
-                    self.metadata_sheet.update(f"A{i + 2}:F{i + 2}", [new_row])
-                    return
+            # Stamp the row with the last-activity time used by the reminder scheduler.
+            activity = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if updated_at is None else updated_at
 
-            # Append a new row if the user is not found.
-            self.metadata_sheet.append_row(new_row)
+            # Prepare the row with user state information (the version is set by the conditional write).
+            new_row = [
+                str(user_id), local_chat_id, lang, str(current_question_index), responses_json, last_question or "",
+                activity
+            ]
+            self._write_user_state(user_id, new_row, reminded_at)
 
         # Retry the state-saving operation if necessary.
         self._retry_on_failure(save_state)
 
+    @staticmethod
+    def _version(record):
+        """
+        Returns:
+            int: The row version of a Metadata record (0 for rows written before versioning).
+        """
+        version = str((record or {}).get("Version", "")).strip()
+        return int(version) if version.isdigit() else 0
+
+    @staticmethod
+    def _progress(lang, current_question_index):
+        """
+        Orders the states of one application: no language yet, then the privacy step (-1), then each answered question.
+
+        Args:
+            lang (str): The language of the state.
+            current_question_index (str | int): The question index of the state.
+
+        Returns:
+            tuple: A sortable (has language, question index) pair.
+        """
+        index = str(current_question_index).strip()
+        return bool(lang), int(index) if index.lstrip("-").isdigit() else 0
+
+    @classmethod
+    def _merge_state(cls, current, new_row):
+        """
+        Merges a state write with the row another container wrote in the meantime.
+        A write that is not ahead of the other one is dropped (first writer wins). A write that is ahead keeps the
+        answers already stored and only adds those for the questions the other write had not reached.
+
+        Args:
+            current (dict): The Metadata record written by the other container.
+            new_row (list): The Metadata values of this write, without the version column.
+
+        Returns:
+            list | None: The merged values, or None if this write must be dropped.
+        """
+        remote = cls._progress(current["Language"], current["Current Question Index"])
+        local = cls._progress(new_row[2], new_row[3])
+        if local <= remote:
+            return None
+        if current["Language"] != new_row[2]:
+            return new_row
+        try:
+            remote_responses = json.loads(current["Responses"]) if current["Responses"] else []
+            local_responses = json.loads(new_row[4]) if new_row[4] else []
+        except ValueError:
+            return new_row
+        if not isinstance(remote_responses, list) or not isinstance(local_responses, list):
+            return new_row
+        merged = list(new_row)
+        merged[4] = json.dumps(remote_responses + local_responses[len(remote_responses):])
+        return merged
+
+    @staticmethod
+    def _first_row_of_user(metadata_sheet, user_id):
+        """
+        Finds the first row of a user in a metadata worksheet by reading its User ID column only.
+
+        Args:
+            metadata_sheet (Worksheet): The metadata worksheet of the user's shard.
+            user_id (str): The unique identifier of the user.
+
+        Returns:
+            int | None: The sheet row number, or None if the user has no row.
+        """
+        for offset, cells in enumerate(metadata_sheet.get("A2:A")):
+            if cells and str(cells[0]) == str(user_id):
+                return offset + 2
+        return None
+
+    @traced("sheets.write_user_state")
+    def _write_user_state(self, user_id, new_row, reminded_at=""):
+        """
+        Writes a Metadata row with optimistic concurrency control.
+
+        The row is located (through the cache if enabled), then re-read on its own and compared with the
+        expected version. On a mismatch another container has written in the meantime, and the two writes are
+        merged: this write is dropped unless it is ahead of the other one, in which case it keeps the other's
+        answers and is checked again before it is written. A row that no longer belongs to the user (moved) is
+        re-resolved. A new row is appended, then the User ID column is read to make sure no other container
+        appended one for the same user at the same time: the first row wins and the later one is cleared.
+        The check and the write are separate requests (Sheets has no conditional update), so the remaining
+        race window is a single round trip instead of a whole-sheet scan.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            new_row (list): The Metadata values before the version column.
+            reminded_at (str): The value of the "Reminded At" column, written after the version.
+
+        Raises:
+            RuntimeError: If the row keeps changing after METADATA_WRITE_ATTEMPTS attempts.
+        """
+        metadata_sheet = self.get_metadata_sheet(user_id)
+        last_column = self.column_letter(len(METADATA_HEADER))
+        row_number, record = self._find_metadata_row(user_id)
+
+        for _ in range(METADATA_WRITE_ATTEMPTS):
+            if not row_number:
+                # Append a new row if the user is not found.
+                row = new_row + ["1", reminded_at]
+                row_number = self._appended_row_number(metadata_sheet.append_row(row))
+                first_row = self._first_row_of_user(metadata_sheet, user_id)
+                if first_row in (None, row_number):
+                    break
+                # Another container appended a row for the same user first: clear ours and write onto theirs.
+                logger.warning("Metadata row of user %s was appended twice, keeping row %s.", user_id, first_row)
+                metadata_sheet.batch_clear([f"A{row_number}:{last_column}{row_number}"])
+                row_number, record = first_row, None
+                continue
+
+            # Compare the expected version with the current content of the row.
+            current_range = metadata_sheet.get(f"A{row_number}:{last_column}{row_number}")
+            current = MetadataCache.to_record(current_range[0] if current_range else [])
+            if current["User ID"] != str(user_id):
+                # The row has moved (e.g. rebalancing): resolve it again.
+                logger.warning("Metadata row %s no longer holds user %s, re-resolving.", row_number, user_id)
+                if self.metadata_cache:
+                    self.metadata_cache.invalidate()
+                row_number, record = self._find_metadata_row(user_id)
+                continue
+            if self._version(current) != self._version(record):
+                if self.metadata_cache:
+                    self.metadata_cache.store(metadata_sheet.title, row_number, list(current.values()))
+                merged = self._merge_state(current, new_row)
+                if merged is None:
+                    logger.warning("Dropping state write of user %s: another update is not behind it.", user_id)
+                    return
+                # Check the merged write against the version written by the other container.
+                new_row, record = merged, current
+                continue
+
+            # Update the existing row with the new state and the next version.
+            row = new_row + [str(self._version(record) + 1), reminded_at]
+            metadata_sheet.update(f"A{row_number}:{last_column}{row_number}", [row])
+            break
+        else:
+            raise RuntimeError(f"Metadata row of user {user_id} kept changing, state was not saved.")
+
+        # Apply the write to the local cache and announce it to the other containers.
+        if self.metadata_cache:
+            self.metadata_cache.record_write(self, self.get_changes_sheet(), metadata_sheet.title, row_number, row)
+
+    def has_cached_state(self, user_id):
+        """
+        Tells, without any request, whether a state of the user is known to exist: a row held by the Metadata
+        cache, or a change log entry of another container read since (False if the cache is disabled).
+
+        Args:
+            user_id (str): The unique identifier of the user.
+
+        Returns:
+            bool: True if the user is known to have a Metadata row.
+        """
+        cache = self.metadata_cache
+        return bool(cache) and (str(user_id) in cache.records or str(user_id) in cache.stale)
+
+    @traced("sheets.get_user_state")
     def get_user_state(self, user_id):
         """
         Retrieves the user's saved state from the metadata worksheet.
@@ -180,34 +665,34 @@ class GoogleSheets:
         """
 
         def fetch_state():
-            # Retrieve all records from the metadata sheet.
-            records = self.metadata_sheet.get_all_records()
-            for record in records:
-                if str(record['User ID']) == str(user_id):
-                    # Deserialize the saved responses from JSON.
-                    responses = json.loads(record['Responses']) if record['Responses'] else []
-                    # Ensure responses are formatted as a list of tuples if necessary.
-                    if isinstance(responses, dict):
-                        responses = [(k, v) for k, v in responses.items()]
-                    lang = record['Language']
-                    raw_index = int(record['Current Question Index'])
-                    # Ensure the question index is within the valid range for the selected language.
-                    # This prevents "index out of range" errors if the stored index is too large.
-                    # For example, if the sheet has "12" but there are only 8 questions, this clamps it to 7.
-                    max_index = len(Localization.get_questions(lang)) - 1
-                    current_question_index = min(raw_index, max_index)
-                    return (
-                        lang,
-                        current_question_index,
-                        responses,
-                        record.get('Chat ID', "")
-                    )
+            # Look the user up in their metadata shard.
+            _, record = self._find_metadata_row(user_id)
+            if record:
+                # Deserialize the saved responses from JSON.
+                responses = json.loads(record['Responses']) if record['Responses'] else []
+                # Ensure responses are formatted as a list of tuples if necessary.
+                if isinstance(responses, dict):
+                    responses = [(k, v) for k, v in responses.items()]
+                lang = record['Language']
+                raw_index = int(record['Current Question Index'])
+                # Ensure the question index is within the valid range of the group's questionnaire.
+                # This prevents "index out of range" errors if the stored index is too large.
+                # For example, if the sheet has "12" but there are only 8 questions, this clamps it to 7.
+                max_index = len(get_tenant_registry().resolve(record.get('Chat ID')).schema) - 1
+                current_question_index = min(raw_index, max_index)
+                return (
+                    lang,
+                    current_question_index,
+                    responses,
+                    record.get('Chat ID', "")
+                )
             # Return default values if no state is found for the user.
             return None, 0, [], ""
 
         # Retry the state-fetching operation if necessary.
         return self._retry_on_failure(fetch_state)
 
+    @traced("sheets.get_chat_id")
     def get_chat_id(self, user_id):
         """
         Retrieves the user's Telegram chat ID from the metadata worksheet.
@@ -220,29 +705,241 @@ class GoogleSheets:
         """
 
         def fetch_chat_id():
-            # Retrieve all records from the metadata sheet.
-            records = self.metadata_sheet.get_all_records()
-            for record in records:
-                if str(record['User ID']) == str(user_id):
-                    # Return the associated chat ID if found.
-                    return record.get('Chat ID', "")
+            # Look the user up in their metadata shard.
+            _, record = self._find_metadata_row(user_id)
+            if record:
+                # Return the associated chat ID if found.
+                return record.get('Chat ID', "")
             # Return an empty string if no chat ID is found.
             return ""
 
         # Retry the chat ID-fetching operation if necessary.
         return self._retry_on_failure(fetch_chat_id)
 
-    def get_user_row(self, user_id):
+    @traced("sheets.get_all_metadata_records")
+    def get_all_metadata_records(self):
+        """
+        Retrieves every record of all metadata shards, with a single read per shard
+        (or only the rows changed since the last check if the cache is enabled).
+
+        Returns:
+            list: A list of dictionaries keyed by the metadata column names.
+        """
+        if self.metadata_cache:
+            return self._retry_on_failure(self.metadata_cache.get_all, self, self.get_changes_sheet())
+        return self._retry_on_failure(
+            lambda: [record for worksheet in self.metadata_sheets for record in worksheet.get_all_records()]
+        )
+
+    @traced("sheets.get_all_main_records")
+    def get_all_main_records(self, tenant=None):
+        """
+        Retrieves every record of a group's main worksheet in a single read.
+
+        Args:
+            tenant (Tenant, optional): The group; defaults to the single-group settings.
+
+        Returns:
+            list: A list of dictionaries keyed by the main sheet column names.
+        """
+        return self._retry_on_failure(lambda: self.get_main_sheet(tenant).get_all_records())
+
+    @staticmethod
+    def column_letter(column_number):
+        """
+        Converts a 1-based column number to its A1 letter (e.g. 3 becomes "C").
+
+        Args:
+            column_number (int): The 1-based column number.
+
+        Returns:
+            str: The column letter.
+        """
+        return rowcol_to_a1(1, column_number)[:-1]
+
+    def get_header(self, worksheet):
+        """
+        Retrieves the header row (column names) of a worksheet.
+
+        Args:
+            worksheet (Worksheet): The worksheet to read.
+
+        Returns:
+            list: The column names.
+        """
+        return self._retry_on_failure(worksheet.row_values, 1)
+
+    def batch_update_cells(self, worksheet, updates):
+        """
+        Writes many cell ranges of a worksheet in a single request.
+
+        Args:
+            worksheet (Worksheet): The worksheet to update.
+            updates (list): A list of {"range": A1 range, "values": 2D list} dictionaries.
+        """
+        if updates:
+            self._retry_on_failure(worksheet.batch_update, updates)
+
+    def get_all_values(self, worksheet):
+        """
+        Retrieves every cell value of a (small) worksheet, including the header row.
+
+        Args:
+            worksheet (Worksheet): The worksheet to read.
+
+        Returns:
+            list: A list of rows, each a list of cell values.
+        """
+        return self._retry_on_failure(worksheet.get_all_values)
+
+    def append_row(self, worksheet, row):
+        """
+        Appends a row to a worksheet.
+
+        Args:
+            worksheet (Worksheet): The worksheet to update.
+            row (list): The cell values.
+
+        Returns:
+            int: The sheet row number of the appended row.
+        """
+        return self._appended_row_number(self._retry_on_failure(worksheet.append_row, row))
+
+    def append_rows(self, worksheet, rows):
+        """
+        Appends several rows to a worksheet in a single request.
+
+        Args:
+            worksheet (Worksheet): The worksheet to update.
+            rows (list): The rows of cell values.
+
+        Returns:
+            int: The sheet row number of the first appended row.
+        """
+        return self._appended_row_number(self._retry_on_failure(worksheet.append_rows, rows))
+
+    @staticmethod
+    def _appended_row_number(response):
+        """
+        Extracts the sheet row number from the response of an append request.
+
+        Args:
+            response (dict): The API response.
+
+        Returns:
+            int: The sheet row number of the (first) appended row.
+        """
+        # The response holds the written range, e.g. "Stats!A5:P5".
+        updated_range = response["updates"]["updatedRange"].split("!")[-1]
+        return int("".join(ch for ch in updated_range.split(":")[0] if ch.isdigit()))
+
+    def get_ranges(self, worksheet, ranges):
+        """
+        Reads several A1 ranges of a worksheet in a single request.
+
+        Args:
+            worksheet (Worksheet): The worksheet to read.
+            ranges (list): The A1 ranges.
+
+        Returns:
+            list: One 2D list of cell values per range (trailing empty rows and cells are omitted).
+        """
+        return self._retry_on_failure(worksheet.batch_get, ranges)
+
+    def update_row(self, worksheet, row_number, row):
+        """
+        Overwrites a row of a worksheet, starting from column A.
+
+        Args:
+            worksheet (Worksheet): The worksheet to update.
+            row_number (int): The sheet row number.
+            row (list): The cell values.
+        """
+        self._retry_on_failure(
+            worksheet.update, f"A{row_number}:{self.column_letter(len(row))}{row_number}", [row]
+        )
+
+    def iter_column_chunks(self, worksheet, column_names, chunk_size=5000, start_row=2):
+        """
+        Streams selected columns of a worksheet in fixed-size row chunks.
+        Each chunk is fetched with a single batch request containing one A1 range per column,
+        so only the requested columns are downloaded and memory stays bounded by the chunk size.
+
+        Args:
+            worksheet (Worksheet): The worksheet to read.
+            column_names (list): Header names of the columns to read.
+            chunk_size (int): The number of rows per chunk.
+            start_row (int): The first sheet row to read (row 1 is the header).
+
+        Yields:
+            tuple: (first_row_number, {column_name: [cell values]}) for each non-empty chunk.
+
+        Raises:
+            ValueError: If one of the columns is missing from the header row.
+        """
+        header = self.get_header(worksheet)
+        missing = [name for name in column_names if name not in header]
+        if missing:
+            raise ValueError(f"Columns not found in worksheet '{worksheet.title}': {missing}")
+        letters = [self.column_letter(header.index(name) + 1) for name in column_names]
+
+        start = start_row
+        while True:
+            end = start + chunk_size - 1
+            ranges = [f"{letter}{start}:{letter}{end}" for letter in letters]
+            value_ranges = self._retry_on_failure(worksheet.batch_get, ranges)
+            # Trailing empty rows are omitted by the API, so pad every column to the longest one.
+            size = max((len(value_range) for value_range in value_ranges), default=0)
+            if size == 0:
+                return
+            columns = {
+                name: [row[0] if row else "" for row in value_range] + [""] * (size - len(value_range))
+                for name, value_range in zip(column_names, value_ranges)
+            }
+            yield start, columns
+            if size < chunk_size:
+                return
+            start = end + 1
+
+    def iter_rows(self, worksheet, chunk_size=1000, start_row=2):
+        """
+        Streams the rows of a worksheet as dictionaries, fetching fixed-size A1 ranges one page at a time.
+        Unlike get_all_records, memory use is bounded by the page size regardless of the sheet size.
+
+        Args:
+            worksheet (Worksheet): The worksheet to read.
+            chunk_size (int): The number of rows fetched per request.
+            start_row (int): The first sheet row to read (row 1 is the header).
+
+        Yields:
+            tuple: (row_number, {column_name: value}) for each non-empty row.
+        """
+        header = self.get_header(worksheet)
+        last_letter = self.column_letter(len(header))
+        start = max(start_row, 2)
+        while True:
+            end = start + chunk_size - 1
+            rows = self._retry_on_failure(worksheet.get, f"A{start}:{last_letter}{end}")
+            for offset, row in enumerate(rows):
+                if any(cell != "" for cell in row):
+                    yield start + offset, dict(zip(header, row + [""] * (len(header) - len(row))))
+            if len(rows) < chunk_size:
+                return
+            start = end + 1
+
+    @traced("sheets.get_user_row")
+    def get_user_row(self, user_id, tenant=None):
         """
         Retrieves the full row of user data from the main sheet by user ID.
 
         Args:
             user_id (str): The Telegram user ID.
+            tenant (Tenant, optional): The group the user applied to; defaults to the single-group settings.
 
         Returns:
             dict: A dictionary with column names as keys and user responses as values.
         """
-        records = self.main_sheet.get_all_records()
+        records = self.get_main_sheet(tenant).get_all_records()
         for row in records:
             if str(row.get("User ID")) == str(user_id):
                 return row
@@ -1,11 +1,21 @@
+import html
+import json
+from telegram import KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove, WebAppInfo
 from telegram.ext import CommandHandler, MessageHandler, CallbackQueryHandler, ChatJoinRequestHandler, filters
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from shared.telegram_bot.forms import ApplicationForm
+from shared.telegram_bot.inbound import ADMITTED, THROTTLED, get_inbound_guard
 from shared.telegram_bot.localization import Localization
-from shared.telegram_bot.validation import Validation
-from telegram.error import Forbidden
-from shared.telegram_bot.logger import logger
+from shared.telegram_bot.backlog import ALREADY_HANDLED_ERRORS
+from telegram.error import BadRequest, Forbidden, TelegramError
+from shared.telegram_bot.logger import log_context, logger
 from shared.telegram_bot.config import Config
+from shared.telegram_bot.outbound import Priority, get_outbound_scheduler
+from shared.telegram_bot.outbox import JOB_APPROVE_JOIN_REQUEST, JOB_NOTIFY_ADMINS, JOB_SAVE_APPLICATION, get_outbox
+from shared.telegram_bot.reminders import get_reminder_scheduler
+from shared.telegram_bot.stats import get_funnel_stats
+from shared.telegram_bot.tenants import get_tenant_registry
+from shared.telegram_bot.tracing import get_tracer
+from shared.telegram_bot.webapp import get_form_url
 
 class BotHandlers:
     """
@@ -27,6 +37,12 @@ class BotHandlers:
         self.bot = bot
         self.user_forms = {}  # Dictionary to track user forms.
         self.localization = Localization()  # Localization instance to retrieve strings.
+        self.scheduler = get_outbound_scheduler()  # Rate-limited gate for every outbound Telegram call.
+        self.reminders = get_reminder_scheduler()  # Index of in-flight users for reminders and automatic decline.
+        self.stats = get_funnel_stats()  # Funnel counters updated on every transition.
+        self.tenants = get_tenant_registry()  # Per-group settings resolved from the group chat ID.
+        self.outbox = get_outbox()  # Durable queue of the side effects of completed applications.
+        self.inbound = get_inbound_guard()  # Per-user flood limit and negative cache in front of state lookups.
 
     async def start(self, update, context):
         """
@@ -37,17 +53,12 @@ class BotHandlers:
             context (CallbackContext): The context of the update.
         """
         user_id = update.effective_user.id
-        # Create the language selection menu with buttons.
-        keyboard = [[
-            InlineKeyboardButton("Русский", callback_data="lang_ru"),
-            InlineKeyboardButton("Қазақша", callback_data="lang_kz"),
-            InlineKeyboardButton("English", callback_data="lang_en")
-        ]]
-        await self.bot.send_message(
-            chat_id=user_id,
-            text=self.localization.get_multilang_welcome_message(),
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+        # Greet join requests with the name of the requested group (a plain /start uses the default group).
+        join_request = update.chat_join_request
+        tenant = self.tenants.resolve(join_request.chat.id if join_request else None)
+        # Send the pre-rendered welcome message with the language selection menu.
+        welcome = self.localization.get_rendered(None, "welcome", tenant)
+        await self.scheduler.send_message(self.bot, user_id, **welcome.as_kwargs())
 
     async def set_language(self, update, context):
         """
@@ -61,15 +72,34 @@ class BotHandlers:
         user = query.from_user
         if user.is_bot:
             return
-        await query.answer()
+        await self.scheduler.call(Priority.CALLBACK, None, query.answer)
         user_id = query.from_user.id
         lang = query.data.split("_")[1]  # Extract the selected language code.
         context.user_data["lang"] = lang
         chat_id = self.google_sheets.get_chat_id(user_id)
         # Save the user's state with the selected language.
         self._save_user_state(user_id, lang, -1, [], chat_id)
+        self.stats.record("language", lang)
         await self.send_privacy_policy(update, context)
 
+    async def change_language(self, update, context):
+        """
+        Handles the "change language" button of a privacy prompt sent in a preselected language
+        by showing the language menu in its place.
+
+        Args:
+            update (Update): The incoming callback update.
+            context (CallbackContext): The context of the update.
+        """
+        query = update.callback_query
+        if query.from_user.is_bot:
+            return
+        await self.scheduler.call(Priority.CALLBACK, None, query.answer)
+        language_menu = self.localization.get_rendered(None, "language_menu")
+        await self.scheduler.call(
+            Priority.CALLBACK, query.from_user.id, query.edit_message_text, **language_menu.as_kwargs()
+        )
+
     async def send_privacy_policy(self, update, context):
         """
         Sends the privacy policy to the user in the selected language.
@@ -80,27 +110,16 @@ class BotHandlers:
         """
         user_id = update.callback_query.from_user.id if update.callback_query else update.message.from_user.id
         lang = context.user_data.get("lang") or self.google_sheets.get_user_state(user_id)[0]
-        privacy_policy_link = self.utils.fetch_privacy_policy(lang, self.localization)
-        message_text = f"{self.localization.get_string(lang, 'privacy_prompt')}\n\n{privacy_policy_link}"
-        keyboard = [[
-            InlineKeyboardButton(self.localization.get_string(lang, "privacy_accept"), callback_data="privacy_accept"),
-            # InlineKeyboardButton(self.localization.get_string(lang, "privacy_decline"), callback_data="privacy_decline")
-        ]]
+        # The privacy prompt, policy link and "accept" keyboard are pre-rendered once per language.
+        privacy = self.localization.get_rendered(lang, "privacy")
         if update.callback_query:
             # Edit the existing message to include the privacy policy.
-            await update.callback_query.edit_message_text(
-                text=message_text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode="Markdown"
+            await self.scheduler.call(
+                Priority.CALLBACK, user_id, update.callback_query.edit_message_text, **privacy.as_kwargs()
             )
         else:
             # Send a new message with the privacy policy.
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=message_text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode="Markdown"
-            )
+            await self.scheduler.send_message(self.bot, user_id, **privacy.as_kwargs())
 
     async def handle_privacy_response(self, update, context):
         """
@@ -119,7 +138,8 @@ class BotHandlers:
         if user.is_bot:
             return
 
-        await query.answer()  # Acknowledge the callback to prevent Telegram from showing "loading...".
+        # Acknowledge the callback to prevent Telegram from showing "loading...".
+        await self.scheduler.call(Priority.CALLBACK, None, query.answer)
 
         # Extract the user's Telegram ID.
         user_id = user.id
@@ -133,8 +153,11 @@ class BotHandlers:
 
         # Check if the user accepted the privacy policy.
         if query.data == "privacy_accept":
-            # Create a new application form for the user to start the questionnaire.
-            form = ApplicationForm(lang, self.localization)
+            self.stats.record("privacy", lang)
+
+            # Create a new application form with the questionnaire of the requested group.
+            tenant = self.tenants.resolve(chat_id)
+            form = ApplicationForm(lang, self.localization, tenant.schema)
             form.current_question_index = 0  # Set the starting question index.
             form.responses = responses  # Load any existing responses.
             self.user_forms[user_id] = form  # Store the form in memory.
@@ -142,13 +165,21 @@ class BotHandlers:
             # Save the user's state (so progress can be recovered if needed).
             self._save_user_state(user_id, lang, form.current_question_index, form.responses, chat_id)
 
-            # Retrieve the first question from the questionnaire.
-            first_question = form.get_next_question()
-
             # Edit the existing message to include the questionnaire introduction and the first question.
-            await query.edit_message_text(
-                text=f"{self.localization.get_string(lang, 'start_questionnaire')}\n\n{first_question}"
-            )
+            intro = self.localization.get_rendered(lang, "questionnaire_intro", tenant)
+            await self.scheduler.call(Priority.CALLBACK, user_id, query.edit_message_text, **intro.as_kwargs())
+
+            # Offer the whole questionnaire as a Web App form; answering here one question at a time still works.
+            form_url = get_form_url(lang, tenant.chat_id)
+            if form_url:
+                keyboard = ReplyKeyboardMarkup(
+                    [[KeyboardButton(f"📝 {self.localization.get_string(lang, 'open_form')}",
+                                     web_app=WebAppInfo(form_url))]],
+                    resize_keyboard=True,
+                )
+                await self.scheduler.send_message(
+                    self.bot, user_id, text=self.localization.get_string(lang, "webapp_prompt"), reply_markup=keyboard
+                )
 
         # If the user had rejected the policy (not used in current implementation).
         else:
@@ -179,32 +210,46 @@ class BotHandlers:
         # 3. Extract the user's Telegram ID (used for private messaging).
         user_id = user.id
 
-        # 4. Retrieve the user's state (language, current question index, responses, and group chat_id).
+        # 4. Drop flooding users and users recently found without state before any Google Sheets request.
+        if not await self._admit(user):
+            return
+
+        # 5. Retrieve the user's state (language, current question index, responses, and group chat_id).
         lang, current_question_index, responses, stored_chat_id = self.google_sheets.get_user_state(user_id)
 
-        # 5. If the user has not selected a language yet, prompt them to choose one.
+        # 6. If the user has not selected a language yet, prompt them to choose one.
         if not lang:
+            # A user without any Metadata row (no join request) is told once, then ignored for a while.
+            # Users with a row but no language yet are never cached: they may answer from another container.
+            if lang is None:
+                self.inbound.mark_unknown(user_id)
             # Always reply in private chat, even if the user mistakenly messages in the group.
             try:
-                await context.bot.send_message(chat_id=user_id, text=Localization.PRESS_BUTTON_MULTILANG)
+                press_button = self.localization.get_rendered(None, "press_button")
+                await self.scheduler.send_message(context.bot, user_id, **press_button.as_kwargs())
             except Forbidden:
-                logger.warning(f"Cannot send message to user {user_id} — bot is not allowed to initiate the chat.")
+                logger.warning("Cannot send message to user %s — bot is not allowed to initiate the chat.", user_id)
             return
 
-        # 6. If the user has selected a language but hasn't agreed to the privacy policy yet, prompt them.
+        # 7. If the user has selected a language but hasn't agreed to the privacy policy yet, prompt them.
         if current_question_index < 0:
-            press_button_text = self.localization.get_string(lang, "press_button")
-            await context.bot.send_message(chat_id=user_id, text=press_button_text)
+            press_button = self.localization.get_rendered(lang, "press_button")
+            await self.scheduler.send_message(context.bot, user_id, **press_button.as_kwargs())
             return
 
-        # 7. Convert responses from a dictionary to a list of tuples if necessary.
+        # 8. Convert responses from a dictionary to a list of tuples if necessary.
         if isinstance(responses, dict):
             responses = [(q, a) for q, a in responses.items()]
 
-        # 8. Retrieve or create an in-memory ApplicationForm object for the user.
+        # 9. Resolve the requested group and retrieve or create an in-memory ApplicationForm object for the user.
+        tenant = self.tenants.resolve(stored_chat_id)
+        # A completed application is final: later messages (e.g. "thanks!") are ignored. Completion is told by the
+        # number of stored answers, as the stored index of a complete form is clamped to the last question.
+        if len(responses) >= len(tenant.schema):
+            return
         form = self.user_forms.get(user_id)
         if not form:
-            form = ApplicationForm(lang, self.localization)
+            form = ApplicationForm(lang, self.localization, tenant.schema)
             form.current_question_index = current_question_index
             form.responses = responses
             self.user_forms[user_id] = form
@@ -213,48 +258,88 @@ class BotHandlers:
         if form.is_complete():
             return
 
-        # 9. Extract the user's response text and validate it.
+        # 10. Extract the user's response text and validate it.
         user_response = update.message.text.strip()
         if not await self._validate_and_handle_response(user_response, form, user_id):
             return  # If validation fails, stop processing further.
 
-        # 10. Check if the form is complete.
+        # 11. Complete the application if this was the last answer, otherwise send the next question.
         if form.is_complete():
-            # 10.1 Gather all user responses into a dictionary.
-            final_answers = form.get_all_responses()
-
-            # 10.2 Fetch username and bio from Telegram API (only works if the bot is an admin).
-            chat_info = await context.bot.get_chat(user_id)
-            username = chat_info.username or ""
-            bio = chat_info.bio or ""
+            await self._complete_application(user_id, form, tenant, stored_chat_id, update.message.date)
+        else:
+            await self._send_next_question(user_id)
 
-            # 10.3 Add the username and bio to the final_answers dictionary.
-            final_answers["Username"] = username
-            final_answers["Bio"] = bio
+    async def _admit(self, user):
+        """
+        Runs a private message through the inbound guard. A user exceeding the per-user rate is told to slow
+        down once per notice interval (in the language of their Telegram client, as their state is not read).
 
-            # 10.4 Save the user's responses in Google Sheets.
-            self.google_sheets.save_to_sheet(user_id, final_answers)
+        Args:
+            user (User): The sender of the message.
 
-            # 10.5 Cleanup and confirm completion.
-            del self.user_forms[user_id]
-            self._save_user_state(user_id, form.lang, form.current_question_index, form.responses, stored_chat_id)
+        Returns:
+            bool: True if the message should be processed.
+        """
+        verdict = self.inbound.admit(user.id, self.google_sheets.has_cached_state)
+        if verdict == THROTTLED:
+            lang = Localization.language_from_code(user.language_code)
+            text = (Localization.get_string(lang, "too_many_messages") if lang
+                    else Localization.get_multilang_string("too_many_messages"))
+            try:
+                await self.scheduler.send_message(self.bot, user.id, text=text)
+            except Forbidden:
+                logger.warning("Cannot send message to user %s — bot is not allowed to initiate the chat.", user.id)
+        return verdict == ADMITTED
 
-            # 10.6 Build and send a localized confirmation message to the user.
-            completion_text = self.localization.get_string(form.lang, "application_complete")
+    async def handle_web_app_data(self, update, context):
+        """
+        Handles the answers submitted at once from the Web App form: validates every answer with the
+        questionnaire's validators and completes the application in the same update.
 
-            # Append the group invite link if it’s available in environment variables.
-            if Config.GROUP_INVITE_LINK:
-                # Optionally format as Markdown clickable link.
-                completion_text += f"\n\n🔗 [Qazaq IT Community]({Config.GROUP_INVITE_LINK})"
+        Args:
+            update (Update): The incoming update carrying the `web_app_data` service message.
+            context (CallbackContext): The context of the update.
+        """
+        message = update.message
+        user = message.from_user
+        if not user or user.is_bot or message.chat.type != "private":
+            return
+        user_id = user.id
+        if not await self._admit(user):
+            return
 
-            # Send the message using Markdown for better formatting.
-            await context.bot.send_message(chat_id=user_id, text=completion_text, parse_mode="Markdown")
+        lang, current_question_index, stored_responses, stored_chat_id = self.google_sheets.get_user_state(user_id)
+        tenant = self.tenants.resolve(stored_chat_id)
+        # The form is only offered after the privacy step; a second submission of a completed form is ignored
+        # (the stored index of a complete form is clamped to the last question, so the answers are counted).
+        if not lang or current_question_index < 0 or len(stored_responses or ()) >= len(tenant.schema):
+            return
 
-            # 10.7 Approve the user’s request to join the group (if applicable).
-            await self.approve_join_request(user_id, context)
-        else:
-            # 11. If the form is not yet complete, send the next question to the user.
-            await self._send_next_question(user_id)
+        try:
+            answers = json.loads(message.web_app_data.data).get("answers")
+        except (ValueError, AttributeError):
+            answers = None
+        if not isinstance(answers, dict):
+            answers = {}
+
+        # The browser checks the answers too, but the data is only trusted after the server-side validation.
+        # Nothing is saved unless every answer is valid; the user corrects the form and submits it again.
+        responses = [str(answers.get(question.field_id) or "").strip() for question in tenant.schema.questions]
+        for question, answer in zip(tenant.schema.questions, responses):
+            if not answer or (question.validator and not question.validator(answer)):
+                error = self.localization.get_string(lang, question.error_key if answer else "form_required")
+                text = (f"{self.localization.get_string(lang, 'form_incomplete')}\n\n"
+                        f"{question.text(lang)}\n{error}")
+                await self.scheduler.send_message(self.bot, user_id, text=text)
+                return
+
+        form = ApplicationForm(lang, self.localization, tenant.schema)
+        for answer in responses:
+            form.save_response(answer)
+            self.stats.record_answer(form.current_question_index, lang)
+
+        self.user_forms[user_id] = form
+        await self._complete_application(user_id, form, tenant, stored_chat_id, message.date)
 
     async def handle_join_request(self, update, context):
         """
@@ -280,63 +365,122 @@ class BotHandlers:
         # Get the chat ID of the group the user is requesting to join.
         chat_id = join_request.chat.id
 
+        # If the user's Telegram language is supported, skip the language menu: save the language with the state
+        # and send the privacy prompt right away (with a button to change the language).
+        lang = Localization.language_from_code(user.language_code) if Config.PRESELECT_LANGUAGE else None
+        if lang:
+            self._save_user_state(user_id, lang, -1, [], str(chat_id))
+            self.stats.record("join_request", "")
+            self.stats.record("language", lang)
+            welcome = self.localization.get_rendered(lang, "welcome_privacy", self.tenants.resolve(chat_id))
+            await self.scheduler.send_message(self.bot, user_id, **welcome.as_kwargs())
+            return
+
         # Initialize and save the user's state in Google Sheets with:
         # - an empty language string (to be selected later),
         # - starting at question index 0,
         # - an empty list of responses,
         # - and the group chat ID as a string.
         self._save_user_state(user_id, "", 0, [], str(chat_id))
+        self.stats.record("join_request", "")
 
         # Start the onboarding process by sending a language selection message.
         await self.start(update, context)
 
-    async def approve_join_request(self, user_id, context):
+    async def save_application(self, user_id, payload):
         """
-        Approves the user's join request after successful completion of the questionnaire
-        and sends full user data to the admin group.
+        Outbox job: appends the answers of a completed form, with the user's username and bio, to the main sheet
+        of the requested group. Idempotent: a user who already has a row is not appended again.
 
         Args:
             user_id (str): The Telegram user ID.
-            context (CallbackContext): The context of the update.
+            payload (dict): The group chat ID ("chat_id") and the answers ("answers").
         """
-        # Retrieve user's saved state (includes chat_id).
-        lang, _, _, chat_id = self.google_sheets.get_user_state(user_id)
+        tenant = self.tenants.resolve(payload["chat_id"])
+        answers = dict(payload["answers"])
+        # Username and bio are secondary data: the answers are saved without them if Telegram refuses the lookup.
+        try:
+            answers["Username"], answers["Bio"] = await self.fetch_username_and_bio(self.bot, int(user_id))
+        except TelegramError as e:
+            logger.warning("Could not fetch the username and bio of user %s: %s", user_id, e)
+            answers["Username"], answers["Bio"] = "", ""
+        self.google_sheets.save_to_sheet(user_id, answers, tenant)
+
+    async def approve_join_request(self, user_id, payload):
+        """
+        Outbox job: approves the user's join request after successful completion of the questionnaire.
+        Idempotent: a request that was already approved (or withdrawn) counts as done.
 
-        # Approve the join request.
-        if not chat_id:
-            chat_id = Config.DEFAULT_GROUP_CHAT_ID
-        if chat_id:
-            await context.bot.approve_chat_join_request(chat_id=int(chat_id), user_id=user_id)
+        Args:
+            user_id (str): The Telegram user ID.
+            payload (dict): The group chat ID ("chat_id").
+        """
+        try:
+            await self.scheduler.call(
+                Priority.QUESTION,
+                None,
+                self.bot.approve_chat_join_request,
+                chat_id=int(payload["chat_id"]),
+                user_id=int(user_id)
+            )
+        except BadRequest as e:
+            if not any(fragment in str(e).lower() for fragment in ALREADY_HANDLED_ERRORS):
+                raise
+            logger.info("The join request of user %s was already handled: %s", user_id, e)
 
-        # Fetch the full row of data from Google Sheets by user ID.
-        final_data = self.google_sheets.get_user_row(user_id)
-        if not final_data:
-            await self.utils.notify_admin("✅ User approved but no data found in the Google Sheets.")
-            return
+    async def notify_admins(self, user_id, payload):
+        """
+        Outbox job: sends the saved application of an approved user, with possible duplicate accounts,
+        to the admin chat of the requested group.
 
-        # Format the data for a readable admin message.
-        formatted_message = "✅ *New Member Approved!*\n\n"
-        for key, value in final_data.items():
-            formatted_message += f"*{key}:* {value}\n"
+        Args:
+            user_id (str): The Telegram user ID.
+            payload (dict): The group chat ID ("chat_id").
+        """
+        tenant = self.tenants.resolve(payload["chat_id"])
 
-        # Send to admin group.
-        await self.utils.notify_admin(formatted_message)
+        # Fetch the full row of data from the group's Google Sheets by user ID.
+        final_data = self.google_sheets.get_user_row(user_id, tenant)
+        if not final_data:
+            formatted_message = "✅ User approved but no data found in the Google Sheets."
+        else:
+            # Format the data for a readable admin message (HTML: the answers are escaped, so they cannot break it).
+            formatted_message = "✅ <b>New Member Approved!</b>\n\n"
+            for key, value in final_data.items():
+                formatted_message += f"<b>{html.escape(str(key))}:</b> {html.escape(str(value))}\n"
+
+            # Warn the admins about other accounts with the same email or phone (cells may be read as numbers).
+            contacts = {field: str(final_data.get(field, "")) for field in ("Email", "Phone")}
+            for field, user_ids in self.google_sheets.find_duplicates(user_id, contacts, tenant).items():
+                formatted_message += (
+                    f"\n⚠️ <b>Possible duplicate:</b> same {field} as User ID {html.escape(', '.join(user_ids))}"
+                )
+
+        # Send to the admin group of the requested group. Unlike Utils.notify_admin, errors are raised,
+        # so the outbox retries the notification.
+        await self.scheduler.send_message(
+            self.bot,
+            tenant.admin_chat_id or Config.ADMIN_CHAT_ID,
+            priority=Priority.ADMIN,
+            text=formatted_message,
+            parse_mode="HTML"
+        )
 
     @staticmethod
-    async def fetch_username_and_bio(context, user_id):
+    async def fetch_username_and_bio(bot, user_id):
         """
         Asynchronously fetches the user's chat info from the Telegram API (get_chat).
         Returns the username and bio if available; otherwise returns empty strings.
 
         Args:
-            context (CallbackContext): The context of the current update, used to access bot methods.
+            bot (Bot): The Telegram bot instance.
             user_id (int): The Telegram user ID for which we want to retrieve info.
 
         Returns:
             tuple(str, str): A tuple (username, bio).
         """
         # Since the bot is an admin, get_chat should provide username and bio if they're set.
-        chat_info = await context.bot.get_chat(user_id)
+        chat_info = await bot.get_chat(user_id)
 
         # Extract username and bio, defaulting to empty strings if they're None.
         username = chat_info.username or ""
@@ -344,18 +488,72 @@ class BotHandlers:
 
         return username, bio
 
+    async def show_stats(self, update, context):
+        """
+        Handles the admin-only /stats command by replying with the funnel of the last seven days.
+        The answer is built from the small aggregate "Stats" worksheet, without scanning Metadata.
+
+        Args:
+            update (Update): The incoming update triggering the command.
+            context (CallbackContext): The context of the update.
+        """
+        # Only answer in the admin chat.
+        if str(update.effective_chat.id) != str(Config.ADMIN_CHAT_ID):
+            return
+        summary = self.stats.summary(self.google_sheets)
+        await self.scheduler.send_message(
+            self.bot,
+            update.effective_chat.id,
+            priority=Priority.ADMIN,
+            text=self.stats.format_summary(summary),
+            parse_mode="HTML"
+        )
+
     def setup(self, application):
         """
-        Sets up the handlers for the Telegram bot by registering them with the application.
+        Sets up the handlers for the Telegram bot by registering them with the application,
+        and the executors of the outbox jobs.
 
         Args:
             application (Application): The Telegram bot application.
         """
-        application.add_handler(CommandHandler("start", self.start))
-        application.add_handler(CallbackQueryHandler(self.set_language, pattern="^lang_"))
-        application.add_handler(CallbackQueryHandler(self.handle_privacy_response, pattern="^privacy_"))
-        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_response))
-        application.add_handler(ChatJoinRequestHandler(self.handle_join_request))
+        application.add_handler(CommandHandler("start", self._instrumented(self.start)))
+        application.add_handler(CommandHandler("stats", self._instrumented(self.show_stats)))
+        application.add_handler(CallbackQueryHandler(self._instrumented(self.set_language), pattern="^lang_"))
+        application.add_handler(
+            CallbackQueryHandler(self._instrumented(self.change_language), pattern="^change_language$")
+        )
+        application.add_handler(
+            CallbackQueryHandler(self._instrumented(self.handle_privacy_response), pattern="^privacy_")
+        )
+        application.add_handler(
+            MessageHandler(filters.TEXT & ~filters.COMMAND, self._instrumented(self.handle_response))
+        )
+        application.add_handler(
+            MessageHandler(filters.StatusUpdate.WEB_APP_DATA, self._instrumented(self.handle_web_app_data))
+        )
+        application.add_handler(ChatJoinRequestHandler(self._instrumented(self.handle_join_request)))
+        # Side effects of completed applications are performed by the outbox (after the update or periodically).
+        self.outbox.register(JOB_SAVE_APPLICATION, self.save_application)
+        self.outbox.register(JOB_APPROVE_JOIN_REQUEST, self.approve_join_request)
+        self.outbox.register(JOB_NOTIFY_ADMINS, self.notify_admins)
+
+    @staticmethod
+    def _instrumented(callback):
+        """
+        Wraps a handler callback so that every record it logs carries the handler name
+        and its run is traced as a span.
+
+        Args:
+            callback (coroutine function): The handler callback.
+
+        Returns:
+            coroutine function: The wrapped callback.
+        """
+        async def wrapper(update, context):
+            with log_context(handler=callback.__name__), get_tracer().span(f"handler.{callback.__name__}"):
+                return await callback(update, context)
+        return wrapper
 
     def _save_user_state(self, user_id, lang, current_question_index, responses, chat_id):
         """
@@ -371,6 +569,50 @@ class BotHandlers:
         if not chat_id:
             chat_id = Config.DEFAULT_GROUP_CHAT_ID
         self.google_sheets.save_user_state(user_id, lang, current_question_index, responses, chat_id)
+        # The user has state now: their messages are looked up again.
+        self.inbound.forget(user_id)
+        # Reschedule (or forget, once the form is complete) the user's reminder.
+        self.reminders.track(user_id, lang, current_question_index, chat_id)
+
+    async def _complete_application(self, user_id, form, tenant, stored_chat_id, completed_at):
+        """
+        Completes the application of a user who answered every question.
+
+        Args:
+            user_id (str): The Telegram user ID.
+            form (ApplicationForm): The complete form.
+            tenant (Tenant): The group the user applied to.
+            stored_chat_id (str | None): The group chat ID stored in the user's state.
+            completed_at (datetime): The date of the message carrying the last answer.
+        """
+        # Gather all user responses into a dictionary.
+        final_answers = form.get_all_responses()
+        chat_id = str(stored_chat_id or Config.DEFAULT_GROUP_CHAT_ID)
+        # A redelivered update carries the same message date, a later application of the same user does not.
+        application_id = int(completed_at.timestamp())
+
+        # Record the side effects of the completion in the outbox with a single append: saving the answers
+        # to the group's main sheet, approving the join request and notifying the admins. They run after this
+        # update (or in the periodic drain) with retries, so a failure never leaves the user half-processed.
+        self.outbox.enqueue(self.google_sheets, user_id, [
+            (kind, self.outbox.job_key(kind, user_id, chat_id, application_id), payload) for kind, payload in (
+                (JOB_SAVE_APPLICATION, {"chat_id": chat_id, "answers": final_answers}),
+                (JOB_APPROVE_JOIN_REQUEST, {"chat_id": chat_id}),
+                (JOB_NOTIFY_ADMINS, {"chat_id": chat_id}),
+            )
+        ])
+
+        # Send the pre-rendered localized confirmation message with the group invite link
+        # (removing the keyboard with the form button, if it was offered).
+        completion = self.localization.get_rendered(form.lang, "application_complete", tenant).as_kwargs()
+        if Config.WEBAPP_FORM:
+            completion["reply_markup"] = ReplyKeyboardRemove()
+        await self.scheduler.send_message(self.bot, user_id, **completion)
+
+        # Cleanup and record the completion.
+        self.stats.record("complete", form.lang)
+        self.user_forms.pop(user_id, None)
+        self._save_user_state(user_id, form.lang, form.current_question_index, form.responses, stored_chat_id)
 
     async def _send_next_question(self, user_id):
         """
@@ -384,7 +626,7 @@ class BotHandlers:
         if next_question:
             self._save_user_state(user_id, form.lang, form.current_question_index, form.responses,
                                   self.google_sheets.get_chat_id(user_id))
-            await self.bot.send_message(chat_id=user_id, text=next_question)
+            await self.scheduler.send_message(self.bot, user_id, text=next_question)
 
     async def _validate_and_handle_response(self, user_response, form, user_id):
         """
@@ -398,17 +640,14 @@ class BotHandlers:
         Returns:
             bool: True if the response is valid and saved, False otherwise.
         """
-        current_question_type = form.get_current_question_type()
-        # Validate based on the question type.
-        if current_question_type == "email" and not Validation.validate_email(user_response):
-            await self.bot.send_message(chat_id=user_id, text=self.localization.get_string(form.lang, "invalid_email"))
-            return False
-        if current_question_type == "phone" and not Validation.validate_phone(user_response):
-            await self.bot.send_message(chat_id=user_id, text=self.localization.get_string(form.lang, "invalid_phone"))
-            return False
-        if current_question_type == "age" and not Validation.validate_age(user_response):
-            await self.bot.send_message(chat_id=user_id, text=self.localization.get_string(form.lang, "invalid_age"))
+        question = form.get_current_question()
+        # Validate with the validator compiled into the questionnaire schema for this question type.
+        if question and question.validator and not question.validator(user_response):
+            await self.scheduler.send_message(
+                self.bot, user_id, text=self.localization.get_string(form.lang, question.error_key)
+            )
             return False
         # Save the valid response and advance to the next question.
         form.save_response(user_response)
+        self.stats.record_answer(form.current_question_index, form.lang)
         return True
@@ -0,0 +1,141 @@
+import time
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.outbound import TokenBucket
+
+# Global variable holding the shared inbound guard (reused during AWS Lambda hot starts).
+INBOUND_GUARD = None
+
+# Verdicts of the inbound guard on a private message.
+ADMITTED = "admitted"  # Look the user's state up and process the message.
+DROPPED = "dropped"  # Drop the message silently.
+THROTTLED = "throttled"  # Drop the message, but tell the user to slow down (at most once per notice interval).
+
+
+class InboundGuard:
+    """
+    Cheap in-memory gate in front of the per-message state lookup, so abusive or irrelevant private messages cost a
+    dictionary lookup instead of a Google Sheets request:
+    - every user has a token bucket (INBOUND_USER_RATE messages per second, INBOUND_USER_BURST at once); messages
+      beyond it are dropped, and the user is told to slow down once per INBOUND_NOTICE_SECONDS;
+    - users without any Metadata row (who never sent a join request) are remembered for UNKNOWN_USER_TTL_SECONDS,
+      and their further messages are dropped without a lookup (they were already told to press the button).
+      Users with a row, even without a language yet, are never cached.
+    Both are kept per container. A state write of this container forgets the user at once. A state written by
+    another container is noticed as soon as this container has read the Metadata change log entry announcing it
+    (with the Metadata cache enabled), and otherwise when the entry expires.
+    """
+    # Upper bound of the users tracked in memory before idle buckets and expired entries are dropped.
+    MAX_USERS = 10000
+
+    def __init__(self, rate=None, burst=None, unknown_ttl=None, notice_interval=None):
+        """
+        Initializes an empty guard.
+
+        Args:
+            rate (float, optional): Messages per second accepted from a single user.
+            burst (float, optional): Messages a single user may send at once before the rate applies.
+            unknown_ttl (float, optional): Seconds during which a user without state is not looked up again.
+            notice_interval (float, optional): Minimum number of seconds between two slow-down notices to a user.
+        """
+        self.rate = rate or Config.INBOUND_USER_RATE
+        self.burst = burst or Config.INBOUND_USER_BURST
+        self.unknown_ttl = Config.UNKNOWN_USER_TTL_SECONDS if unknown_ttl is None else unknown_ttl
+        self.notice_interval = Config.INBOUND_NOTICE_SECONDS if notice_interval is None else notice_interval
+        self.buckets = {}  # Per-user token buckets keyed by user ID.
+        self.unknown_users = {}  # User ID -> monotonic time until which the user is known to have no state.
+        self.notices = {}  # User ID -> monotonic time before which no further slow-down notice is sent.
+        self.dropped = 0  # Messages dropped by this container (flooding or unknown users).
+
+    def _get_bucket(self, key):
+        """
+        Retrieves (or lazily creates) the token bucket of the given user.
+
+        Args:
+            key (str): The user ID.
+
+        Returns:
+            TokenBucket: The bucket of the user.
+        """
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= InboundGuard.MAX_USERS:
+                # A full bucket carries no information, so dropping it does not loosen the limit.
+                now = time.monotonic()
+                self.buckets = {user: bucket for user, bucket in self.buckets.items() if not bucket.is_full(now)}
+            bucket = TokenBucket(self.rate, self.burst)
+            self.buckets[key] = bucket
+        return bucket
+
+    def admit(self, user_id, has_state=None):
+        """
+        Decides whether a private message is worth looking the user's state up.
+
+        Args:
+            user_id (int | str): The Telegram user ID of the sender.
+            has_state (callable, optional): Tells, without any request, whether a state of the user has been seen
+                since (e.g. through the Metadata change log); a cached user with a state is forgotten.
+
+        Returns:
+            str: ADMITTED, DROPPED, or THROTTLED if the message is dropped and the user should be told so.
+        """
+        key = str(user_id)
+        now = time.monotonic()
+
+        bucket = self._get_bucket(key)
+        if bucket.delay(now) > 0:
+            self.dropped += 1
+            logger.debug("Dropped a message of user %s: inbound rate limit exceeded.", user_id)
+            if self.notices.get(key, 0) > now:
+                return DROPPED
+            if len(self.notices) >= InboundGuard.MAX_USERS:
+                self.notices = {user: until for user, until in self.notices.items() if until > now}
+            self.notices[key] = now + self.notice_interval
+            return THROTTLED
+        bucket.consume(now)
+
+        expires_at = self.unknown_users.get(key)
+        if expires_at is not None:
+            if expires_at > now and not (has_state and has_state(user_id)):
+                self.dropped += 1
+                logger.debug("Dropped a message of user %s: no state (cached).", user_id)
+                return DROPPED
+            del self.unknown_users[key]
+        return ADMITTED
+
+    def mark_unknown(self, user_id):
+        """
+        Remembers that a user has no Metadata row at all, so their next messages are dropped without a lookup.
+        Only called for users without a row: a user who sent a join request is never cached.
+
+        Args:
+            user_id (int | str): The Telegram user ID.
+        """
+        if self.unknown_ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self.unknown_users) >= InboundGuard.MAX_USERS:
+            self.unknown_users = {user: until for user, until in self.unknown_users.items() if until > now}
+        self.unknown_users[str(user_id)] = now + self.unknown_ttl
+
+    def forget(self, user_id):
+        """
+        Drops the negative entry of a user whose state has just been written.
+
+        Args:
+            user_id (int | str): The Telegram user ID.
+        """
+        self.unknown_users.pop(str(user_id), None)
+
+
+def get_inbound_guard():
+    """
+    Retrieves the shared inbound guard, creating it on first use.
+
+    Returns:
+        InboundGuard: The shared guard.
+    """
+    global INBOUND_GUARD
+    if INBOUND_GUARD is None:
+        INBOUND_GUARD = InboundGuard()
+    return INBOUND_GUARD
@@ -1,3 +1,26 @@
+from typing import NamedTuple, Optional
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.utils import Utils
+
+
+class RenderedMessage(NamedTuple):
+    """
+    A ready-to-send message payload shared by every update that needs it.
+    Telegram objects are immutable, so one instance can safely be reused across users.
+    """
+    text: str
+    parse_mode: Optional[str] = None
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+
+    def as_kwargs(self):
+        """
+        Returns:
+            dict: Keyword arguments for bot.send_message or edit_message_text.
+        """
+        return {"text": self.text, "parse_mode": self.parse_mode, "reply_markup": self.reply_markup}
+
+
 class Localization:
     """
     Manages localized strings and questions for the Telegram bot in multiple languages.
@@ -22,7 +45,16 @@ class Localization:
             "invalid_email": "Похоже, это неправильный формат адреса электронной почты. Пожалуйста, введите адрес вида 'name@example.com'.",
             "invalid_phone": "Пожалуйста, введите действительный номер телефона в формате +XXXXXXXX..., включая код страны.",
             "invalid_age": "Укажите корректный возраст от 1 до 120 лет.",
-            "press_button": "Пожалуйста, нажмите кнопку на экране."
+            "press_button": "Пожалуйста, нажмите кнопку на экране.",
+            "welcome": "Добро пожаловать! Вы подали заявку на вступление в группу {community}. Благодарим вас за интерес! Чтобы продолжить вступление, пожалуйста, заполните короткую анкету.",
+            "change_language": "Сменить язык",
+            "webapp_prompt": "Вы также можете ответить на все вопросы сразу в форме — нажмите кнопку ниже.",
+            "open_form": "Заполнить анкету",
+            "form_submit": "Отправить",
+            "form_required": "Пожалуйста, ответьте на этот вопрос.",
+            "form_incomplete": "Не все ответы в форме заполнены верно. Пожалуйста, откройте форму снова и проверьте ответы.",
+            "form_too_long": "Ответы слишком длинные для отправки через форму. Сократите их или ответьте на вопросы в чате.",
+            "too_many_messages": "Вы отправляете сообщения слишком часто. Пожалуйста, подождите немного и отправьте ответ снова."
         },
         "kz": {
             "privacy_accept": "Қабылдаймын",
@@ -41,7 +73,16 @@ class Localization:
             "invalid_email": "Бұл электрондық пошта мекенжайы дұрыс форматқа сай емес. Мысалы: 'name@example.com'.",
             "invalid_phone": "Телефон нөміріңізді + белгісімен және цифрлармен (ел коды) енгізіңіз. Мысалы, +77001234567.",
             "invalid_age": "Жасыңызды 1 мен 120 аралығында дұрыс енгізіңіз.",
-            "press_button": "Түймені басыңыз."
+            "press_button": "Түймені басыңыз.",
+            "welcome": "Қош келдіңіз! Сіз {community} тобына қосылуға өтінім қалдырдыңыз. Біз сізге ризамыз! Топқа кіруді жалғастыру үшін қысқа анкетаны толтырыңыз.",
+            "change_language": "Тілді өзгерту",
+            "webapp_prompt": "Барлық сұрақтарға бірден формада жауап бере аласыз — төмендегі түймені басыңыз.",
+            "open_form": "Анкетаны толтыру",
+            "form_submit": "Жіберу",
+            "form_required": "Бұл сұраққа жауап беріңіз.",
+            "form_incomplete": "Формадағы кейбір жауаптар толық емес немесе қате. Форманы қайта ашып, жауаптарды тексеріңіз.",
+            "form_too_long": "Жауаптар форма арқылы жіберу үшін тым ұзын. Оларды қысқартыңыз немесе сұрақтарға чатта жауап беріңіз.",
+            "too_many_messages": "Сіз хабарламаларды тым жиі жіберіп жатырсыз. Біраз күтіп, жауабыңызды қайта жіберіңіз."
         },
         "en": {
             "privacy_accept": "Agree",
@@ -60,7 +101,16 @@ class Localization:
             "invalid_email": "That doesn't look like a valid email address. Please use a format like 'name@example.com'.",
             "invalid_phone": "Please enter a valid phone number in the format +XXXXXXXX..., including your country code if necessary.",
             "invalid_age": "Please enter a valid age between 1 and 120.",
-            "press_button": "Please press the button on the screen."
+            "press_button": "Please press the button on the screen.",
+            "welcome": "Welcome! You have applied to join the {community}. Thank you for your interest! To proceed with membership, please fill out a short questionnaire.",
+            "change_language": "Change language",
+            "webapp_prompt": "You can also answer all the questions at once in a form — press the button below.",
+            "open_form": "Fill in the form",
+            "form_submit": "Submit",
+            "form_required": "Please answer this question.",
+            "form_incomplete": "Some answers in the form are missing or invalid. Please open the form again and check your answers.",
+            "form_too_long": "The answers are too long to be sent from the form. Please shorten them or answer the questions in the chat.",
+            "too_many_messages": "You are sending messages too fast. Please wait a moment and send your answer again."
         }
     }
 
@@ -105,11 +155,11 @@ class Localization:
 
     WELCOME_MESSAGE_MULTILANG = (
         "Welcome! Қош келдіңіз! Добро пожаловать!\n\n"
-        "You have applied to join the Qazaq IT Community. Thank you for your interest! "
+        "You have applied to join the {community}. Thank you for your interest! "
         "To proceed with membership, please fill out a short questionnaire.\n\n"
-        "Сіз Qazaq IT Community тобына қосылуға өтінім қалдырдыңыз. Біз сізге ризамыз! "
+        "Сіз {community} тобына қосылуға өтінім қалдырдыңыз. Біз сізге ризамыз! "
         "Топқа кіруді жалғастыру үшін қысқа анкетаны толтырыңыз.\n\n"
-        "Вы подали заявку на вступление в группу Qazaq IT Community. Благодарим вас за интерес! "
+        "Вы подали заявку на вступление в группу {community}. Благодарим вас за интерес! "
         "Чтобы продолжить вступление, пожалуйста, заполните короткую анкету.\n\n"
         "To continue, please choose a language:\n"
         "Жалғастыру үшін тілді таңдаңыз:\n"
@@ -122,6 +172,13 @@ class Localization:
         "Please press one of the buttons."
     )
 
+    # Supported languages keyed by the Telegram language code (primary subtag of the user's IETF language tag).
+    TELEGRAM_LANGUAGE_CODES = {"ru": "ru", "kk": "kz", "en": "en"}
+
+    # Lazily built catalogs of pre-rendered messages keyed by (language code, tenant chat ID).
+    # The language code is None for multilingual messages, the tenant chat ID is None for the default group.
+    _catalogs = {}
+
     @staticmethod
     def get_string(lang, key):
         """
@@ -137,14 +194,46 @@ class Localization:
         return Localization.STRINGS.get(lang, Localization.STRINGS["en"]).get(key, key)
 
     @staticmethod
-    def get_multilang_welcome_message():
+    def get_multilang_string(key):
+        """
+        Retrieves a string in every supported language, one language per paragraph.
+        Used when the user has not selected a language yet.
+
+        Args:
+            key (str): The key representing the string to retrieve.
+
+        Returns:
+            str: The localized strings joined by blank lines.
+        """
+        return "\n\n".join(Localization.get_string(lang, key) for lang in ("ru", "kz", "en"))
+
+    @staticmethod
+    def get_multilang_welcome_message(community=None):
         """
         Retrieves the multilingual welcome message.
 
+        Args:
+            community (str, optional): The community name; defaults to COMMUNITY_NAME.
+
         Returns:
             str: The welcome message containing greetings in multiple languages.
         """
-        return Localization.WELCOME_MESSAGE_MULTILANG
+        return Localization.WELCOME_MESSAGE_MULTILANG.format(community=community or Config.COMMUNITY_NAME)
+
+    @staticmethod
+    def language_from_code(language_code):
+        """
+        Maps the language a user set in Telegram to a supported language.
+
+        Args:
+            language_code (str | None): The IETF language tag reported by Telegram (e.g., 'kk', 'en-US').
+
+        Returns:
+            str | None: The language code (e.g., 'kz'), or None if the language is unknown or not supported.
+        """
+        if not language_code:
+            return None
+        return Localization.TELEGRAM_LANGUAGE_CODES.get(language_code.split("-")[0].lower())
 
     @staticmethod
     def get_questions(lang):
@@ -158,3 +247,89 @@ class Localization:
             list: A list of dictionaries, each containing a question and its type.
         """
         return Localization.QUESTIONS.get(lang, Localization.QUESTIONS["en"])
+
+    @staticmethod
+    def _build_catalog(lang, tenant=None):
+        """
+        Renders every static message of one language: final text, parse mode and reply markup.
+
+        Args:
+            lang (str | None): The language code, or None for the multilingual messages.
+            tenant (Tenant, optional): The group whose name, invite link and questionnaire are used.
+
+        Returns:
+            dict: Rendered messages keyed by message name.
+        """
+        community = tenant.name if tenant else Config.COMMUNITY_NAME
+        invite_link = tenant.invite_link if tenant else Config.GROUP_INVITE_LINK
+        if lang is None:
+            language_keyboard = InlineKeyboardMarkup([[
+                InlineKeyboardButton("Русский", callback_data="lang_ru"),
+                InlineKeyboardButton("Қазақша", callback_data="lang_kz"),
+                InlineKeyboardButton("English", callback_data="lang_en")
+            ]])
+            return {
+                "welcome": RenderedMessage(
+                    Localization.get_multilang_welcome_message(community), reply_markup=language_keyboard
+                ),
+                "language_menu": RenderedMessage(
+                    Localization.get_multilang_string("choose_language"), reply_markup=language_keyboard
+                ),
+                "press_button": RenderedMessage(Localization.PRESS_BUTTON_MULTILANG),
+            }
+
+        privacy_policy_link = Utils.fetch_privacy_policy(lang, Localization)
+        accept_button = InlineKeyboardButton(
+            Localization.get_string(lang, "privacy_accept"), callback_data="privacy_accept"
+        )
+        completion_text = Localization.get_string(lang, "application_complete")
+        if invite_link:
+            completion_text += f"\n\n🔗 [{community}]({invite_link})"
+        if tenant:
+            first_question = tenant.schema.questions[0].text(lang)
+        else:
+            first_question = Localization.get_questions(lang)[0]["question"]
+
+        return {
+            "privacy": RenderedMessage(
+                f"{Localization.get_string(lang, 'privacy_prompt')}\n\n{privacy_policy_link}",
+                parse_mode="Markdown",
+                reply_markup=InlineKeyboardMarkup([[accept_button]])
+            ),
+            # Sent instead of the language menu when the language is preselected from the user's Telegram settings.
+            "welcome_privacy": RenderedMessage(
+                f"{Localization.get_string(lang, 'welcome').format(community=community)}\n\n"
+                f"{Localization.get_string(lang, 'privacy_prompt')}\n\n{privacy_policy_link}",
+                parse_mode="Markdown",
+                reply_markup=InlineKeyboardMarkup([
+                    [accept_button],
+                    [InlineKeyboardButton(
+                        f"🌐 {Localization.get_string(lang, 'change_language')}", callback_data="change_language"
+                    )],
+                ])
+            ),
+            "questionnaire_intro": RenderedMessage(
+                f"{Localization.get_string(lang, 'start_questionnaire')}\n\n{first_question}"
+            ),
+            "application_complete": RenderedMessage(completion_text, parse_mode="Markdown"),
+            "press_button": RenderedMessage(Localization.get_string(lang, "press_button")),
+        }
+
+    @staticmethod
+    def get_rendered(lang, name, tenant=None):
+        """
+        Retrieves a pre-rendered message, building the catalog of the language and group on first use.
+
+        Args:
+            lang (str | None): The language code, or None for the multilingual messages.
+            name (str): The message name (e.g., 'welcome', 'privacy', 'application_complete').
+            tenant (Tenant, optional): The group the user applies to; defaults to the single-group settings.
+
+        Returns:
+            RenderedMessage: The ready-to-send message.
+        """
+        key = (lang, tenant.chat_id if tenant else None)
+        catalog = Localization._catalogs.get(key)
+        if catalog is None:
+            catalog = Localization._catalogs[key] = Localization._build_catalog(lang, tenant)
+        return catalog[name]
@@ -1,18 +1,142 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import random
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Correlation fields (update_id, user_id, handler) of the update being processed by the current task.
+LOG_CONTEXT = ContextVar("log_context", default={})
+
+# Logging settings. They are read here rather than from Config, which itself depends on the logger being importable.
+# Minimum level of emitted records (DEBUG, INFO, WARNING, ...).
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" for one JSON object per line (CloudWatch Logs Insights friendly), "text" for the classic format.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Share of updates whose DEBUG records are kept (1 keeps all of them).
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single-line JSON object with the correlation fields of its update,
+    plus the structured fields passed as `extra={"fields": {...}}` (e.g. the spans of the tracer).
+    """
+
+    def format(self, record):
+        """
+        Args:
+            record (LogRecord): The record to format.
+
+        Returns:
+            str: The JSON line.
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Attaches the correlation fields of the current task to the record.
+    Runs in the calling thread, before the record is handed over to the queue listener thread.
+    """
+
+    def filter(self, record):
+        record.context = LOG_CONTEXT.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keeps DEBUG records of a fixed share of updates only. The decision is derived from the update ID,
+    so either every DEBUG record of an update is kept or none; records outside an update are sampled randomly.
+    """
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate (float): The share of updates whose DEBUG records are kept, between 0 and 1.
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        update_id = LOG_CONTEXT.get().get("update_id")
+        if update_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(str(update_id).encode()) % 10000 < self.rate * 10000
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that hands the record over unformatted: message interpolation, JSON encoding and
+    traceback rendering happen in the listener thread instead of the event loop.
+    Arguments passed to the logger must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
 
 # Create a logger instance for the Telegram bot.
 logger = logging.getLogger("telegram_bot")
-# Set the logging level to INFO to capture general operational messages.
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_LEVEL)
+# Records are emitted by the listener thread only; do not duplicate them through the root logger.
+logger.propagate = False
 
-# Create a stream handler to output log messages to the console.
+# Create a stream handler to output log messages to the console (used by the listener thread).
 stream_handler = logging.StreamHandler()
+if LOG_FORMAT == "json":
+    stream_handler.setFormatter(JsonFormatter())
+else:
+    # Define a log message format that includes the timestamp, log level, and message.
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+# Emitting only enqueues the record, so logging never blocks the event loop on console I/O.
+LOG_QUEUE = queue.Queue()
+queue_handler = DeferredQueueHandler(LOG_QUEUE)
+queue_handler.addFilter(ContextFilter())
+queue_handler.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+logger.addHandler(queue_handler)
+
+LOG_LISTENER = QueueListener(LOG_QUEUE, stream_handler, respect_handler_level=True)
+LOG_LISTENER.start()
+atexit.register(LOG_LISTENER.stop)
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Adds correlation fields to every record logged by the current task inside the block.
 
-# Define a log message format that includes the timestamp, log level, and message.
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    Args:
+        **fields: The fields to add (e.g. update_id, user_id, handler).
+    """
+    token = LOG_CONTEXT.set({**LOG_CONTEXT.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        LOG_CONTEXT.reset(token)
 
-# Attach the formatter to the stream handler.
-stream_handler.setFormatter(formatter)
 
-# Add the stream handler to the logger instance.
-logger.addHandler(stream_handler)
+def flush_logs():
+    """
+    Waits until the listener thread has written every queued record.
+    Called at the end of each Lambda invocation, because the container may be frozen right after it returns.
+    """
+    LOG_QUEUE.join()
@@ -0,0 +1,290 @@
+import uuid
+from shared.telegram_bot.logger import logger
+
+# Global variable holding the shared Metadata cache (reused during AWS Lambda hot starts).
+METADATA_CACHE = None
+
+# Column names of the metadata worksheets. Rows are always written in this order, so cached records are
+# mapped by position and older worksheets without the "Version" header cell are read correctly.
+METADATA_HEADER = [
+    "User ID", "Chat ID", "Language", "Current Question Index", "Responses", "Last Question", "Updated At", "Version",
+    "Reminded At",
+]
+
+# Title and header of the append-only change log shared by every container.
+CHANGES_SHEET_TITLE = "Changes"
+CHANGES_HEADER = ["Worksheet", "User ID", "Row", "Version", "Generation"]
+
+# Cell holding the log generation; it changes whenever rows may have moved (compaction, rebalancing).
+GENERATION_CELL = "F1"
+
+# Number of log rows fetched per request while catching up.
+SYNC_CHUNK_SIZE = 500
+
+
+class MetadataCache:
+    """
+    Per-container cache of the Metadata rows that stays coherent across scaled-out Lambda containers.
+
+    Every state write appends a tiny (worksheet, user ID, row, version) entry to the shared "Changes" log.
+    Before trusting the cache, a container reads the generation cell and the log entries appended since its
+    last check in one small batch request, and marks only the users named there as stale; a stale user's row
+    is re-read on its own (one row, not the whole sheet). Users absent from the cache do not exist, so new
+    applicants cost no read at all. The whole cache is reloaded only when the generation changes.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty, not yet loaded cache.
+        """
+        self.records = {}  # User ID -> (worksheet title, row number, record).
+        self.stale = {}  # User ID -> (worksheet title, row number) of rows changed by other containers.
+        self.own_log_rows = set()  # Log rows appended by this container (already applied locally).
+        self.generation = None  # Log generation the cache was loaded for.
+        self.next_log_row = 2  # First log row not read yet.
+        self.loaded = False
+
+    def _load(self, google_sheets):
+        """
+        Reads every Metadata shard once and rebuilds the cache.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+        """
+        self.records.clear()
+        self.stale.clear()
+        for worksheet in google_sheets.metadata_sheets:
+            rows = google_sheets.get_all_values(worksheet)
+            for offset, values in enumerate(rows[1:]):
+                record = self.to_record(values)
+                if record["User ID"]:
+                    self.records[record["User ID"]] = (worksheet.title, offset + 2, record)
+        self.loaded = True
+
+    @staticmethod
+    def to_record(values):
+        """
+        Maps the cell values of a Metadata row to a record.
+
+        Args:
+            values (list): The cell values in Metadata column order (trailing empty cells may be missing).
+
+        Returns:
+            dict: The record keyed by METADATA_HEADER.
+        """
+        values = [str(value) for value in values[:len(METADATA_HEADER)]]
+        record = dict(zip(METADATA_HEADER, values + [""] * (len(METADATA_HEADER) - len(values))))
+        record["User ID"] = record["User ID"].strip()
+        return record
+
+    def _read_log(self, google_sheets, changes_sheet):
+        """
+        Reads the log generation and the entries appended since the last read.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+
+        Returns:
+            tuple: (generation, list of (log row, entry values)).
+        """
+        entries = []
+        while True:
+            log_range = f"A{self.next_log_row}:D{self.next_log_row + SYNC_CHUNK_SIZE - 1}"
+            generation_range, log_rows = google_sheets.get_ranges(changes_sheet, [GENERATION_CELL, log_range])
+            generation = generation_range[0][0] if generation_range and generation_range[0] else ""
+            entries.extend((self.next_log_row + offset, row) for offset, row in enumerate(log_rows))
+            self.next_log_row += len(log_rows)
+            if len(log_rows) < SYNC_CHUNK_SIZE:
+                return generation, entries
+
+    def sync(self, google_sheets, changes_sheet):
+        """
+        Catches up with the changes made by other containers since the last check.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+        """
+        started_at = self.next_log_row
+        generation, entries = self._read_log(google_sheets, changes_sheet)
+
+        if not self.loaded or generation != self.generation:
+            # Rows may have moved (or this is the first use): skip to the end of the current log and
+            # rebuild the cache from the shards. Entries appended meanwhile are simply re-checked later.
+            if started_at != 2:
+                self.next_log_row = 2
+                generation, _ = self._read_log(google_sheets, changes_sheet)
+            self._load(google_sheets)
+            self.generation = generation
+            self.own_log_rows.clear()
+            return
+
+        for log_row, entry in entries:
+            if log_row in self.own_log_rows:
+                self.own_log_rows.discard(log_row)
+                continue
+            title, user_id, row_number, version = (list(entry) + [""] * 4)[:4]
+            if not user_id or not str(row_number).isdigit():
+                continue
+            cached = self.records.get(user_id)
+            if cached and cached[0] == title and cached[1] == int(row_number) and cached[2]["Version"] == version:
+                continue  # The cached row is already this version.
+            self.stale[user_id] = (title, int(row_number))
+
+    def _refresh(self, google_sheets, user_ids):
+        """
+        Re-reads the rows of the given stale users, one batch request per worksheet.
+        If a row no longer belongs to its user (it moved), the cache is rebuilt.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            user_ids (list): Stale user IDs to refresh.
+        """
+        worksheets = {worksheet.title: worksheet for worksheet in google_sheets.metadata_sheets}
+        by_title = {}
+        for user_id in user_ids:
+            title, row_number = self.stale.pop(user_id)
+            by_title.setdefault(title, []).append((user_id, row_number))
+
+        last_column = google_sheets.column_letter(len(METADATA_HEADER))
+        for title, users in by_title.items():
+            worksheet = worksheets.get(title)
+            if worksheet is None:
+                continue
+            ranges = [f"A{row_number}:{last_column}{row_number}" for _, row_number in users]
+            for (user_id, row_number), value_range in zip(users, google_sheets.get_ranges(worksheet, ranges)):
+                record = self.to_record(value_range[0] if value_range else [])
+                if record["User ID"] != user_id:
+                    logger.warning("Metadata row %s of %s moved, reloading the cache.", row_number, title)
+                    self._load(google_sheets)
+                    return
+                self.records[user_id] = (title, row_number, record)
+
+    def get(self, google_sheets, changes_sheet, user_id):
+        """
+        Retrieves the current Metadata record of a user.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+            user_id (str): The Telegram user ID.
+
+        Returns:
+            tuple: (row number, record), or (None, None) if the user has no Metadata row.
+        """
+        user_id = str(user_id)
+        self.sync(google_sheets, changes_sheet)
+        if user_id in self.stale:
+            self._refresh(google_sheets, [user_id])
+        cached = self.records.get(user_id)
+        return (cached[1], cached[2]) if cached else (None, None)
+
+    def get_all(self, google_sheets, changes_sheet):
+        """
+        Retrieves every Metadata record, re-reading only the rows changed since the last check.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+
+        Returns:
+            list: The Metadata records.
+        """
+        self.sync(google_sheets, changes_sheet)
+        if self.stale:
+            self._refresh(google_sheets, list(self.stale))
+        return [record for _, _, record in self.records.values()]
+
+    def record_write(self, google_sheets, changes_sheet, title, row_number, row):
+        """
+        Applies a state write of this container to the cache and announces it to the other containers.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+            title (str): The title of the written Metadata worksheet.
+            row_number (int): The written sheet row.
+            row (list): The written values, in Metadata column order.
+        """
+        record = self.store(title, row_number, row)
+        log_row = google_sheets.append_row(
+            changes_sheet, [title, record["User ID"], str(row_number), record["Version"]]
+        )
+        self.own_log_rows.add(log_row)
+
+    def store(self, title, row_number, row):
+        """
+        Replaces the cached row of a user with values read or written by this container.
+
+        Args:
+            title (str): The title of the Metadata worksheet.
+            row_number (int): The sheet row.
+            row (list): The cell values, in Metadata column order.
+
+        Returns:
+            dict: The cached record.
+        """
+        record = self.to_record(row)
+        self.records[record["User ID"]] = (title, row_number, record)
+        self.stale.pop(record["User ID"], None)
+        return record
+
+    def invalidate(self):
+        """
+        Drops the cached rows; they are reloaded on the next access (e.g. after a row was found to have moved).
+        """
+        self.loaded = False
+
+    def compact(self, google_sheets, changes_sheet, max_rows):
+        """
+        Empties the change log once it grows beyond `max_rows` entries and starts a new generation,
+        which makes every container reload its cache once.
+        Both happen in a single request, so a container never sees the emptied log under the old generation
+        (it would keep reading past the end of the log and miss the entries appended from row 2 on).
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+            max_rows (int): The maximum number of log entries to keep.
+
+        Returns:
+            bool: True if the log was compacted.
+        """
+        self.sync(google_sheets, changes_sheet)
+        if self.next_log_row - 2 < max(max_rows, 1):
+            return False
+        # Clear the entries read so far; entries appended since then stay and are read again under the new generation.
+        last_row = self.next_log_row - 1
+        self.bump_generation(google_sheets, changes_sheet, [
+            {"range": f"A2:D{last_row}", "values": [[""] * 4 for _ in range(last_row - 1)]},
+        ])
+        return True
+
+    def bump_generation(self, google_sheets, changes_sheet, updates=()):
+        """
+        Starts a new log generation, e.g. after Metadata rows were moved by the rebalancing tool.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            changes_sheet (Worksheet): The shared change log.
+            updates (list, optional): Other cell ranges of the log to write in the same request.
+        """
+        google_sheets.batch_update_cells(
+            changes_sheet, [*updates, {"range": GENERATION_CELL, "values": [[uuid.uuid4().hex]]}]
+        )
+        self.loaded = False
+        self.next_log_row = 2
+
+
+def get_metadata_cache():
+    """
+    Retrieves the shared Metadata cache, creating it on first use.
+
+    Returns:
+        MetadataCache: The shared cache.
+    """
+    global METADATA_CACHE
+    if METADATA_CACHE is None:
+        METADATA_CACHE = MetadataCache()
+    return METADATA_CACHE
@@ -0,0 +1,308 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from telegram.error import RetryAfter
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.deadline import get_deadline
+from shared.telegram_bot.logger import logger
+
+# Global variable holding the shared outbound scheduler (reused during AWS Lambda hot starts).
+OUTBOUND_SCHEDULER = None
+
+
+class Priority(IntEnum):
+    """
+    Priority classes for outbound Telegram calls. Lower values are dispatched first.
+    """
+    CALLBACK = 0  # Answers to button presses (answer_callback_query, edit_message_text).
+    QUESTION = 1  # The next question or any other direct reply to the applicant.
+    ADMIN = 2  # Admin notifications and digests.
+    BACKGROUND = 3  # Scheduled work such as reminders and automatic declines.
+
+
+class TokenBucket:
+    """
+    Classic token bucket: tokens are refilled continuously at `rate` per second up to `capacity`.
+    Each outbound call consumes exactly one token.
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            capacity (float): The maximum number of tokens the bucket can hold (burst size).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        """
+        Adds the tokens accumulated since the last refill.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def delay(self, now):
+        """
+        Returns how long the caller has to wait until one token is available.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The waiting time in seconds, or 0 if a token is available right now.
+        """
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now):
+        """
+        Takes one token from the bucket.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now):
+        """
+        Checks whether the bucket has been idle long enough to be refilled completely.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            bool: True if the bucket holds its full capacity.
+        """
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class OutboundScheduler:
+    """
+    Central gate for every outbound Telegram call.
+    Calls wait for a token from the global bucket (~30 requests per second) and from the bucket of their target chat,
+    are dispatched in priority order, and are transparently retried when Telegram answers with RetryAfter.
+    """
+    # Upper bound of per-chat buckets kept in memory before idle (full) buckets are dropped.
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(self, global_rate=None, private_chat_rate=None, group_chat_rate=None, max_retries=None):
+        """
+        Initializes the scheduler with its token buckets.
+
+        Args:
+            global_rate (float, optional): Bot-wide requests per second.
+            private_chat_rate (float, optional): Messages per second to a single private chat.
+            group_chat_rate (float, optional): Messages per second to a single group chat.
+            max_retries (int, optional): How many times a call is retried after RetryAfter.
+        """
+        self.global_rate = global_rate or Config.OUTBOUND_GLOBAL_RATE
+        self.private_chat_rate = private_chat_rate or Config.OUTBOUND_PRIVATE_CHAT_RATE
+        self.group_chat_rate = group_chat_rate or Config.OUTBOUND_GROUP_CHAT_RATE
+        self.max_retries = Config.OUTBOUND_MAX_RETRIES if max_retries is None else max_retries
+        self.global_bucket = TokenBucket(self.global_rate, self.global_rate)
+        self.chat_buckets = {}  # Per-chat token buckets keyed by chat ID.
+        self.paused_until = 0.0  # Monotonic time until which Telegram asked us to stop sending.
+        self._waiters = []  # Heap of (priority, sequence, chat_id, future).
+        self._sequence = itertools.count()  # Keeps FIFO order inside one priority class.
+        self._dispatcher = None  # Task granting tokens to the waiters.
+
+    def _get_chat_bucket(self, chat_id):
+        """
+        Retrieves (or lazily creates) the token bucket of the given chat.
+        Group chats (negative IDs) get the stricter group limit.
+
+        Args:
+            chat_id (int | str): The target chat ID.
+
+        Returns:
+            TokenBucket: The bucket of the chat.
+        """
+        key = str(chat_id)
+        bucket = self.chat_buckets.get(key)
+        if bucket is None:
+            if len(self.chat_buckets) >= OutboundScheduler.MAX_CHAT_BUCKETS:
+                self._prune_chat_buckets()
+            if key.startswith("-"):
+                bucket = TokenBucket(self.group_chat_rate, Config.OUTBOUND_CHAT_BURST)
+            else:
+                bucket = TokenBucket(self.private_chat_rate, Config.OUTBOUND_CHAT_BURST)
+            self.chat_buckets[key] = bucket
+        return bucket
+
+    def _prune_chat_buckets(self):
+        """
+        Drops the buckets of chats that have been idle long enough to be full again.
+        A full bucket carries no information, so dropping it does not loosen the limit.
+        """
+        now = time.monotonic()
+        self.chat_buckets = {
+            key: bucket for key, bucket in self.chat_buckets.items() if not bucket.is_full(now)
+        }
+
+    def _ensure_dispatcher(self):
+        """
+        Starts the dispatcher task if it is not running on the current event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """
+        Grants tokens to waiting calls in priority order until no waiters are left.
+        A waiter whose chat bucket is empty does not block waiters targeting other chats.
+        """
+        while self._waiters:
+            now = time.monotonic()
+
+            # Honour a RetryAfter pause requested by Telegram before sending anything else.
+            if self.paused_until > now:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            # Wait for the global bucket to have at least one token.
+            global_delay = self.global_bucket.delay(now)
+            if global_delay > 0:
+                await asyncio.sleep(global_delay)
+                continue
+
+            # Pick the first waiter (by priority and arrival) whose chat can receive a message right now.
+            granted = None
+            next_delay = None
+            for entry in sorted(self._waiters):
+                _, _, chat_id, future = entry
+                if future.done():
+                    # The caller was cancelled while waiting; forget about it.
+                    granted = entry
+                    break
+                if chat_id is None:
+                    granted = entry
+                    break
+                chat_delay = self._get_chat_bucket(chat_id).delay(now)
+                if chat_delay == 0:
+                    granted = entry
+                    break
+                next_delay = chat_delay if next_delay is None else min(next_delay, chat_delay)
+
+            if granted is None:
+                await asyncio.sleep(next_delay)
+                continue
+
+            self._waiters.remove(granted)
+            heapq.heapify(self._waiters)
+            _, _, chat_id, future = granted
+            if future.done():
+                continue
+
+            self.global_bucket.consume(now)
+            if chat_id is not None:
+                self._get_chat_bucket(chat_id).consume(now)
+            future.set_result(None)
+
+    async def _acquire(self, priority, chat_id):
+        """
+        Waits until the scheduler grants a token for one call to the given chat.
+
+        Args:
+            priority (Priority): The priority class of the call.
+            chat_id (int | str | None): The target chat ID, or None for calls not bound to a chat.
+        """
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), chat_id, future))
+        self._ensure_dispatcher()
+        await future
+
+    @staticmethod
+    def _retry_after_seconds(error):
+        """
+        Extracts the waiting time from a RetryAfter error (int or timedelta depending on the PTB version).
+
+        Args:
+            error (RetryAfter): The error raised by Telegram.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        retry_after = error.retry_after
+        if hasattr(retry_after, "total_seconds"):
+            return retry_after.total_seconds()
+        return float(retry_after)
+
+    async def call(self, priority, chat_id, func, /, *args, **kwargs):
+        """
+        Runs one outbound Telegram call under the rate limits.
+        If Telegram answers with RetryAfter, the whole scheduler pauses for the requested time and the call is retried.
+
+        Args:
+            priority (Priority): The priority class of the call.
+            chat_id (int | str | None): The target chat ID, or None for calls not bound to a chat.
+                Positional-only, so it never clashes with the `chat_id` keyword argument of `func`.
+            func (callable): The coroutine function performing the call (e.g. bot.send_message).
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Any: The result of the call.
+
+        Raises:
+            RetryAfter: If Telegram keeps rejecting the call after all retries, or asks to wait longer
+                than the remaining invocation budget.
+        """
+        attempt = 0
+        while True:
+            await self._acquire(priority, chat_id)
+            try:
+                return await func(*args, **kwargs)
+            except RetryAfter as e:
+                attempt += 1
+                delay = self._retry_after_seconds(e)
+                # Waiting past the invocation budget would only get the invocation killed.
+                if attempt > self.max_retries or not get_deadline().has_time_for(delay):
+                    raise
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                logger.warning("Telegram flood control: retrying in %s seconds (attempt %d).", delay, attempt)
+
+    async def send_message(self, bot, chat_id, priority=Priority.QUESTION, **kwargs):
+        """
+        Sends a text message through the scheduler.
+
+        Args:
+            bot (Bot): The Telegram bot instance.
+            chat_id (int | str): The target chat ID.
+            priority (Priority): The priority class of the message.
+            **kwargs: Keyword arguments for bot.send_message (text, reply_markup, parse_mode, ...).
+
+        Returns:
+            Message: The sent message.
+        """
+        return await self.call(priority, chat_id, bot.send_message, chat_id=chat_id, **kwargs)
+
+
+def get_outbound_scheduler():
+    """
+    Retrieves the shared outbound scheduler, creating it on first use.
+    All handlers and utilities must share one instance so that the limits are global per container.
+
+    Returns:
+        OutboundScheduler: The shared scheduler.
+    """
+    global OUTBOUND_SCHEDULER
+    if OUTBOUND_SCHEDULER is None:
+        OUTBOUND_SCHEDULER = OutboundScheduler()
+    return OUTBOUND_SCHEDULER
@@ -0,0 +1,300 @@
+import json
+import time
+from datetime import datetime
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.deadline import is_low_on_time
+from shared.telegram_bot.google_sheets import get_auxiliary_worksheet
+from shared.telegram_bot.logger import logger
+
+# Global variable holding the shared outbox (reused during AWS Lambda hot starts).
+OUTBOX = None
+
+# Title and header of the worksheet holding the jobs.
+OUTBOX_SHEET_TITLE = "Outbox"
+OUTBOX_HEADER = ["Key", "Kind", "User ID", "Payload", "Status", "Attempts", "Next Attempt At", "Last Error", "Created At"]
+
+# Job statuses; "done" and "failed" are final.
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Kinds of jobs enqueued when an applicant completes the form, in execution order.
+JOB_SAVE_APPLICATION = "save_application"  # Append the answers to the group's main sheet.
+JOB_APPROVE_JOIN_REQUEST = "approve_join_request"  # Approve the join request.
+JOB_NOTIFY_ADMINS = "notify_admins"  # Send the application to the group's admin chat.
+
+# Longest pause between two attempts of a job.
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+class OutboxJob:
+    """
+    One side effect recorded in the outbox.
+    """
+    __slots__ = ("row", "key", "kind", "user_id", "payload", "status", "attempts", "next_attempt_at", "last_error")
+
+    def __init__(self, row, key, kind, user_id, payload, status=STATUS_PENDING, attempts=0, next_attempt_at=0,
+                 last_error=""):
+        self.row = row  # Sheet row number of the job.
+        self.key = key  # Deduplication key: jobs with the same key are performed once.
+        self.kind = kind  # One of the JOB_* kinds, selecting the executor.
+        self.user_id = user_id  # The applicant; the jobs of one applicant run in the order they were enqueued.
+        self.payload = payload  # Arguments of the executor.
+        self.status = status  # STATUS_PENDING, STATUS_DONE or STATUS_FAILED.
+        self.attempts = attempts  # Number of failed attempts.
+        self.next_attempt_at = next_attempt_at  # Epoch seconds before which the job is not picked up.
+        self.last_error = last_error  # Message of the last failure.
+
+    @classmethod
+    def from_row(cls, row_number, row):
+        """
+        Args:
+            row_number (int): The sheet row number.
+            row (list): The cell values in OUTBOX_HEADER order.
+
+        Returns:
+            OutboxJob | None: The job, or None for an empty row.
+        """
+        row = row + [""] * (len(OUTBOX_HEADER) - len(row))
+        if not row[0]:
+            return None
+        return cls(
+            row_number, row[0], row[1], row[2], json.loads(row[3] or "{}"), row[4] or STATUS_PENDING,
+            int(row[5] or 0), float(row[6] or 0), row[7]
+        )
+
+    def status_update(self):
+        """
+        Returns:
+            dict: The batch update writing the status columns of the job's row.
+        """
+        return {
+            "range": f"E{self.row}:H{self.row}",
+            "values": [[self.status, self.attempts, int(self.next_attempt_at), self.last_error[:500]]],
+        }
+
+
+class Outbox:
+    """
+    Durable queue of the side effects of a completed application, kept in the "Outbox" worksheet.
+
+    The handler records every side effect as a job with a deduplication key in a single append, sends the
+    applicant's confirmation and returns; the jobs then run after the update under a lease, if the invocation has
+    time left, and otherwise (or on failure) in the periodic `drain`, with exponential backoff. Executors must be
+    idempotent: a job may run again if an invocation dies after performing it but before recording it as done.
+    """
+
+    def __init__(self):
+        """
+        Initializes an outbox without executors.
+        """
+        self.executors = {}  # Job kind -> coroutine function taking (user_id, payload).
+        self.claimed = []  # Jobs enqueued by the current invocation, run after the update.
+
+    def register(self, kind, executor):
+        """
+        Registers the executor of a job kind.
+
+        Args:
+            kind (str): The job kind.
+            executor (coroutine function): Performs the job; called with (user_id, payload), raises on failure.
+        """
+        self.executors[kind] = executor
+
+    @staticmethod
+    def job_key(kind, user_id, chat_id, application_id):
+        """
+        Args:
+            kind (str): The job kind.
+            user_id (str): The Telegram user ID.
+            chat_id (str): The group chat ID.
+            application_id (int): Identifies the application, e.g. the epoch time of its last answer, so a
+                later application of the same user (after leaving the group) is not taken for a duplicate.
+
+        Returns:
+            str: The deduplication key of a side effect: one per kind, applicant, group and application.
+        """
+        return f"{kind}:{user_id}:{chat_id}:{application_id}"
+
+    def enqueue(self, google_sheets, user_id, jobs):
+        """
+        Records the jobs of an applicant in one append. The jobs are leased to the current invocation for
+        OUTBOX_LEASE_SECONDS, so the periodic drain does not run them concurrently with `run_claimed`.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            user_id (str): The Telegram user ID.
+            jobs (list): (kind, key, payload) tuples, in execution order.
+        """
+        worksheet = get_auxiliary_worksheet(OUTBOX_SHEET_TITLE, OUTBOX_HEADER)
+        lease_until = int(time.time() + Config.OUTBOX_LEASE_SECONDS)
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            [key, kind, str(user_id), json.dumps(payload, ensure_ascii=False), STATUS_PENDING, 0, lease_until, "",
+             created_at]
+            for kind, key, payload in jobs
+        ]
+        first_row = google_sheets.append_rows(worksheet, rows)
+        self.claimed.extend(
+            OutboxJob(first_row + offset, key, kind, str(user_id), payload, next_attempt_at=lease_until)
+            for offset, (kind, key, payload) in enumerate(jobs)
+        )
+
+    async def _perform(self, job):
+        """
+        Runs one job and updates its status, attempt count and next attempt time.
+
+        Args:
+            job (OutboxJob): The job.
+
+        Returns:
+            bool: True if the job is done.
+        """
+        try:
+            executor = self.executors.get(job.kind)
+            if executor is None:
+                raise LookupError(f"No executor registered for {job.kind} jobs.")
+            await executor(job.user_id, job.payload)
+            job.status = STATUS_DONE
+            job.last_error = ""
+            return True
+        except Exception as e:
+            job.attempts += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            if job.attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                job.status = STATUS_FAILED
+                logger.error("Outbox job %s failed for good after %d attempts: %s", job.key, job.attempts, e,
+                             exc_info=True)
+            else:
+                delay = min(Config.OUTBOX_RETRY_SECONDS * 2 ** (job.attempts - 1), MAX_RETRY_DELAY_SECONDS)
+                job.next_attempt_at = time.time() + delay
+                logger.warning("Outbox job %s failed (attempt %d), retrying in %d seconds: %s",
+                               job.key, job.attempts, delay, e)
+            return False
+
+    async def _run_in_order(self, jobs, updates, stats):
+        """
+        Runs jobs in order while the invocation has time left. A failed job stops the later jobs of the same
+        applicant, which depend on it (the admin notification reads the saved row).
+
+        Args:
+            jobs (list): The jobs, grouped per applicant in execution order.
+            updates (list): Batch updates of the status columns, extended in place.
+            stats (dict): Counters of done, retried, failed and postponed jobs, updated in place.
+        """
+        blocked = set()
+        for job in jobs:
+            if job.user_id in blocked:
+                continue
+            if is_low_on_time():
+                stats["postponed"] += 1
+                continue
+            if await self._perform(job):
+                stats["done"] += 1
+            else:
+                blocked.add(job.user_id)
+                stats["failed" if job.status == STATUS_FAILED else "retried"] += 1
+            updates.append(job.status_update())
+
+    async def run_claimed(self, google_sheets):
+        """
+        Runs the jobs enqueued by the current invocation, after the applicant has been answered.
+        Jobs left over (no time, failures) are picked up by the periodic drain once their lease expires.
+        Like in `drain`, a job whose key already has an earlier row (done, or pending under another invocation's
+        lease, e.g. the first delivery of a redelivered update) is a duplicate: it is marked done without running.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+        """
+        if not self.claimed:
+            return
+        jobs, self.claimed = self.claimed, []
+        updates, stats = [], {"done": 0, "retried": 0, "failed": 0, "postponed": 0, "duplicates": 0}
+        worksheet = get_auxiliary_worksheet(OUTBOX_SHEET_TITLE, OUTBOX_HEADER)
+
+        # Only the Key and Status columns are read; the payloads may be large.
+        keys, statuses = google_sheets.get_ranges(worksheet, ["A2:A", "E2:E"])
+        first_rows = {}  # Key -> first row holding a done or pending job with that key.
+        for offset, cells in enumerate(keys):
+            status = statuses[offset][0] if offset < len(statuses) and statuses[offset] else STATUS_PENDING
+            if cells and cells[0] and status != STATUS_FAILED:
+                first_rows.setdefault(cells[0], offset + 2)
+
+        unique = []
+        for job in jobs:
+            if first_rows.get(job.key, job.row) < job.row:
+                job.status = STATUS_DONE
+                job.last_error = "duplicate"
+                updates.append(job.status_update())
+                stats["duplicates"] += 1
+            else:
+                unique.append(job)
+        await self._run_in_order(unique, updates, stats)
+        google_sheets.batch_update_cells(worksheet, updates)
+        if stats["duplicates"]:
+            logger.info("Outbox jobs skipped as duplicates: %d", stats["duplicates"])
+
+    async def drain(self, google_sheets):
+        """
+        Runs every due pending job of the outbox (periodic invocation). Pending jobs whose key already has a
+        finished job are duplicates (e.g. enqueued twice by a redelivered update) and are marked done unrun.
+        Once the outbox holds OUTBOX_MAX_ROWS finished jobs and nothing is pending, the rows read are cleared;
+        jobs appended meanwhile lie below them and are read by the next drain.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+
+        Returns:
+            dict: The number of jobs done, retried, failed for good, postponed and skipped as duplicates.
+        """
+        stats = {"done": 0, "retried": 0, "failed": 0, "postponed": 0, "duplicates": 0}
+        worksheet = get_auxiliary_worksheet(OUTBOX_SHEET_TITLE, OUTBOX_HEADER)
+        rows = google_sheets.get_all_values(worksheet)
+        jobs = [job for job in (OutboxJob.from_row(i + 2, row) for i, row in enumerate(rows[1:])) if job]
+
+        finished_keys = {job.key for job in jobs if job.status == STATUS_DONE}
+        updates, due, pending_keys, waiting_users = [], [], set(), set()
+        now = time.time()
+        for job in jobs:
+            if job.status != STATUS_PENDING:
+                continue
+            if job.key in finished_keys or job.key in pending_keys:
+                job.status = STATUS_DONE
+                job.last_error = "duplicate"
+                updates.append(job.status_update())
+                stats["duplicates"] += 1
+                continue
+            pending_keys.add(job.key)
+            if job.user_id in waiting_users:
+                # An earlier job of the applicant is leased or waiting for its retry.
+                continue
+            if job.next_attempt_at <= now:
+                due.append(job)
+            else:
+                waiting_users.add(job.user_id)
+
+        # Jobs of one applicant stay in the order they were enqueued (rows are appended in that order).
+        due.sort(key=lambda job: (job.user_id, job.row))
+        await self._run_in_order(due, updates, stats)
+        google_sheets.batch_update_cells(worksheet, updates)
+
+        pending = any(job.status == STATUS_PENDING for job in jobs)
+        if not pending and len(jobs) >= Config.OUTBOX_MAX_ROWS:
+            worksheet.batch_clear([f"A2:{google_sheets.column_letter(len(OUTBOX_HEADER))}{len(rows)}"])
+
+        if any(stats.values()):
+            logger.info("Outbox processed: %s", stats)
+        return stats
+
+
+def get_outbox():
+    """
+    Retrieves the shared outbox, creating it on first use.
+
+    Returns:
+        Outbox: The shared outbox.
+    """
+    global OUTBOX
+    if OUTBOX is None:
+        OUTBOX = Outbox()
+    return OUTBOX
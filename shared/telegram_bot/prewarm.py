@@ -0,0 +1,128 @@
+import asyncio
+import time
+import shared.telegram_bot.globals as globs
+from shared.telegram_bot.bootstrap import Bootstrap, ensure_application_ready
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.deadline import Deadline, deadline_scope
+from shared.telegram_bot.google_sheets import (
+    get_auxiliary_worksheet,
+    get_google_sheets_connection,
+    refresh_credentials,
+)
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.outbox import OUTBOX_HEADER, OUTBOX_SHEET_TITLE
+from shared.telegram_bot.stats import STATS_HEADER, STATS_SHEET_TITLE
+
+
+def warm_google_sheets():
+    """
+    Opens the shared Google Sheets connection and resolves the worksheet handles used by updates.
+    Runs in a worker thread (gspread is blocking); the steps depend on each other, so they run in order.
+    """
+    google_sheets = Bootstrap.get_google_sheets()
+
+    # The first request of the client exchanges the service account key for an OAuth token,
+    # then the document, the main sheet and the metadata shards are opened.
+    get_google_sheets_connection()
+
+    # Auxiliary worksheets written by the first updates (outbox jobs, funnel statistics, Metadata change log).
+    get_auxiliary_worksheet(OUTBOX_SHEET_TITLE, OUTBOX_HEADER)
+    get_auxiliary_worksheet(STATS_SHEET_TITLE, STATS_HEADER)
+    if google_sheets.metadata_cache:
+        google_sheets.get_changes_sheet()
+
+    if Config.PREWARM_INDEXES:
+        # Full reads of the Metadata shards and of the main sheet's Email/Phone columns.
+        if google_sheets.metadata_cache:
+            google_sheets.metadata_cache.sync(google_sheets, google_sheets.get_changes_sheet())
+        google_sheets.sync_duplicate_indexes()
+
+
+async def warm_telegram():
+    """
+    Builds the Telegram application and initializes both Bot API clients; `initialize` calls getMe,
+    which opens a connection in each client's pool.
+    """
+    await ensure_application_ready()
+    await asyncio.gather(globs.application.initialize(), globs.telegram_bot.initialize())
+
+
+async def prewarm():
+    """
+    Warms the container: Google Sheets in a worker thread while the Telegram clients initialize on the event loop.
+    A failed step is only logged; whatever it did not open is opened (and retried) by the first update using it.
+    """
+    started_at = time.perf_counter()
+    # Every request is bounded, so a slow dependency cannot make the init phase itself time out.
+    with deadline_scope(Deadline(Config.PREWARM_TIMEOUT_SECONDS * 1000, safety_margin=0)):
+        # The worker thread inherits the deadline: `to_thread` copies the context variables.
+        results = await asyncio.gather(
+            asyncio.to_thread(warm_google_sheets), warm_telegram(), return_exceptions=True
+        )
+
+    for name, result in zip(("Google Sheets", "Telegram"), results):
+        if isinstance(result, BaseException):
+            logger.warning("Pre-warming %s failed, it is retried on first use: %s", name, result)
+    logger.info("Container pre-warmed in %.0f ms.", (time.perf_counter() - started_at) * 1000)
+
+
+def prewarm_container():
+    """
+    Runs `prewarm` at module load, during the Lambda init phase (which runs with a CPU boost before the
+    first invocation). It uses the event loop the handler runs on, so the opened connections are reused.
+    Nothing is done when PREWARM is off, or when a loop is already running (the caller then awaits `prewarm`).
+    """
+    if not Config.PREWARM:
+        return
+    try:
+        asyncio.get_running_loop()
+        return
+    except RuntimeError:
+        pass
+    asyncio.get_event_loop().run_until_complete(prewarm())
+
+
+def refresh_google_sheets():
+    """
+    Refreshes the OAuth token ahead of its expiry and catches the Metadata cache and the duplicate indexes up
+    with the writes of other containers. Runs in a worker thread.
+
+    Returns:
+        dict: Whether the token was refreshed and how many main sheet rows were indexed.
+    """
+    google_sheets = Bootstrap.get_google_sheets()
+    token_refreshed = refresh_credentials()
+    if google_sheets.metadata_cache:
+        google_sheets.metadata_cache.sync(google_sheets, google_sheets.get_changes_sheet())
+    return {"token_refreshed": token_refreshed, "indexed_rows": google_sheets.sync_duplicate_indexes()}
+
+
+async def ping_telegram():
+    """
+    Keeps a connection of the handlers' Bot API client alive (the application's client is checked by
+    `ensure_application_ready` on every invocation).
+    """
+    await globs.telegram_bot.initialize()
+    await globs.telegram_bot.get_me()
+
+
+async def warm_up():
+    """
+    Scheduled "warm_up" task: keeps a warm container ready for the next updates without processing any,
+    so no update pays for an expired token or for reading the rows other containers have written.
+    A failed step is only logged; the updates redo it on demand.
+
+    Returns:
+        dict: The outcome of the Google Sheets refresh and the names of the failed steps.
+    """
+    stats = {"token_refreshed": False, "indexed_rows": 0, "failed": []}
+    results = await asyncio.gather(
+        asyncio.to_thread(refresh_google_sheets), ping_telegram(), return_exceptions=True
+    )
+    for name, result in zip(("Google Sheets", "Telegram"), results):
+        if isinstance(result, BaseException):
+            logger.warning("Warm-up of %s failed: %s", name, result)
+            stats["failed"].append(name)
+        elif result:
+            stats.update(result)
+    return stats
@@ -0,0 +1,121 @@
+import cProfile
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.logger import logger
+
+# Number of frames kept per tracemalloc allocation (1 groups allocations by source line).
+TRACEMALLOC_FRAMES = 1
+
+
+def should_profile(rate=None):
+    """
+    Decides whether the current invocation is profiled.
+
+    Args:
+        rate (float, optional): Share of invocations to profile; defaults to PROFILE_SAMPLE_RATE.
+
+    Returns:
+        bool: True if the invocation is sampled.
+    """
+    rate = Config.PROFILE_SAMPLE_RATE if rate is None else rate
+    return rate > 0 and random.random() < rate
+
+
+def summarize_cpu(profiler, top_n):
+    """
+    Renders the functions with the highest cumulative time.
+
+    Args:
+        profiler (cProfile.Profile): The stopped profiler.
+        top_n (int): The number of functions to include.
+
+    Returns:
+        str: One line per function: cumulative and own time in ms, call count and location.
+    """
+    stats = pstats.Stats(profiler).stats
+    # Each entry: (file, line, function) -> (primitive calls, total calls, own time, cumulative time, callers).
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top_n]
+    lines = []
+    for (filename, line, function), (_, calls, own_time, cumulative_time, _) in ranked:
+        location = f"{os.path.basename(filename)}:{line}({function})" if line else function
+        lines.append(f"{cumulative_time * 1000:9.1f}ms {own_time * 1000:9.1f}ms {calls:7d}  {location}")
+    return "\n".join(lines)
+
+
+def summarize_memory(before, after, top_n):
+    """
+    Renders the source lines whose allocations grew the most during the invocation.
+
+    Args:
+        before (tracemalloc.Snapshot): The snapshot taken when the invocation started.
+        after (tracemalloc.Snapshot): The snapshot taken when it ended.
+        top_n (int): The number of lines to include.
+
+    Returns:
+        str: One line per source location: allocated size difference, block count difference and location.
+    """
+    lines = []
+    for diff in after.compare_to(before, "lineno")[:top_n]:
+        frame = diff.traceback[0]
+        lines.append(
+            f"{diff.size_diff / 1024:+9.1f}KiB {diff.count_diff:+7d}  {os.path.basename(frame.filename)}:{frame.lineno}"
+        )
+    return "\n".join(lines)
+
+
+@contextmanager
+def profile_invocation(label, enabled=None):
+    """
+    Profiles CPU time (cProfile) and memory allocations (tracemalloc) of the block and logs a compact
+    top-N summary of both. Profiling is meant to be sampled: both tools slow the invocation down noticeably.
+    If PROFILE_DUMP_DIR is set, the raw cProfile data is also written there as a .prof file
+    (e.g. for `snakeviz` or `python -m pstats`).
+
+    Args:
+        label (str): What is profiled (e.g. "update" or "process_reminders"), included in the summary.
+        enabled (bool, optional): Whether to profile; defaults to sampling with PROFILE_SAMPLE_RATE.
+    """
+    if not (should_profile() if enabled is None else enabled):
+        yield
+        return
+
+    # tracemalloc may already be running (e.g. started with PYTHONTRACEMALLOC); leave it running then.
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+    started_at = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started_at
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        top_n = Config.PROFILE_TOP_N
+        logger.info(
+            "Profile of %s: %.1fms wall, %.1fKiB peak traced memory.\n"
+            "Top %d functions by cumulative time (cumulative, own, calls):\n%s\n"
+            "Top %d allocation sites by growth (size, blocks):\n%s",
+            label, elapsed * 1000, peak / 1024,
+            top_n, summarize_cpu(profiler, top_n),
+            top_n, summarize_memory(before, after, top_n),
+        )
+        if Config.PROFILE_DUMP_DIR:
+            path = os.path.join(Config.PROFILE_DUMP_DIR, f"{label}-{int(time.time() * 1000)}.prof")
+            try:
+                profiler.dump_stats(path)
+                logger.info("Raw profile of %s written to %s.", label, path)
+            except OSError as e:
+                logger.warning("Could not write the raw profile to %s: %s", path, e)
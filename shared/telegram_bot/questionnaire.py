@@ -0,0 +1,100 @@
+from types import MappingProxyType
+from typing import Callable, NamedTuple, Optional
+from shared.telegram_bot.localization import Localization
+from shared.telegram_bot.validation import Validation
+
+# Internal field IDs (main sheet column names) in the order the questions are asked.
+FIELD_IDS = (
+    "Full Name",
+    "Age",
+    "Email",
+    "Phone",
+    "Purpose",
+    "Occupation",
+    "Workplace",
+    "City",
+    "Instagram",
+    "Referral Source",
+)
+
+# Validator and localized error key for each question type; "text" answers are accepted as is.
+VALIDATORS = {
+    "email": (Validation.validate_email, "invalid_email"),
+    "phone": (Validation.validate_phone, "invalid_phone"),
+    "age": (Validation.validate_age, "invalid_age"),
+}
+
+
+class Question(NamedTuple):
+    """
+    One compiled, immutable question of the questionnaire.
+    """
+    index: int  # Position of the question in the questionnaire.
+    field_id: str  # Internal field ID, used as the main sheet column name.
+    type: str  # Question type ('text', 'email', 'phone', 'age').
+    validator: Optional[Callable[[str], bool]]  # Validation function, or None for free text.
+    error_key: Optional[str]  # Localization key of the validation error message.
+    texts: MappingProxyType  # Question text per language code.
+
+    def text(self, lang):
+        """
+        Retrieves the question text in the given language, falling back to English.
+
+        Args:
+            lang (str): The language code (e.g., 'en', 'ru', 'kz').
+
+        Returns:
+            str: The localized question text.
+        """
+        return self.texts.get(lang) or self.texts["en"]
+
+
+class QuestionnaireSchema:
+    """
+    Immutable questionnaire definition compiled once from `Localization.QUESTIONS`.
+    Holds the questions with their field IDs, validators and per-language texts,
+    plus a reverse index from any localized question text to its position.
+    """
+    __slots__ = ("questions", "text_index")
+
+    def __init__(self, questions_by_lang, field_ids):
+        """
+        Compiles the schema and checks that every language defines the same questions.
+
+        Args:
+            questions_by_lang (dict): Lists of {"question", "type"} dictionaries keyed by language code.
+            field_ids (tuple): Internal field IDs in question order.
+
+        Raises:
+            ValueError: If the languages disagree on the number or types of questions.
+        """
+        reference = questions_by_lang["en"]
+        if len(reference) != len(field_ids):
+            raise ValueError("Every question must have exactly one field ID.")
+
+        questions = []
+        text_index = {}
+        for index, field_id in enumerate(field_ids):
+            question_type = reference[index]["type"]
+            texts = {}
+            for lang, localized in questions_by_lang.items():
+                if len(localized) != len(reference) or localized[index]["type"] != question_type:
+                    raise ValueError(f"Questions of language '{lang}' do not match the English questionnaire.")
+                texts[lang] = localized[index]["question"]
+                text_index[localized[index]["question"]] = index
+            validator, error_key = VALIDATORS.get(question_type, (None, None))
+            questions.append(Question(index, field_id, question_type, validator, error_key, MappingProxyType(texts)))
+
+        self.questions = tuple(questions)
+        self.text_index = MappingProxyType(text_index)
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of questions.
+        """
+        return len(self.questions)
+
+
+# The questionnaire schema shared by every form in the process.
+SCHEMA = QuestionnaireSchema(Localization.QUESTIONS, FIELD_IDS)
@@ -0,0 +1,165 @@
+import argparse
+import re
+from shared.telegram_bot import google_sheets as sheets_module
+from shared.telegram_bot.google_sheets import (
+    GoogleSheets,
+    METADATA_HEADER,
+    get_metadata_sheet_titles,
+    get_or_create_worksheet,
+    get_shard_index,
+)
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.metadata_cache import get_metadata_cache
+
+# Titles of worksheets holding user state: the unsharded "Metadata" tab and any "Metadata_<i>" shard.
+METADATA_TITLE_PATTERN = re.compile(r"^Metadata(_\d+)?$")
+
+# Position of the "Updated At" column in a Metadata row.
+UPDATED_AT = METADATA_HEADER.index("Updated At")
+
+
+class MetadataRebalancer:
+    """
+    One-time tool that moves the user state between a single "Metadata" worksheet and K hash shards
+    (or from one shard count to another). Every existing metadata worksheet is read once, the rows are
+    grouped by the shard of their user, and each target worksheet is rewritten with a single update.
+    The bot should be paused (or the webhook removed) while it runs, otherwise concurrent writes may be lost.
+    """
+
+    def __init__(self, google_sheets, shards):
+        """
+        Initializes the rebalancer.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            shards (int): The target number of shards.
+        """
+        self.google_sheets = google_sheets
+        self.shards = shards
+
+    @property
+    def spreadsheet(self):
+        """
+        Returns:
+            Spreadsheet: The bot's document, connecting first if needed (GoogleSheets connects lazily).
+        """
+        sheets_module.get_google_sheets_connection()
+        return sheets_module.SPREADSHEET
+
+    def get_source_worksheets(self):
+        """
+        Finds every worksheet of the document that currently holds user state.
+
+        Returns:
+            list: The metadata worksheets.
+        """
+        return [
+            worksheet
+            for worksheet in self.spreadsheet.worksheets()
+            if METADATA_TITLE_PATTERN.match(worksheet.title)
+        ]
+
+    def plan(self, source_worksheets):
+        """
+        Reads all source worksheets and assigns every user to its target shard.
+        If a user appears in several worksheets (e.g. after an interrupted run), the most recently updated row wins.
+
+        Args:
+            source_worksheets (list): The metadata worksheets to read.
+
+        Returns:
+            list: One list of rows (in METADATA_HEADER order) per target shard.
+        """
+        latest = {}
+        for worksheet in source_worksheets:
+            rows = self.google_sheets.get_all_values(worksheet)
+            if not rows:
+                continue
+            header = rows[0]
+            for values in rows[1:]:
+                record = dict(zip(header, values))
+                user_id = str(record.get("User ID", "")).strip()
+                if not user_id:
+                    continue
+                row = [str(record.get(column, "")) for column in METADATA_HEADER]
+                previous = latest.get(user_id)
+                # "Updated At" sorts chronologically as text.
+                if previous is None or row[UPDATED_AT] >= previous[UPDATED_AT]:
+                    latest[user_id] = row
+
+        shards = [[] for _ in range(self.shards)]
+        for user_id, row in latest.items():
+            shards[get_shard_index(user_id, self.shards)].append(row)
+        return shards
+
+    def _write_rows(self, worksheet, rows):
+        """
+        Replaces the content of a worksheet with the header and the given rows.
+
+        Args:
+            worksheet (Worksheet): The worksheet to overwrite.
+            rows (list): The data rows.
+        """
+        values = [METADATA_HEADER, *rows]
+        last_column = self.google_sheets.column_letter(len(METADATA_HEADER))
+        if worksheet.row_count < len(values):
+            worksheet.resize(rows=len(values))
+        self.google_sheets.batch_update_cells(
+            worksheet, [{"range": f"A1:{last_column}{len(values)}", "values": values}]
+        )
+        # Clear the leftovers of a previously longer worksheet.
+        if worksheet.row_count > len(values):
+            worksheet.batch_clear([f"A{len(values) + 1}:{last_column}{worksheet.row_count}"])
+
+    def run(self, dry_run=False):
+        """
+        Rebalances the user state into the target shards.
+
+        Args:
+            dry_run (bool): If True, only computes and logs the distribution.
+
+        Returns:
+            list: The number of users per target shard.
+        """
+        source_worksheets = self.get_source_worksheets()
+        shards = self.plan(source_worksheets)
+        counts = [len(rows) for rows in shards]
+        logger.info(
+            "Rebalancing %d users from %s into %d shard(s): %s",
+            sum(counts), [ws.title for ws in source_worksheets], self.shards, counts
+        )
+        if dry_run:
+            return counts
+
+        target_titles = get_metadata_sheet_titles(self.shards)
+        for title, rows in zip(target_titles, shards):
+            worksheet = get_or_create_worksheet(self.spreadsheet, title, METADATA_HEADER)
+            self._write_rows(worksheet, rows)
+
+        # Empty the source worksheets that are no longer used, keeping their header.
+        for worksheet in source_worksheets:
+            if worksheet.title not in target_titles:
+                self._write_rows(worksheet, [])
+
+        # Rows have moved: make every container drop its cached Metadata rows.
+        get_metadata_cache().bump_generation(self.google_sheets, self.google_sheets.get_changes_sheet())
+        return counts
+
+
+def main():
+    """
+    Command-line entry point: python -m shared.telegram_bot.rebalance --shards K [--dry-run]
+    """
+    parser = argparse.ArgumentParser(description="Redistribute the Metadata user state across K worksheets.")
+    parser.add_argument("--shards", type=int, required=True, help="Target number of Metadata shards.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the resulting distribution.")
+    args = parser.parse_args()
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+
+    counts = MetadataRebalancer(GoogleSheets(), args.shards).run(dry_run=args.dry_run)
+    logger.info("Users per shard: %s. Set METADATA_SHARDS=%d before restarting the bot.", counts, args.shards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import time
+import zlib
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.validation import Validation
+
+# Global variable holding the shared update recorder (reused during AWS Lambda hot starts).
+UPDATE_RECORDER = None
+
+# Prefix of the log records carrying a recorded update (the replayer extracts them from exported logs).
+RECORD_MARKER = "recorded_update"
+
+# Integer fields holding user or chat IDs; they are replaced by stable pseudonyms.
+ID_KEYS = frozenset({"id", "user_chat_id", "user_id", "sender_chat_id"})
+# Free-text fields; they keep their shape (and validation outcome) but lose their content.
+TEXT_KEYS = frozenset({"text", "caption"})
+# Personal name fields.
+NAME_KEYS = frozenset({"first_name", "last_name", "bio"})
+# Fields dropped entirely (contact details, media and links carry personal data without affecting the flow).
+# Message entities are kept: command routing depends on them, and only their "url" can hold personal data.
+DROP_KEYS = frozenset({
+    "phone_number", "email", "contact", "location", "venue", "photo", "video", "voice", "document", "sticker",
+    "animation", "audio", "video_note", "invite_link", "reply_to_message", "web_app_data", "url",
+    "link_preview_options",
+})
+
+# Bot commands are routed by their text, so they are kept verbatim.
+COMMAND_PATTERN = re.compile(r"^/[A-Za-z0-9_]+(@\w+)?$")
+# Runs of at most this many digits are kept (ages, counts); longer runs (phone numbers, IDs) are replaced.
+KEPT_DIGITS = 3
+
+
+class UpdateRecorder:
+    """
+    Captures a sampled share of the raw webhook updates, with their arrival time, for production-shaped replays.
+
+    Sampling is decided per user, so a sampled applicant is recorded through the whole funnel.
+    Before anything is written the update is scrubbed: user and chat IDs become stable pseudonyms
+    (a keyed hash, consistent across containers sharing RECORD_SALT), names and usernames are replaced,
+    contact and media fields are dropped, and free text keeps only its shape: letters become "x", long digit
+    runs are replaced, valid emails and phone numbers become synthetic valid ones. Validation outcomes,
+    commands and callback data are therefore preserved while no personal data leaves the handler.
+    """
+
+    def __init__(self, rate, salt, sink):
+        """
+        Args:
+            rate (float): Share of users whose updates are recorded (0 disables recording).
+            salt (str): Secret key of the ID pseudonyms; a random per-container key is used if empty.
+            sink (str): "log" to emit each update as a log record, or the path of a JSON Lines file.
+        """
+        self.rate = rate
+        if not salt and rate > 0:
+            logger.warning("RECORD_SALT is not set: recorded IDs are only consistent within this container.")
+        self.salt = (salt or secrets.token_hex(16)).encode()
+        self.sink = sink
+
+    def is_sampled(self, update):
+        """
+        Args:
+            update (dict): The raw update.
+
+        Returns:
+            bool: True if the update's user is in the recorded share.
+        """
+        if self.rate <= 0:
+            return False
+        if self.rate >= 1:
+            return True
+        user_id = self._find_user_id(update)
+        key = str(user_id if user_id is not None else update.get("update_id"))
+        return zlib.crc32(key.encode()) % 10000 < self.rate * 10000
+
+    @staticmethod
+    def _find_user_id(update):
+        """
+        Returns:
+            int | None: The ID of the user who sent the update, if any.
+        """
+        for value in update.values():
+            if isinstance(value, dict) and isinstance(value.get("from"), dict):
+                return value["from"].get("id")
+        return None
+
+    def pseudonym(self, value):
+        """
+        Maps a user or chat ID to a stable pseudonym of the same kind (group IDs stay negative, "-100..." form).
+
+        Args:
+            value (int): The original ID.
+
+        Returns:
+            int: The pseudonymous ID.
+        """
+        digest = int(hmac.new(self.salt, str(value).encode(), hashlib.sha256).hexdigest()[:15], 16)
+        if value < 0:
+            return -(1_000_000_000_000 + digest % 1_000_000_000_000)
+        return 1_000_000_000 + digest % 8_000_000_000
+
+    def _digits(self, digits, seed):
+        """
+        Returns:
+            str: A replacement digit run of the same length, derived from the original.
+        """
+        digest = hmac.new(self.salt, f"{seed}:{digits}".encode(), hashlib.sha256).hexdigest()
+        replacement = "".join(str(int(ch, 16) % 10) for ch in digest)
+        while len(replacement) < len(digits):
+            replacement += replacement
+        return replacement[:len(digits)]
+
+    def scrub_text(self, text):
+        """
+        Replaces a free-text answer with a value of the same shape.
+
+        Args:
+            text (str): The original text.
+
+        Returns:
+            str: The scrubbed text.
+        """
+        stripped = text.strip()
+        if COMMAND_PATTERN.match(stripped):
+            return text
+        if Validation.validate_email(stripped):
+            return f"user{self._digits(stripped, 'email')[:8]}@example.com"
+        if Validation.validate_phone(Validation.normalize_phone(stripped)):
+            # Keep the formatting and the trunk prefix, so the number normalizes the same way.
+            head, rest = re.match(r"^(\D*(?:00|\d)?)(.*)$", stripped, re.S).groups()
+            digits = iter(self._digits("".join(ch for ch in rest if ch.isdigit()), "phone"))
+            return head + "".join(next(digits) if ch.isdigit() else ch for ch in rest)
+
+        def replace_digits(match):
+            run = match.group(0)
+            return run if len(run) <= KEPT_DIGITS else self._digits(run, "digits")
+
+        masked = re.sub(r"\d+", replace_digits, text)
+        return "".join(("X" if ch.isupper() else "x") if ch.isalpha() else ch for ch in masked)
+
+    def scrub(self, value, key=None):
+        """
+        Recursively scrubs an update (or a part of it).
+
+        Args:
+            value (object): The value to scrub.
+            key (str, optional): The field name the value is stored under.
+
+        Returns:
+            object: The scrubbed copy.
+        """
+        if isinstance(value, dict):
+            return {k: self.scrub(v, k) for k, v in value.items() if k not in DROP_KEYS}
+        if isinstance(value, list):
+            return [self.scrub(item, key) for item in value]
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int) and key in ID_KEYS:
+            return self.pseudonym(value)
+        if isinstance(value, str):
+            if key in TEXT_KEYS:
+                return self.scrub_text(value)
+            if key in NAME_KEYS:
+                return "Applicant" if key == "first_name" else ""
+            if key == "username":
+                return f"user{self._digits(value, 'username')[:8]}"
+            if key == "title":
+                return "Group"
+        return value
+
+    def record(self, body):
+        """
+        Records a raw webhook body if its user is sampled. Never raises: recording must not affect processing.
+
+        Args:
+            body (str): The raw JSON update received by the webhook.
+        """
+        if self.rate <= 0:
+            return
+        try:
+            update = json.loads(body)
+            if not self.is_sampled(update):
+                return
+            line = json.dumps({"ts": round(time.time(), 3), "update": self.scrub(update)}, ensure_ascii=False)
+            if self.sink == "log":
+                logger.info("%s %s", RECORD_MARKER, line)
+            else:
+                with open(self.sink, "a", encoding="utf-8") as recording:
+                    recording.write(line + "\n")
+        except Exception as e:
+            logger.warning("Could not record the update: %s", e)
+
+
+def get_update_recorder():
+    """
+    Retrieves the shared update recorder, creating it on first use from the RECORD_* settings.
+
+    Returns:
+        UpdateRecorder: The shared recorder.
+    """
+    global UPDATE_RECORDER
+    if UPDATE_RECORDER is None:
+        UPDATE_RECORDER = UpdateRecorder(Config.RECORD_SAMPLE_RATE, Config.RECORD_SALT, Config.RECORD_SINK)
+    return UPDATE_RECORDER
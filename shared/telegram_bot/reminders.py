@@ -0,0 +1,352 @@
+import heapq
+import json
+import time
+from datetime import datetime
+from telegram.error import BadRequest, Forbidden
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.deadline import is_low_on_time
+from shared.telegram_bot.localization import Localization
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.outbound import Priority, get_outbound_scheduler
+from shared.telegram_bot.tenants import get_tenant_registry
+
+# Global variable holding the shared reminder scheduler (reused during AWS Lambda hot starts).
+REMINDER_SCHEDULER = None
+
+# Stages of an in-flight applicant.
+STAGE_WAITING = 0  # No reminder sent yet; the next deadline is the reminder.
+STAGE_REMINDED = 1  # Reminder sent; the next deadline is the automatic decline.
+
+# Format of the "Updated At" and "Reminded At" columns in the Metadata sheet.
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ReminderEntry:
+    """
+    In-memory state of one in-flight applicant tracked by the reminder scheduler.
+    """
+    __slots__ = ("last_activity", "lang", "chat_id", "stage", "due_at", "reminded_at")
+
+    def __init__(self, last_activity, lang, chat_id, stage, due_at, reminded_at=None):
+        self.last_activity = last_activity  # Epoch seconds of the user's last state change.
+        self.lang = lang  # The user's language (may be empty before language selection).
+        self.chat_id = chat_id  # The group the user wants to join.
+        self.stage = stage  # STAGE_WAITING or STAGE_REMINDED.
+        self.due_at = due_at  # Epoch seconds of the next action for this user.
+        self.reminded_at = reminded_at  # Epoch seconds of the reminder (None before it is sent).
+
+
+class ReminderScheduler:
+    """
+    Keeps a time-ordered heap of every in-flight applicant's next deadline.
+    Idle applicants first receive the `form_reminder` message and, after a longer deadline,
+    their join request is declined with the `fill_missing_data` message.
+
+    Handlers call `track` on every state change. A periodic invocation calls `run`, which first catches the
+    index up with the Metadata sheet (applicants served by other containers) and then pops only the entries
+    that are due; outdated heap entries are skipped lazily.
+    The stage is persisted in the "Reminded At" Metadata column (cleared by any activity), so a container
+    built from the sheet neither skips nor repeats a reminder.
+    """
+
+    def __init__(self, remind_after=None, decline_after=None):
+        """
+        Initializes an empty scheduler.
+
+        Args:
+            remind_after (float, optional): Idle seconds before the reminder is sent.
+            decline_after (float, optional): Idle seconds before the join request is declined.
+        """
+        self.remind_after = remind_after or Config.REMINDER_AFTER_HOURS * 3600
+        self.decline_after = decline_after or Config.DECLINE_AFTER_HOURS * 3600
+        self.entries = {}  # In-flight applicants keyed by user ID (as string).
+        self.heap = []  # Heap of (due_at, user_id); an item is valid only if it matches the entry's due_at.
+
+    @staticmethod
+    def _parse_timestamp(value):
+        """
+        Parses an "Updated At" cell into epoch seconds.
+
+        Args:
+            value (str): The cell value.
+
+        Returns:
+            float | None: The timestamp, or None if the cell is empty or malformed.
+        """
+        try:
+            return datetime.strptime(str(value), TIMESTAMP_FORMAT).timestamp()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _is_complete(lang, current_question_index, chat_id):
+        """
+        Checks whether the questionnaire of the user is finished.
+
+        Args:
+            lang (str): The user's language.
+            current_question_index (int): The index of the current question.
+            chat_id (str): The group chat ID, which selects the questionnaire.
+
+        Returns:
+            bool: True if every question has been answered.
+        """
+        schema = get_tenant_registry().resolve(chat_id).schema
+        return bool(lang) and int(current_question_index) >= len(schema)
+
+    def _schedule(self, user_id, entry):
+        """
+        Pushes the next deadline of an entry onto the heap.
+
+        Args:
+            user_id (str): The Telegram user ID.
+            entry (ReminderEntry): The entry to schedule.
+        """
+        if entry.stage == STAGE_WAITING:
+            entry.due_at = entry.last_activity + self.remind_after
+        else:
+            # A late reminder (e.g. sent by a catching-up run) still leaves the user the whole grace period.
+            entry.due_at = max(entry.last_activity + self.decline_after,
+                               (entry.reminded_at or 0) + self.decline_after - self.remind_after)
+        self.entries[user_id] = entry
+        heapq.heappush(self.heap, (entry.due_at, user_id))
+
+        # Outdated items accumulate as users keep answering; rebuild the heap when they dominate.
+        if len(self.heap) > 2 * len(self.entries) + 1000:
+            self.heap = [(e.due_at, uid) for uid, e in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def track(self, user_id, lang, current_question_index, chat_id, last_activity=None):
+        """
+        Records a state change of the user: in-flight users are (re)scheduled, finished users are forgotten.
+
+        Args:
+            user_id (str): The Telegram user ID.
+            lang (str): The user's language.
+            current_question_index (int): The index of the current question.
+            chat_id (str): The group chat ID.
+            last_activity (float, optional): Epoch seconds of the activity; defaults to now.
+        """
+        user_id = str(user_id)
+        if self._is_complete(lang, current_question_index, chat_id):
+            self.entries.pop(user_id, None)
+            return
+        last_activity = time.time() if last_activity is None else last_activity
+        self._schedule(user_id, ReminderEntry(last_activity, lang, str(chat_id or ""), STAGE_WAITING, 0))
+
+    def _stage(self, record, last_activity):
+        """
+        Derives the stage of an in-flight user from their Metadata record.
+
+        Args:
+            record (dict): The Metadata record.
+            last_activity (float): Epoch seconds of the user's last activity.
+
+        Returns:
+            tuple: (STAGE_WAITING or STAGE_REMINDED, epoch seconds of the reminder or None).
+        """
+        reminded_at = self._parse_timestamp(record.get("Reminded At", ""))
+        if reminded_at is not None and reminded_at >= last_activity:
+            return STAGE_REMINDED, reminded_at
+        return STAGE_WAITING, None
+
+    def sync(self, records):
+        """
+        Brings the index up to date with the Metadata records. Users seen for the first time, or active or
+        reminded since (e.g. in another container), are (re)scheduled; finished, declined and removed users
+        are dropped. The stage comes from the "Reminded At" column, so users who were reminded before a
+        container restart are not reminded again, and the others still are.
+
+        Args:
+            records (list): Every Metadata record.
+        """
+        seen = set()
+        for record in records:
+            user_id = str(record.get("User ID"))
+            seen.add(user_id)
+            last_activity = self._parse_timestamp(record.get("Updated At", ""))
+            lang = record.get("Language", "")
+            chat_id = str(record.get("Chat ID", "") or "")
+            if last_activity is None or self._is_complete(lang, record.get("Current Question Index", 0) or 0, chat_id):
+                self.entries.pop(user_id, None)
+                continue
+            stage, reminded_at = self._stage(record, last_activity)
+            entry = self.entries.get(user_id)
+            if entry and entry.last_activity >= last_activity and entry.stage == stage:
+                continue  # Already scheduled from this state (e.g. tracked by this container).
+            self._schedule(user_id, ReminderEntry(last_activity, lang, chat_id, stage, 0, reminded_at))
+        for user_id in set(self.entries) - seen:
+            del self.entries[user_id]
+
+    def _pop_due(self, now):
+        """
+        Pops every valid heap item whose deadline has passed.
+
+        Args:
+            now (float): The current epoch time.
+
+        Returns:
+            list: The user IDs that are due.
+        """
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due_at, user_id = heapq.heappop(self.heap)
+            entry = self.entries.get(user_id)
+            if entry and entry.due_at == due_at:
+                due.append(user_id)
+        return due
+
+    async def _send(self, bot, user_id, lang, key):
+        """
+        Sends a localized message to the user (in all languages if no language was selected).
+
+        Args:
+            bot (Bot): The Telegram bot instance.
+            user_id (str): The Telegram user ID.
+            lang (str): The user's language.
+            key (str): The localization key of the message.
+        """
+        text = Localization.get_string(lang, key) if lang else Localization.get_multilang_string(key)
+        await get_outbound_scheduler().send_message(bot, int(user_id), priority=Priority.BACKGROUND, text=text)
+
+    @staticmethod
+    def _mark_reminded(google_sheets, user_id, record, reminded_at):
+        """
+        Persists that the user has been reminded, keeping their state and last-activity time.
+        The write is conditional on the row version, so it is dropped if the user was active meanwhile.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            user_id (str): The Telegram user ID.
+            record (dict): The user's current Metadata record.
+            reminded_at (float): Epoch seconds of the reminder.
+        """
+        responses = json.loads(record["Responses"]) if record.get("Responses") else []
+        google_sheets.save_user_state(
+            user_id, record.get("Language", ""), record.get("Current Question Index", 0), responses,
+            record.get("Chat ID"), record.get("Last Question"), updated_at=record.get("Updated At", ""),
+            reminded_at=datetime.fromtimestamp(reminded_at).strftime(TIMESTAMP_FORMAT)
+        )
+
+    async def _decline(self, bot, google_sheets, user_id, record):
+        """
+        Declines the join request of the user and stops tracking them.
+
+        Args:
+            bot (Bot): The Telegram bot instance.
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            user_id (str): The Telegram user ID.
+            record (dict): The user's current Metadata record.
+        """
+        entry = self.entries.pop(user_id)
+        chat_id = entry.chat_id or Config.DEFAULT_GROUP_CHAT_ID
+        try:
+            await get_outbound_scheduler().call(
+                Priority.BACKGROUND,
+                None,
+                bot.decline_chat_join_request,
+                chat_id=int(chat_id),
+                user_id=int(user_id)
+            )
+        except BadRequest as e:
+            # The request has already been approved, declined or cancelled by the user.
+            logger.warning("Could not decline the join request of user %s: %s", user_id, e)
+
+        # Clear the activity timestamp so that the user is no longer tracked after a restart.
+        responses = json.loads(record["Responses"]) if record.get("Responses") else []
+        google_sheets.save_user_state(
+            user_id, record.get("Language", ""), record.get("Current Question Index", 0), responses,
+            record.get("Chat ID"), updated_at=""
+        )
+        await self._send(bot, user_id, entry.lang, "fill_missing_data")
+
+    async def run(self, bot, google_sheets):
+        """
+        Processes the due entries: sends reminders and declines stale join requests.
+        The Metadata records are read first (with the Metadata cache, only the rows changed since the last check),
+        so applicants who went through other containers are tracked, and a due user who has been active in
+        another container is rescheduled instead of reminded.
+
+        Args:
+            bot (Bot): The Telegram bot instance.
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+
+        Returns:
+            dict: The number of reminders sent and join requests declined (and of due users postponed
+                to the next run when the invocation ran low on time).
+        """
+        stats = {"reminded": 0, "declined": 0}
+        records = {str(record.get("User ID")): record for record in google_sheets.get_all_metadata_records()}
+        self.sync(records.values())
+
+        now = time.time()
+        due = self._pop_due(now)
+        if not due:
+            return stats
+
+        for position, user_id in enumerate(due):
+            # Leave the rest for the next scheduled invocation rather than running past the time budget.
+            if is_low_on_time():
+                for pending in due[position:]:
+                    if pending in self.entries:
+                        heapq.heappush(self.heap, (self.entries[pending].due_at, pending))
+                stats["postponed"] = len(due) - position
+                break
+
+            entry = self.entries[user_id]
+            record = records.get(user_id)
+            if record is None:
+                self.entries.pop(user_id, None)
+                continue
+
+            # Reschedule users who have been active since the entry was created (or finished the form).
+            last_activity = self._parse_timestamp(record.get("Updated At", ""))
+            if last_activity is None or self._is_complete(record.get("Language", ""),
+                                                          record.get("Current Question Index", 0) or 0,
+                                                          record.get("Chat ID", "")):
+                self.entries.pop(user_id, None)
+                continue
+            stage, reminded_at = self._stage(record, last_activity)
+            if last_activity > entry.last_activity or stage != entry.stage:
+                # Active since the entry was created, or reminded by another container.
+                entry.last_activity = last_activity
+                entry.stage, entry.reminded_at = stage, reminded_at
+                entry.lang = record.get("Language", "")
+                self._schedule(user_id, entry)
+                continue
+
+            try:
+                if entry.stage == STAGE_WAITING:
+                    await self._send(bot, user_id, entry.lang, "form_reminder")
+                    entry.stage, entry.reminded_at = STAGE_REMINDED, time.time()
+                    self._mark_reminded(google_sheets, user_id, record, entry.reminded_at)
+                    self._schedule(user_id, entry)
+                    stats["reminded"] += 1
+                else:
+                    await self._decline(bot, google_sheets, user_id, record)
+                    stats["declined"] += 1
+            except Forbidden:
+                # The user has blocked the bot; nothing more can be sent to them.
+                logger.warning("Cannot remind user %s — the bot is blocked.", user_id)
+                if entry.stage == STAGE_WAITING:
+                    entry.stage, entry.reminded_at = STAGE_REMINDED, time.time()
+                    self._mark_reminded(google_sheets, user_id, record, entry.reminded_at)
+                    self._schedule(user_id, entry)
+                else:
+                    self.entries.pop(user_id, None)
+
+        logger.info("Reminders processed: %s", stats)
+        return stats
+
+
+def get_reminder_scheduler():
+    """
+    Retrieves the shared reminder scheduler, creating it on first use.
+
+    Returns:
+        ReminderScheduler: The shared scheduler.
+    """
+    global REMINDER_SCHEDULER
+    if REMINDER_SCHEDULER is None:
+        REMINDER_SCHEDULER = ReminderScheduler()
+    return REMINDER_SCHEDULER
@@ -0,0 +1,271 @@
+import re
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.google_sheets import get_auxiliary_worksheet
+from shared.telegram_bot.logger import logger
+
+# Global variable holding the shared funnel statistics (reused during AWS Lambda hot starts).
+FUNNEL_STATS = None
+
+# Funnel stages with a column of their own. Answers are counted per question number ("q1", "q2", ...) and
+# stored together in the "Answers" column, so groups with longer questionnaires are counted completely.
+STAGES = ("join_request", "language", "privacy", "complete")
+
+# Title and header of the aggregate worksheet.
+STATS_SHEET_TITLE = "Stats"
+STATS_HEADER = ["Date", "Language", "Container", *STAGES, "Answers"]
+
+# Language bucket of events recorded before the user selected a language.
+NO_LANGUAGE = "-"
+
+# Counter key of an answer (and column name of the per-question layout written by earlier versions).
+ANSWER_STAGE = re.compile(r"^q(\d+)$")
+
+
+def _parse_counts(header, row):
+    """
+    Reads the counters of a "Stats" row, locating the columns by name.
+    Both the current layout and the earlier one with a column per question are understood.
+
+    Args:
+        header (list): The header row of the worksheet.
+        row (list): The row.
+
+    Returns:
+        Counter: The counters of the row, keyed by stage ("q<number>" for answers).
+    """
+    counts = Counter()
+    for name, value in zip(header, row):
+        value = str(value).strip()
+        if name in STAGES or ANSWER_STAGE.match(name):
+            if value.isdigit():
+                counts[name] += int(value)
+        elif name == "Answers":
+            for number, count in enumerate(value.split(), start=1):
+                if count.isdigit():
+                    counts[f"q{number}"] += int(count)
+    return counts
+
+
+def _answer_numbers(counts):
+    """
+    Lists the question numbers present in counters, in order.
+
+    Args:
+        counts (Counter): Counters keyed by stage.
+
+    Returns:
+        list: The sorted question numbers.
+    """
+    return sorted(int(match.group(1)) for match in map(ANSWER_STAGE.match, counts) if match)
+
+
+def _format_row(day, lang, container_id, counts):
+    """
+    Builds a "Stats" row from counters.
+
+    Args:
+        day (str): The ISO date of the bucket.
+        lang (str): The language of the bucket.
+        container_id (str): The ID of the container owning the row.
+        counts (Counter): The counters of the bucket.
+
+    Returns:
+        list: The cell values.
+    """
+    numbers = _answer_numbers(counts)
+    answers = " ".join(str(counts[f"q{number}"]) for number in range(1, max(numbers, default=0) + 1))
+    return [day, lang, container_id, *(counts[stage] for stage in STAGES), answers]
+
+
+class FunnelStats:
+    """
+    Incrementally maintained funnel counters, bucketed by day and language.
+
+    Handlers call `record` as a side effect of each transition; counting is a dictionary increment.
+    Counters are flushed to the small "Stats" worksheet at most every STATS_FLUSH_SECONDS.
+    Each container owns its own rows (one per day and language, tagged with a container ID), so flushes
+    from concurrent containers never overwrite each other; readers simply sum the rows.
+    The worksheet stays bounded: rows older than STATS_RETENTION_DAYS are overwritten by new rows instead of
+    appending. Every row holds the cumulative counters of its container, so a row lost to another container
+    reusing the same expired row is simply written again on the next flush.
+    """
+
+    def __init__(self, flush_interval=None, retention_days=None):
+        """
+        Initializes empty counters.
+
+        Args:
+            flush_interval (float, optional): Minimum number of seconds between two flushes.
+            retention_days (int, optional): Age (in days) after which rows of the worksheet are reused.
+        """
+        self.flush_interval = Config.STATS_FLUSH_SECONDS if flush_interval is None else flush_interval
+        self.retention_days = retention_days or Config.STATS_RETENTION_DAYS
+        self.container_id = uuid.uuid4().hex[:8]  # Identifies the rows owned by this container.
+        self.totals = {}  # Counter of this container per (day, language).
+        self.dirty = set()  # (day, language) buckets changed since the last flush.
+        self.last_flush = time.monotonic()
+        self.header_checked = False  # Whether the worksheet layout has been checked by this container.
+
+    def record(self, stage, lang):
+        """
+        Counts one funnel transition.
+
+        Args:
+            stage (str): One of STAGES, or "q<number>" for an answer.
+            lang (str): The user's language (empty if not selected yet).
+        """
+        bucket = (date.today().isoformat(), lang or NO_LANGUAGE)
+        self.totals.setdefault(bucket, Counter())[stage] += 1
+        self.dirty.add(bucket)
+
+    def record_answer(self, question_number, lang):
+        """
+        Counts an answer to the given question.
+
+        Args:
+            question_number (int): The 1-based number of the answered question.
+            lang (str): The user's language.
+        """
+        self.record(f"q{question_number}", lang)
+
+    def flush(self, google_sheets, force=False):
+        """
+        Writes the changed buckets of this container to the "Stats" worksheet.
+        Errors are logged and the buckets stay dirty, so counting never breaks update processing.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            force (bool): If True, flushes even if the flush interval has not elapsed.
+        """
+        if not self.dirty or (not force and time.monotonic() - self.last_flush < self.flush_interval):
+            return
+        try:
+            worksheet = self._get_worksheet(google_sheets)
+
+            # Locate this container's rows and the expired rows that may be reused, from the first three columns.
+            expired_before = (date.today() - timedelta(days=self.retention_days)).isoformat()
+            owned, free = {}, []
+            for row_number, cells in enumerate(google_sheets.get_ranges(worksheet, ["A2:C"])[0], start=2):
+                day, lang, container_id = (list(cells) + ["", "", ""])[:3]
+                if not day or day < expired_before:
+                    free.append(row_number)
+                elif container_id == self.container_id:
+                    owned[(day, lang)] = row_number
+
+            # Write the changed buckets, and the buckets whose row has been reused by another container meanwhile.
+            last_column = google_sheets.column_letter(len(STATS_HEADER))
+            updates, appends = [], []
+            for bucket in sorted(self.dirty | {bucket for bucket in self.totals if bucket not in owned}):
+                row = _format_row(*bucket, self.container_id, self.totals[bucket])
+                row_number = owned.get(bucket)
+                if row_number is None and free:
+                    # Containers pick different expired rows, so concurrent reuse rarely collides.
+                    row_number = free.pop(int(self.container_id, 16) % len(free))
+                if row_number is None:
+                    appends.append(row)
+                else:
+                    updates.append({"range": f"A{row_number}:{last_column}{row_number}", "values": [row]})
+            google_sheets.batch_update_cells(worksheet, updates)
+            if appends:
+                google_sheets.append_rows(worksheet, appends)
+            self.dirty.clear()
+            self.last_flush = time.monotonic()
+
+            # Buckets of previous days will not change anymore; drop them from memory.
+            today = date.today().isoformat()
+            for bucket in [bucket for bucket in self.totals if bucket[0] < today]:
+                del self.totals[bucket]
+        except Exception as e:
+            logger.error("Failed to flush funnel statistics: %s", e, exc_info=True)
+
+    def _get_worksheet(self, google_sheets):
+        """
+        Retrieves the "Stats" worksheet, converting it once per container from the earlier layout
+        with a column per question, so rows written before the upgrade keep counting.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+
+        Returns:
+            Worksheet: The worksheet.
+        """
+        worksheet = get_auxiliary_worksheet(STATS_SHEET_TITLE, STATS_HEADER)
+        if self.header_checked:
+            return worksheet
+        rows = google_sheets.get_all_values(worksheet)
+        if rows and [name for name in rows[0] if name] != STATS_HEADER:
+            header = rows[0]
+            converted = [STATS_HEADER, *(
+                _format_row(*(row + ["", "", ""])[:3], _parse_counts(header, row)) for row in rows[1:]
+            )]
+            # Pad to the earlier width, so the cells of the removed columns are cleared in the same request.
+            width = max(len(header), len(STATS_HEADER))
+            google_sheets.batch_update_cells(worksheet, [{
+                "range": f"A1:{google_sheets.column_letter(width)}{len(converted)}",
+                "values": [row + [""] * (width - len(row)) for row in converted],
+            }])
+            logger.info("Converted %d rows of the %s worksheet to the current layout.", len(rows) - 1, worksheet.title)
+        self.header_checked = True
+        return worksheet
+
+    def summary(self, google_sheets, days=7):
+        """
+        Aggregates the funnel of the last days per language from the "Stats" worksheet.
+        This container's counters are flushed first, so the summary is up to date for it.
+
+        Args:
+            google_sheets (GoogleSheets): Instance for managing Google Sheets interactions.
+            days (int): The number of days (including today) to aggregate.
+
+        Returns:
+            dict: Counters per language, plus an "all" entry with the totals.
+        """
+        self.flush(google_sheets, force=True)
+        first_day = (date.today() - timedelta(days=days - 1)).isoformat()
+        rows = google_sheets.get_all_values(self._get_worksheet(google_sheets))
+
+        summary = {"all": Counter()}
+        for row in rows[1:]:
+            if len(row) < 2 or not row[0] or row[0] < first_day:
+                continue
+            counts = _parse_counts(rows[0], row)
+            summary.setdefault(row[1], Counter()).update(counts)
+            summary["all"].update(counts)
+        return summary
+
+    @staticmethod
+    def format_summary(summary, days=7):
+        """
+        Formats a funnel summary as an HTML admin message.
+
+        Args:
+            summary (dict): Counters per language, as returned by `summary`.
+            days (int): The number of aggregated days.
+
+        Returns:
+            str: The message text.
+        """
+        lines = [f"📊 <b>Funnel for the last {days} days</b>"]
+        for lang in ["all", *sorted(key for key in summary if key != "all")]:
+            counts = summary[lang]
+            stages = ["join_request", "language", "privacy", *(f"q{n}" for n in _answer_numbers(counts)), "complete"]
+            funnel = " → ".join(f"{stage}: {counts[stage]}" for stage in stages if counts[stage])
+            lines.append(f"\n<b>{lang}</b>\n{funnel or 'no data'}")
+        return "\n".join(lines)
+
+
+def get_funnel_stats():
+    """
+    Retrieves the shared funnel statistics, creating them on first use.
+
+    Returns:
+        FunnelStats: The shared statistics.
+    """
+    global FUNNEL_STATS
+    if FUNNEL_STATS is None:
+        FUNNEL_STATS = FunnelStats()
+    return FUNNEL_STATS
@@ -0,0 +1,129 @@
+import json
+from typing import NamedTuple, Optional
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.logger import logger
+from shared.telegram_bot.questionnaire import SCHEMA, QuestionnaireSchema
+
+# Global variable holding the shared tenant registry (reused during AWS Lambda hot starts).
+TENANT_REGISTRY = None
+
+
+class Tenant(NamedTuple):
+    """
+    Configuration of one group (community) served by the bot.
+    """
+    chat_id: str  # The group chat ID, also used as the tenant key.
+    name: str  # Community name shown in the welcome and completion messages.
+    sheet_id: str  # Google Sheets document receiving the completed applications.
+    invite_link: str  # Group invite link sent after the questionnaire.
+    admin_chat_id: str  # Chat receiving the approval notifications.
+    schema: QuestionnaireSchema  # Compiled questionnaire of the group.
+    columns: Optional[tuple] = None  # Main sheet column order for a custom questionnaire (None: default layout).
+
+
+class TenantRegistry:
+    """
+    Resolves the tenant of a group chat ID.
+    The default tenant is built from the single-group environment variables, so existing deployments
+    keep working unchanged; groups listed in TENANTS_CONFIG override any of its settings.
+    Questionnaires are compiled once per tenant when the registry is created.
+    """
+
+    def __init__(self, tenants_config=None):
+        """
+        Builds the default tenant and the configured ones.
+
+        Args:
+            tenants_config (dict, optional): Tenant settings keyed by group chat ID; defaults to TENANTS_CONFIG.
+
+        Raises:
+            ValueError: If a custom questionnaire is inconsistent.
+        """
+        self.default = Tenant(
+            chat_id=str(Config.DEFAULT_GROUP_CHAT_ID),
+            name=Config.COMMUNITY_NAME,
+            sheet_id=Config.GOOGLE_SHEET_ID,
+            invite_link=Config.GROUP_INVITE_LINK,
+            admin_chat_id=str(Config.ADMIN_CHAT_ID),
+            schema=SCHEMA,
+        )
+        if tenants_config is None:
+            tenants_config = self._load_config(Config.TENANTS_CONFIG)
+        self.tenants = {self.default.chat_id: self.default}
+        for chat_id, settings in tenants_config.items():
+            self.tenants[str(chat_id)] = self._build_tenant(str(chat_id), settings)
+
+    @staticmethod
+    def _load_config(value):
+        """
+        Parses TENANTS_CONFIG, given either inline as JSON or as a path to a JSON file.
+
+        Args:
+            value (str): The environment variable value.
+
+        Returns:
+            dict: Tenant settings keyed by group chat ID.
+        """
+        if not value:
+            return {}
+        if value.lstrip().startswith("{"):
+            return json.loads(value)
+        with open(value, encoding="utf-8") as config_file:
+            return json.load(config_file)
+
+    def _build_tenant(self, chat_id, settings):
+        """
+        Builds a tenant, falling back to the default tenant for every missing setting.
+
+        Args:
+            chat_id (str): The group chat ID.
+            settings (dict): The tenant settings.
+
+        Returns:
+            Tenant: The tenant.
+        """
+        schema, columns = self.default.schema, None
+        if settings.get("questions"):
+            # A custom questionnaire stores its answers under its own field IDs.
+            fields = tuple(settings["fields"])
+            schema = QuestionnaireSchema(settings["questions"], fields)
+            columns = ("User ID", *fields, "Username", "Bio", "DateTime")
+        return Tenant(
+            chat_id=chat_id,
+            name=settings.get("name", self.default.name),
+            sheet_id=settings.get("sheet_id", self.default.sheet_id),
+            invite_link=settings.get("invite_link", self.default.invite_link),
+            admin_chat_id=str(settings.get("admin_chat_id", self.default.admin_chat_id)),
+            schema=schema,
+            columns=columns,
+        )
+
+    def resolve(self, chat_id):
+        """
+        Retrieves the tenant of a group chat.
+
+        Args:
+            chat_id (str | int | None): The group chat ID (e.g. `join_request.chat.id` or the stored Chat ID).
+
+        Returns:
+            Tenant: The configured tenant, or the default one for unknown or missing chat IDs.
+        """
+        tenant = self.tenants.get(str(chat_id)) if chat_id else None
+        if tenant is None:
+            if chat_id and str(chat_id) != self.default.chat_id:
+                logger.warning("No tenant configured for chat %s, using the default group settings.", chat_id)
+            return self.default
+        return tenant
+
+
+def get_tenant_registry():
+    """
+    Retrieves the shared tenant registry, creating it on first use.
+
+    Returns:
+        TenantRegistry: The shared registry.
+    """
+    global TENANT_REGISTRY
+    if TENANT_REGISTRY is None:
+        TENANT_REGISTRY = TenantRegistry()
+    return TENANT_REGISTRY
@@ -0,0 +1,292 @@
+import functools
+import inspect
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from telegram.request import HTTPXRequest
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.logger import logger
+
+# Global variable holding the shared tracer (reused during AWS Lambda hot starts).
+TRACER = None
+
+# Span that is currently open in this task; new spans become its children.
+CURRENT_SPAN = ContextVar("current_span", default=None)
+
+# Number of critical-path steps included in the per-invocation summary.
+SUMMARY_MAX_STEPS = 8
+
+
+class Span:
+    """
+    One timed operation of a trace (a handler, a Google Sheets call, a Telegram Bot API request, ...).
+    """
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start", "end", "error", "children")
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        """
+        Opens a span.
+
+        Args:
+            name (str): The operation name (e.g. "sheets.save_user_state").
+            trace_id (str): The ID shared by every span of the trace.
+            parent_id (str | None): The ID of the enclosing span, or None for the root span.
+            attributes (dict): Additional fields describing the operation.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+        self.children = []
+
+    @property
+    def duration_ms(self):
+        """
+        Returns:
+            float: The span duration in milliseconds (up to now if the span is still open).
+        """
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The exported representation of the span.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "duration_ms": round(self.duration_ms, 2),
+            "error": self.error,
+            **self.attributes,
+        }
+
+
+class StdoutJsonExporter:
+    """
+    Writes every finished span as one log line, whose JSON object carries the span fields (with LOG_FORMAT=json).
+    Spans go through the logger's queue like any other record, so exporting never blocks the event loop on
+    console I/O, and spans are flushed together with the logs at the end of the invocation.
+    """
+
+    def __init__(self, span_logger=None):
+        """
+        Args:
+            span_logger (Logger, optional): The logger receiving the spans; defaults to "telegram_bot.spans".
+        """
+        self.logger = span_logger or logging.getLogger(f"{logger.name}.spans")
+        # Tracing is enabled explicitly, so spans are kept whatever LOG_LEVEL is.
+        self.logger.setLevel(logging.INFO)
+
+    def export(self, spans):
+        """
+        Args:
+            spans (list): The finished spans of one trace.
+        """
+        for span in spans:
+            # The dictionary is built here, but only encoded by the listener thread.
+            self.logger.info("span %s %.1fms", span.name, span.duration_ms, extra={"fields": span.to_dict()})
+
+
+class InMemoryExporter:
+    """
+    Keeps the finished spans in memory, e.g. for inspecting a trace from a test or a local script.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        """
+        Args:
+            spans (list): The finished spans of one trace.
+        """
+        self.spans.extend(spans)
+
+    def clear(self):
+        """
+        Forgets the collected spans.
+        """
+        self.spans.clear()
+
+
+EXPORTERS = {
+    "stdout": StdoutJsonExporter,
+    "memory": InMemoryExporter,
+}
+
+
+class Tracer:
+    """
+    Creates nested spans and hands each finished trace to the exporter.
+    Spans are linked through a context variable, so concurrent updates never mix their traces.
+    Without an exporter every span call is a no-op.
+    """
+
+    def __init__(self, exporter=None, summary=True):
+        """
+        Args:
+            exporter (object, optional): Object with an `export(spans)` method; None disables tracing.
+            summary (bool): Whether to log the critical-path summary of every finished trace.
+        """
+        self.exporter = exporter
+        self.summary = summary
+        self.finished = {}  # Trace ID -> finished spans of the traces that are still open.
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Opens a span for the duration of the block, as a child of the current span.
+        Exceptions are recorded on the span and re-raised.
+
+        Args:
+            name (str): The operation name.
+            **attributes: Additional fields describing the operation.
+
+        Yields:
+            Span | None: The open span, or None if tracing is disabled.
+        """
+        if self.exporter is None:
+            yield None
+            return
+        parent = CURRENT_SPAN.get()
+        span = Span(name, parent.trace_id if parent else uuid.uuid4().hex, parent.span_id if parent else None,
+                    attributes)
+        if parent:
+            parent.children.append(span)
+        token = CURRENT_SPAN.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            CURRENT_SPAN.reset(token)
+            self._finish(span)
+
+    def _finish(self, span):
+        """
+        Closes a span; once the root span is closed, the whole trace is exported.
+
+        Args:
+            span (Span): The span to close.
+        """
+        span.end = time.perf_counter()
+        spans = self.finished.setdefault(span.trace_id, [])
+        spans.append(span)
+        if span.parent_id is not None:
+            return
+        del self.finished[span.trace_id]
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning("Failed to export trace %s: %s", span.trace_id, e)
+        if self.summary and span.children:
+            logger.info("Critical path of %s: %s", span.name, critical_path_summary(span))
+
+
+def critical_path(root):
+    """
+    Follows the chain of spans where most of the trace duration went: from each span, its longest child.
+    Handlers run their Sheets and Telegram calls one after another, so the longest child at each level
+    is the step that dominated the latency of its parent.
+
+    Args:
+        root (Span): The root span of a finished trace.
+
+    Returns:
+        list: The spans of the critical path, from the root down.
+    """
+    path = []
+    span = root
+    while span is not None:
+        path.append(span)
+        span = max(span.children, key=lambda child: child.duration_ms, default=None)
+    return path
+
+
+def critical_path_summary(root):
+    """
+    Renders the critical path of a trace together with the time spent per operation.
+
+    Args:
+        root (Span): The root span of a finished trace.
+
+    Returns:
+        str: E.g. "handler.handle_response 4012ms > sheets.save_user_state 3100ms > sheets.call 3095ms;
+            totals: sheets.call 3400ms (4), telegram.sendMessage 420ms (1)".
+    """
+    steps = critical_path(root)[:SUMMARY_MAX_STEPS]
+    path = " > ".join(f"{span.name} {span.duration_ms:.0f}ms" for span in steps)
+
+    # Total time and call count per operation, over the whole trace.
+    totals = {}
+    stack = list(root.children)
+    while stack:
+        span = stack.pop()
+        total, count = totals.get(span.name, (0.0, 0))
+        totals[span.name] = (total + span.duration_ms, count + 1)
+        stack.extend(span.children)
+    ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:SUMMARY_MAX_STEPS]
+    return path + "; totals: " + ", ".join(f"{name} {total:.0f}ms ({count})" for name, (total, count) in ranked)
+
+
+def traced(name=None):
+    """
+    Decorator opening a span around every call of a function or coroutine function.
+
+    Args:
+        name (str, optional): The span name; defaults to the function's qualified name.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class TracedRequest(HTTPXRequest):
+    """
+    PTB request backend that opens a span around every Telegram Bot API request.
+    The span is named after the API method only: the request URL contains the bot token.
+    """
+
+    async def do_request(self, url, method, *args, **kwargs):
+        with get_tracer().span(f"telegram.{url.rsplit('/', 1)[-1]}"):
+            return await super().do_request(url, method, *args, **kwargs)
+
+
+def get_tracer():
+    """
+    Retrieves the shared tracer, creating it on first use with the exporter selected by TRACING_EXPORTER.
+
+    Returns:
+        Tracer: The shared tracer.
+    """
+    global TRACER
+    if TRACER is None:
+        exporter_class = EXPORTERS.get(Config.TRACING_EXPORTER)
+        TRACER = Tracer(exporter_class() if exporter_class else None)
+    return TRACER
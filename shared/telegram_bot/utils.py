@@ -1,6 +1,7 @@
 import shared.telegram_bot.globals as globs
 from shared.telegram_bot.logger import logger
 from shared.telegram_bot.config import Config
+from shared.telegram_bot.outbound import Priority, get_outbound_scheduler
 from telegram import Bot
 from telegram.helpers import escape_markdown
 
@@ -20,6 +21,7 @@ class Utils:
         """
         self.bot = None
         self.admin_chat_id = Config.ADMIN_CHAT_ID
+        self.scheduler = get_outbound_scheduler()  # Rate-limited gate for every outbound Telegram call.
 
     def _get_bot(self):
         """
@@ -37,25 +39,28 @@ class Utils:
             else:
                 # If no global bot is available yet, create a new one.
                 logger.warning("Creating a new Bot instance because globs.telegram_bot is None.")
-                self.bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
+                self.bot = Bot(token=Config.TELEGRAM_BOT_TOKEN, base_url=Config.TELEGRAM_API_BASE_URL)
         return self.bot
 
-    async def notify_admin(self, message: str):
+    async def notify_admin(self, message: str, admin_chat_id: str = None):
         """
         Sends a message to the admin chat for critical notifications or announcements.
 
         Args:
             message (str): The text message to be sent to the admin.
+            admin_chat_id (str, optional): The admin chat of a specific group; defaults to ADMIN_CHAT_ID.
         """
         try:
             bot = self._get_bot()
-            await bot.send_message(
-                chat_id=self.admin_chat_id,
+            await self.scheduler.send_message(
+                bot,
+                admin_chat_id or self.admin_chat_id,
+                priority=Priority.ADMIN,
                 text=message,
                 parse_mode="HTML"
             )
         except Exception as e:
-            logger.error(f"Error sending notification to admin: {e}", exc_info=True)
+            logger.error("Error sending notification to admin: %s", e, exc_info=True)
 
     async def send_user_message(self, user_id: str, message: str):
         """
@@ -67,9 +72,9 @@ class Utils:
         """
         try:
             bot = self._get_bot()
-            await bot.send_message(chat_id=user_id, text=message)
+            await self.scheduler.send_message(bot, user_id, text=message)
         except Exception as e:
-            logger.error(f"Error sending message to user {user_id}: {e}", exc_info=True)
+            logger.error("Error sending message to user %s: %s", user_id, e, exc_info=True)
 
     def send_error_notification(self, error_message: str):
         """
@@ -83,7 +88,7 @@ class Utils:
             self.notify_admin(f"❌ Error occurred: {error_message}")
         except Exception as e:
             # Log any errors encountered during the notification process.
-            logger.error(f"Error sending error notification to admin: {e}", exc_info=True)
+            logger.error("Error sending error notification to admin: %s", e, exc_info=True)
 
     @staticmethod
     def fetch_privacy_policy(lang, localization):
@@ -16,6 +16,10 @@ class Validation:
     MAX_PHONE_LENGTH = 15
     # Maximum allowable age.
     MAX_AGE = 120
+    # Characters commonly used to format phone numbers that are not part of the E.164 form.
+    PHONE_SEPARATORS_PATTERN = re.compile(r"[\s\-().]")
+    # Leading number in free-form age answers such as "25 лет" or "25 years".
+    LEADING_NUMBER_PATTERN = re.compile(r"^\s*(\d{1,3})\b")
 
     @staticmethod
     def validate_email(email):
@@ -68,3 +72,51 @@ class Validation:
         # Convert the age to an integer and ensure it is within the allowed range.
         age = int(age)
         return 1 <= age <= Validation.MAX_AGE
+
+    @staticmethod
+    def normalize_email(email):
+        """
+        Normalizes an email address to its canonical lowercase form without surrounding whitespace.
+
+        Args:
+            email (str): The email address.
+
+        Returns:
+            str: The normalized email address.
+        """
+        return str(email).strip().lower()
+
+    @staticmethod
+    def normalize_phone(phone):
+        """
+        Normalizes a phone number to the E.164 form (+ followed by digits).
+        Formatting characters are removed, the international "00" prefix becomes "+",
+        and 11-digit numbers with the Kazakh/Russian "8" trunk prefix or a missing "+" are rewritten to "+7...".
+
+        Args:
+            phone (str): The phone number.
+
+        Returns:
+            str: The normalized phone number.
+        """
+        phone = Validation.PHONE_SEPARATORS_PATTERN.sub("", str(phone).strip())
+        if phone.startswith("00"):
+            return "+" + phone[2:]
+        if len(phone) == 11 and phone.isdigit() and phone[0] in "78":
+            return "+7" + phone[1:]
+        return phone
+
+    @staticmethod
+    def normalize_age(age):
+        """
+        Normalizes an age answer to its leading number (e.g. "25 лет" becomes "25").
+
+        Args:
+            age (str): The age answer.
+
+        Returns:
+            str: The normalized age, or the stripped input if it does not start with a number.
+        """
+        age = str(age).strip()
+        match = Validation.LEADING_NUMBER_PATTERN.match(age)
+        return match.group(1) if match else age
@@ -0,0 +1,198 @@
+import html
+import json
+from urllib.parse import urlencode
+from shared.telegram_bot.config import Config
+from shared.telegram_bot.localization import Localization
+from shared.telegram_bot.tenants import get_tenant_registry
+from shared.telegram_bot.validation import Validation
+
+# Path segment of the API Gateway route serving the form, next to the webhook route.
+FORM_PATH = "form"
+
+# URL of the form derived from the webhook request (used when WEBAPP_URL is not set).
+FORM_URL = None
+
+# Telegram limits the data sent by a Web App to 4096 bytes. Free-text answers are not limited one by one (the chat
+# accepts them at any length); only the whole submission is checked, and a too long one is answered in the chat instead.
+MAX_DATA_BYTES = 4096
+
+# Client-side checks per question type, mirroring the server-side validators of the questionnaire.
+FIELD_RULES = {
+    "email": {"input": "email", "pattern": Validation.EMAIL_PATTERN.pattern, "maxlength": Validation.MAX_EMAIL_LENGTH},
+    "phone": {"input": "tel", "pattern": Validation.PHONE_PATTERN.pattern, "maxlength": Validation.MAX_PHONE_LENGTH},
+    "age": {"input": "number", "pattern": r"^\d+$", "min": 1, "max": Validation.MAX_AGE},
+}
+
+# Lazily rendered pages keyed by (language code, tenant chat ID).
+_pages = {}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<script src="https://telegram.org/js/telegram-web-app.js"></script>
+<style>
+body {{ font-family: -apple-system, sans-serif; margin: 0; padding: 16px;
+  background: var(--tg-theme-bg-color, #fff); color: var(--tg-theme-text-color, #000); }}
+label {{ display: block; margin: 16px 0 6px; }}
+input {{ box-sizing: border-box; width: 100%; padding: 10px; font-size: 16px; border-radius: 8px;
+  border: 1px solid var(--tg-theme-hint-color, #ccc); background: var(--tg-theme-secondary-bg-color, #fff);
+  color: inherit; }}
+.error {{ color: #d33; font-size: 14px; min-height: 1em; margin-top: 4px; }}
+</style>
+</head>
+<body>
+<p>{intro}</p>
+<form id="form" onsubmit="return false">
+{fields}
+</form>
+<div class="error" id="form-error"></div>
+<script>
+const FORM = {config};
+const app = window.Telegram.WebApp;
+app.ready();
+app.expand();
+function collect() {{
+  const answers = {{}};
+  let valid = true;
+  FORM.questions.forEach((question, i) => {{
+    const value = document.getElementById("f" + i).value.trim();
+    let error = "";
+    if (!value) {{
+      error = FORM.required;
+    }} else if (question.pattern && !new RegExp(question.pattern).test(value)) {{
+      error = question.error;
+    }} else if (question.max && !(Number(value) >= question.min && Number(value) <= question.max)) {{
+      error = question.error;
+    }}
+    document.getElementById("e" + i).textContent = error;
+    valid = valid && !error;
+    answers[question.id] = value;
+  }});
+  return valid ? answers : null;
+}}
+app.MainButton.setText(FORM.submit).show().onClick(() => {{
+  const answers = collect();
+  if (answers) {{
+    const data = JSON.stringify({{answers: answers}});
+    const tooLong = new TextEncoder().encode(data).length > FORM.maxBytes;
+    document.getElementById("form-error").textContent = tooLong ? FORM.tooLong : "";
+    if (!tooLong) {{
+      app.sendData(data);
+    }}
+  }}
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def discover_form_url(event):
+    """
+    Derives the URL of the form from an API Gateway webhook request, so the deployment needs no extra setting:
+    the form is served by the "/form" route of the same API and stage (custom domains included).
+
+    Args:
+        event (dict): The AWS Lambda proxy event of the webhook request.
+    """
+    global FORM_URL
+    request_context = event.get("requestContext") or {}
+    domain_name = request_context.get("domainName")
+    if FORM_URL or not domain_name:
+        return
+    # The request path is the stage (or base path mapping) followed by the webhook resource.
+    path, resource = request_context.get("path", ""), event.get("resource", "")
+    base_path = path[:-len(resource)] if resource and path.endswith(resource) else ""
+    FORM_URL = f"https://{domain_name}{base_path}/{FORM_PATH}"
+
+
+def get_form_url(lang, chat_id):
+    """
+    Builds the URL opening the form of a group in a language.
+
+    Args:
+        lang (str): The language code (e.g., 'en', 'ru', 'kz').
+        chat_id (str): The group chat ID.
+
+    Returns:
+        str | None: The URL, or None if the Web App form is disabled or its URL is not known yet.
+    """
+    base_url = Config.WEBAPP_URL or FORM_URL
+    if not Config.WEBAPP_FORM or not base_url:
+        return None
+    return f"{base_url}?{urlencode({'lang': lang, 'chat': chat_id})}"
+
+
+def render_form(lang, tenant):
+    """
+    Renders the form page of a group's questionnaire in one language: one field per question, validated in the
+    browser with the same rules as on the server. The answers are sent back with `Telegram.WebApp.sendData`.
+
+    Args:
+        lang (str): The language code (e.g., 'en', 'ru', 'kz').
+        tenant (Tenant): The group whose questionnaire is rendered.
+
+    Returns:
+        str: The HTML page.
+    """
+    key = (lang, tenant.chat_id)
+    if key in _pages:
+        return _pages[key]
+
+    fields, questions = [], []
+    for question in tenant.schema.questions:
+        rules = FIELD_RULES.get(question.type, {"input": "text"})
+        attributes = [f'id="f{question.index}"', f'type="{rules["input"]}"', 'required']
+        attributes += [f'{name}="{rules[name]}"' for name in ("maxlength", "min", "max") if name in rules]
+        fields.append(
+            f'<label for="f{question.index}">{html.escape(question.text(lang))}</label>'
+            f'<input {" ".join(attributes)}><div class="error" id="e{question.index}"></div>'
+        )
+        questions.append({
+            "id": question.field_id,
+            "pattern": rules.get("pattern"),
+            "min": rules.get("min"),
+            "max": rules.get("max"),
+            "error": Localization.get_string(lang, question.error_key) if question.error_key else "",
+        })
+
+    config = json.dumps({
+        "questions": questions,
+        "required": Localization.get_string(lang, "form_required"),
+        "submit": Localization.get_string(lang, "form_submit"),
+        "tooLong": Localization.get_string(lang, "form_too_long"),
+        "maxBytes": MAX_DATA_BYTES,
+    }, ensure_ascii=False).replace("</", "<\\/")
+    page = PAGE_TEMPLATE.format(
+        lang=html.escape(lang),
+        title=html.escape(tenant.name),
+        intro=html.escape(Localization.get_string(lang, "start_questionnaire")),
+        fields="\n".join(fields),
+        config=config,
+    )
+    _pages[key] = page
+    return page
+
+
+def serve_form(event):
+    """
+    Handles a GET request of the "/form" route.
+
+    Args:
+        event (dict): The AWS Lambda proxy event; the "lang" and "chat" query parameters select the form.
+
+    Returns:
+        dict: The HTTP response with the HTML page.
+    """
+    params = event.get("queryStringParameters") or {}
+    lang = params.get("lang") if params.get("lang") in Localization.STRINGS else "en"
+    registry = get_tenant_registry()
+    tenant = registry.tenants.get(str(params.get("chat"))) or registry.default
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "text/html; charset=utf-8", "Cache-Control": "public, max-age=300"},
+        "body": render_form(lang, tenant),
+    }